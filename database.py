@@ -1,34 +1,793 @@
+import contextvars
+import functools
+import itertools
+import logging
 import mysql.connector
 import streamlit as st
-import pandas as pd
-import random
-import string
-
-def get_db_connection():
-    return mysql.connector.connect(
-        host=st.secrets["mysql"]["host"],
-        user=st.secrets["mysql"]["user"],
-        password=st.secrets["mysql"]["password"],
-        database=st.secrets["mysql"]["database"]
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from query_stats import QueryStats
+
+log = logging.getLogger("thunder.db")
+
+def get_db_connection(**overrides):
+    """Connection to the primary; `overrides` (host, port, ...) point it at a replica."""
+    cfg = st.secrets["mysql"]
+    settings = {
+        "host": cfg["host"],
+        "port": int(cfg.get("port", 3306)),
+        "user": cfg["user"],
+        "password": cfg["password"],
+        "database": cfg["database"],
+    }
+    settings.update(overrides)
+    return mysql.connector.connect(**settings)
+
+# CONNECTION POOL
+
+class ConnectionPool:
+    """
+    Process-wide pool of MySQL connections.
+    Connections are checked out per query and returned afterwards; idle ones are
+    pinged before reuse and replaced once they are older than `recycle` seconds.
+    """
+
+    def __init__(self, connect, size=5, timeout=10.0, recycle=1800):
+        self._connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self._idle = deque()  # (connection, created_at)
+        self._created = {}    # id(connection) -> created_at
+        self._opening = 0     # slots reserved while a new connection is being opened
+        self._cond = threading.Condition()
+        self._stats = {
+            "checked_out": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time": 0.0,
+            "timeouts": 0,
+            "opened": 0,
+            "recycled": 0,
+            "broken": 0,
+        }
+
+    def _open(self):
+        conn = self._connect()
+        self._stats["opened"] += 1
+        return conn
+
+    def _discard(self, conn):
+        self._created.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, conn, created_at):
+        if time.monotonic() - created_at > self.recycle:
+            self._stats["recycled"] += 1
+            return False
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            self._stats["broken"] += 1
+            return False
+
+    def acquire(self):
+        started = time.monotonic()
+        waited = False
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn, created_at = self._idle.pop()
+                    break
+                if len(self._created) + self._opening < self.size:
+                    conn, created_at = None, None
+                    # Reserve the slot, the actual connect happens outside the lock
+                    self._opening += 1
+                    break
+                waited = True
+                remaining = self.timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise TimeoutError(f"No database connection available within {self.timeout}s")
+                self._cond.wait(remaining)
+
+            self._stats["checked_out"] += 1
+            self._stats["checkouts"] += 1
+            if waited:
+                self._stats["waits"] += 1
+                self._stats["wait_time"] += time.monotonic() - started
+
+        if conn is not None and not self._is_healthy(conn, created_at):
+            with self._cond:
+                self._discard(conn)
+                self._opening += 1
+            conn = None
+
+        if conn is None:
+            try:
+                conn = self._open()
+            except Exception:
+                with self._cond:
+                    self._opening -= 1
+                    self._stats["checked_out"] -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._opening -= 1
+                self._created[id(conn)] = time.monotonic()
+        return conn
+
+    def release(self, conn, broken=False):
+        with self._cond:
+            self._stats["checked_out"] -= 1
+            created_at = self._created.get(id(conn))
+            if broken or created_at is None:
+                self._discard(conn)
+            else:
+                try:
+                    # Ends any implicit transaction so the next user gets a fresh snapshot
+                    if conn.in_transaction:
+                        conn.rollback()
+                    self._idle.append((conn, created_at))
+                except Exception:
+                    self._stats["broken"] += 1
+                    self._discard(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        broken = False
+        try:
+            yield conn
+        except mysql.connector.errors.OperationalError:
+            broken = True
+            raise
+        finally:
+            self.release(conn, broken=broken)
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats["size"] = self.size
+            stats["open"] = len(self._created)
+            stats["idle"] = len(self._idle)
+        return stats
+
+def _pool_for(connect):
+    cfg = st.secrets["mysql"]
+    return ConnectionPool(
+        connect,
+        size=int(cfg.get("pool_size", 5)),
+        timeout=float(cfg.get("pool_timeout", 10)),
+        recycle=int(cfg.get("pool_recycle", 1800)),
     )
 
+@st.cache_resource
+def get_pool():
+    """Pool of connections to the primary (all writes, transactions, sticky reads)."""
+    return _pool_for(get_db_connection)
+
+def get_pool_stats():
+    return get_pool().stats()
+
+def pool_fetch(pool):
+    """fetch(sql, params) -> list of dict rows over `pool`, bypassing the query cache.
+    For long-lived services and background threads that own their pool."""
+    def fetch(sql, params=None):
+        with pool.connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            try:
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+    return fetch
+
+# READ REPLICAS
+
+# Connection failures that send a read to another endpoint (SQL errors are re-raised)
+_FAILOVER_ERRORS = (mysql.connector.errors.InterfaceError, mysql.connector.errors.OperationalError, TimeoutError)
+_session_route = contextvars.ContextVar("session_route", default=None)
+
+class _SessionRoute:
+    """Per-session read-your-writes state, kept in st.session_state."""
+
+    def __init__(self):
+        self.primary_until = 0.0
+
+@contextmanager
+def read_your_writes(state):
+    """Reads in this block go to the primary for a while after the session wrote something."""
+    route = state.get("_db_route")
+    if route is None:
+        route = state["_db_route"] = _SessionRoute()
+    token = _session_route.set(route)
+    try:
+        yield route
+    finally:
+        _session_route.reset(token)
+
+class Endpoint:
+    """One database server: its pool, health and per-query latencies."""
+
+    def __init__(self, name, pool, connect=None):
+        self.name = name
+        self.pool = pool
+        self.connect = connect  # opens the health-check connection (replicas only)
+        self.healthy = True
+        self.lag = None
+        self.last_error = None
+        self._probe = None
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=1000)
+        self._stats = {"queries": 0, "errors": 0, "failovers": 0, "seconds": 0.0}
+
+    def record(self, seconds, error=False):
+        with self._lock:
+            self._stats["queries"] += 1
+            self._stats["errors"] += error
+            self._stats["seconds"] += seconds
+            self._samples.append(seconds)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            samples = sorted(self._samples)
+        stats["seconds"] = round(stats["seconds"], 3)
+        for name, q in (("p50_ms", 0.5), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+            stats[name] = round(samples[min(len(samples) - 1, int(q * len(samples)))] * 1000, 2) if samples else None
+        stats.update(endpoint=self.name, healthy=self.healthy, lag=self.lag, last_error=self.last_error,
+                     open=self.pool.stats()["open"])
+        return stats
+
+class Router:
+    """
+    Sends SELECTs round-robin to healthy replicas and everything else to the primary.
+    A session reads from the primary for `sticky` seconds after its own writes, and cached
+    reference reads do too after any write to their tables in this process (so stale
+    replica rows are not cached for everyone). A background thread probes the replicas;
+    one that fails, lags more than `max_lag` seconds or stops replicating gets no reads
+    until it passes a probe again.
+    """
+
+    def __init__(self, primary, replicas=(), sticky=5.0, check_interval=5.0, max_lag=30.0):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.sticky = sticky
+        self.check_interval = check_interval
+        self.max_lag = max_lag
+        self._next = itertools.count()
+        self._table_writes = {}  # table -> monotonic time of the last write in this process
+        if self.replicas:
+            threading.Thread(target=self._run, name="replica-health", daemon=True).start()
+
+    def for_read(self, tables=()):
+        if not self.replicas:
+            return self.primary
+        now = time.monotonic()
+        route = _session_route.get()
+        if route is not None and route.primary_until > now:
+            return self.primary
+        if any(now - self._table_writes.get(t, float("-inf")) < self.sticky for t in tables):
+            return self.primary
+        healthy = [r for r in self.replicas if r.healthy]
+        return healthy[next(self._next) % len(healthy)] if healthy else self.primary
+
+    def wrote(self, tables):
+        if not tables:
+            return
+        now = time.monotonic()
+        for table in tables:
+            self._table_writes[table] = now
+        route = _session_route.get()
+        if route is not None:
+            route.primary_until = now + self.sticky
+
+    def failed(self, endpoint, error):
+        """Takes `endpoint` out of rotation; returns where to retry a read, or None."""
+        if endpoint is self.primary:
+            return None
+        with endpoint._lock:
+            endpoint.healthy = False
+            endpoint.last_error = str(error)
+            endpoint._stats["failovers"] += 1
+        log.warning("Replica %s failed, taken out of rotation: %s", endpoint.name, error)
+        return self.for_read()
+
+    def _run(self):
+        while True:
+            time.sleep(self.check_interval)
+            for replica in self.replicas:
+                self.check(replica)
+
+    def check(self, replica):
+        try:
+            if replica._probe is None or not replica._probe.is_connected():
+                replica._probe = replica.connect(connection_timeout=3)
+            cursor = replica._probe.cursor(dictionary=True)
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+                status = None
+                for statement in ("SHOW REPLICA STATUS", "SHOW SLAVE STATUS"):
+                    try:
+                        cursor.execute(statement)
+                        status = cursor.fetchall()
+                        break
+                    except mysql.connector.Error:
+                        continue
+            finally:
+                cursor.close()
+            lag = None
+            if status:
+                row = status[0]
+                lag = row.get("Seconds_Behind_Source", row.get("Seconds_Behind_Master"))
+                if lag is None:
+                    raise RuntimeError("replication is not running")
+            if lag is not None and lag > self.max_lag:
+                raise RuntimeError(f"{lag}s behind the primary")
+            # No status (plain server or no REPLICATION CLIENT privilege): reachable is enough
+            replica.lag = lag
+            if not replica.healthy:
+                log.info("Replica %s is back in rotation", replica.name)
+            replica.healthy, replica.last_error = True, None
+        except Exception as e:
+            if replica.healthy:
+                log.warning("Replica %s failed its health check: %s", replica.name, e)
+            replica.healthy, replica.last_error = False, str(e)
+            replica._probe = None
+
+    def stats(self):
+        return [e.stats() for e in [self.primary] + self.replicas]
+
+def _replica_settings(entry):
+    """'host', 'host:port' or a table with any of host/port/user/password/database."""
+    if isinstance(entry, str):
+        host, _, port = entry.partition(":")
+        return {"host": host, "port": int(port or 3306)}
+    return {k: (int(v) if k == "port" else v) for k, v in dict(entry).items()}
+
+@st.cache_resource
+def get_router():
+    cfg = st.secrets["mysql"]
+    replicas = []
+    for entry in cfg.get("replicas", []):
+        settings = _replica_settings(entry)
+        connect = functools.partial(get_db_connection, **settings)
+        name = f"{settings.get('host', cfg['host'])}:{settings.get('port', cfg.get('port', 3306))}"
+        replicas.append(Endpoint(name, _pool_for(connect), connect))
+    primary = Endpoint(f"{cfg['host']}:{cfg.get('port', 3306)} (primary)", get_pool())
+    return Router(primary, replicas, sticky=float(cfg.get("sticky_seconds", 5)),
+                  check_interval=float(cfg.get("replica_check_interval", 5)),
+                  max_lag=float(cfg.get("max_replica_lag", 30)))
+
+def get_read_pool():
+    """Pool for a long read (exports); a replica when one is healthy."""
+    return get_router().for_read().pool
+
+# QUERY RESULT CACHE
+
+# How long (seconds) a SELECT result may be served from memory, per table.
+# A query is cached only if every table it reads is listed here; its TTL is the
+# shortest one among them. Writes through run_query evict entries immediately,
+# other processes see the change once the TTL runs out.
+CACHE_TTL = {
+    "cargobranches": 300,
+    "servicetypes": 3600,
+    "cargostatustype": 3600,
+    "cargostatusalias": 3600,
+    "employeeroles": 3600,
+    "cargodailyfacts": 300,   # rebuilt by services.analytics, invalidated on refresh
+    "rollupwatermarks": 300,
+}
+
+_TABLE_RE = re.compile(r"\b(?:FROM|JOIN|INTO|UPDATE)\s+`?(\w+)`?", re.IGNORECASE)
+_MISS = object()
+
+def query_tables(query):
+    """Returns the (lowercased) table names a statement reads or writes."""
+    return {t.lower() for t in _TABLE_RE.findall(query)}
+
+def is_write_query(query):
+    return query.strip().upper().startswith(("UPDATE", "INSERT", "DELETE"))
+
+class QueryCache:
+    """Thread-safe LRU cache whose entries expire after a TTL and are tagged by table."""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, tables, value)
+        self._by_table = {}            # table -> set of keys
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+        self._linked = []              # caches invalidated together with this one
+
+    def _drop(self, key):
+        _, tables, _ = self._entries.pop(key)
+        for table in tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._drop(key)
+                self._stats["misses"] += 1
+                return _MISS
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[2]
+
+    def set(self, key, value, ttl, tables):
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + ttl, frozenset(tables), value)
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def invalidate(self, tables):
+        with self._lock:
+            for table in tables:
+                for key in list(self._by_table.get(table.lower(), ())):
+                    self._drop(key)
+                    self._stats["invalidations"] += 1
+        for other in self._linked:
+            other.invalidate(tables)
+
+    def link(self, other):
+        """Propagates every invalidate() to `other` (a separately sized cache of the same data)."""
+        self._linked.append(other)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_table.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        return stats
+
+@st.cache_resource
+def get_query_cache():
+    return QueryCache(max_entries=int(st.secrets["mysql"].get("cache_size", 512)))
+
+def _cache_plan(query, params):
+    """(key, ttl, tables) for a cacheable SELECT, or None."""
+    tables = query_tables(query)
+    if not tables or not tables.issubset(CACHE_TTL):
+        return None
+    if isinstance(params, dict):
+        params = tuple(sorted(params.items()))
+    elif params is not None:
+        params = tuple(params)
+    key = (" ".join(query.split()), params or None)
+    return key, min(CACHE_TTL[t] for t in tables), tables
+
+def invalidate_tables(*tables):
+    get_query_cache().invalidate(tables)
+
+def cached(name, tables, loader, ttl=None):
+    """
+    Memoizes loader() in the query cache under `name`, tagged with `tables`, so a write
+    to any of them through run_query/transaction rebuilds it. Default TTL: the shortest
+    CACHE_TTL among the tables (300 s for tables not listed there).
+    """
+    cache = get_query_cache()
+    key = ("cached", name)
+    value = cache.get(key)
+    if value is _MISS:
+        value = loader()
+        tags = {t.lower() for t in tables}
+        if ttl is None:
+            ttl = min(CACHE_TTL.get(t, 300) for t in tags)
+        cache.set(key, value, ttl, tags)
+    return value
+
+@st.cache_resource
+def get_query_stats():
+    cfg = st.secrets["mysql"]
+    return QueryStats(slow_ms=float(cfg.get("slow_query_ms", 200)), n_plus_one=int(cfg.get("n_plus_one", 5)))
+
+def _execute(endpoint, query, params, is_write):
+    """(rows or rowcount, seconds spent waiting for a connection) on one endpoint."""
+    started = time.perf_counter()
+    acquired = started
+    error = True
+    try:
+        with endpoint.pool.connection() as conn:
+            acquired = time.perf_counter()
+            cursor = conn.cursor(dictionary=True)
+            try:
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+
+                # UPDATE/INSERT işlemleri için commit gerekir
+                if is_write:
+                    conn.commit()
+                    result = cursor.rowcount
+                else:
+                    result = cursor.fetchall()
+                error = False
+                return result, acquired - started
+            finally:
+                cursor.close()
+    finally:
+        endpoint.record(time.perf_counter() - started, error)
+
 def run_query(query, params=None):
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
+    started = time.perf_counter()
+    is_write = is_write_query(query)
+    plan = None if is_write else _cache_plan(query, params)
+    if plan:
+        cached = get_query_cache().get(plan[0])
+        if cached is not _MISS:
+            get_query_stats().record(query, time.perf_counter() - started, len(cached), cached=True)
+            return [dict(row) for row in cached]
+
+    router = get_router()
+    endpoint = router.primary if is_write else router.for_read(plan[2] if plan else ())
+    acquire = 0.0
+    count, error = 0, True
     try:
-        if params:
-            cursor.execute(query, params)
-        else:
-            cursor.execute(query)
-        
-        # UPDATE/INSERT işlemleri için commit gerekir
-        if query.strip().upper().startswith(("UPDATE", "INSERT", "DELETE")):
+        while True:
+            try:
+                result, acquire = _execute(endpoint, query, params, is_write)
+                break
+            except _FAILOVER_ERRORS as e:
+                retry = None if is_write else router.failed(endpoint, e)
+                if retry is None:
+                    raise
+                endpoint = retry
+        count, error = (result if is_write else len(result)), False
+    finally:
+        get_query_stats().record(query, time.perf_counter() - started, count, acquire=acquire, error=error)
+
+    if is_write:
+        tables = query_tables(query)
+        get_query_cache().invalidate(tables)
+        router.wrote(tables)
+        return result
+    if plan:
+        get_query_cache().set(plan[0], tuple(result), plan[1], plan[2])
+        return [dict(row) for row in result]
+    return result
+
+# CONCURRENT BATCHES
+
+class BatchResult(dict):
+    """name -> rows for every query of a run_queries() batch; failed ones hold `default`
+    and their exception is in `errors`."""
+
+    def __init__(self):
+        super().__init__()
+        self.errors = {}
+
+    @property
+    def ok(self):
+        return not self.errors
+
+@st.cache_resource
+def get_query_executor():
+    # One thread per pooled connection; more would only wait in pool.acquire()
+    size = int(st.secrets["mysql"].get("pool_size", 5))
+    return ThreadPoolExecutor(max_workers=size, thread_name_prefix="query-batch")
+
+def run_queries(queries, default=None):
+    """
+    Runs independent read queries at the same time over pooled connections, so a page
+    waits for its slowest query instead of their sum.
+
+        res = run_queries({"branches": ("SELECT ...", None), "summary": ("SELECT ... %s", (x,))})
+        res["branches"], res.errors
+
+    Each query goes through run_query (cache, stats) in the caller's contextvars context,
+    so it is counted on the current page. A failing query does not affect the others.
+    """
+    items = list(queries.items())
+    result = BatchResult()
+    result.update((name, default) for name, _ in items)
+    if not items:
+        return result
+    executor = get_query_executor()
+    # The last query runs on the calling thread, which would otherwise just wait
+    futures = [
+        (name, executor.submit(contextvars.copy_context().run, run_query, sql, params))
+        for name, (sql, params) in items[:-1]
+    ]
+    name, (sql, params) = items[-1]
+    try:
+        result[name] = run_query(sql, params)
+    except Exception as e:
+        result.errors[name] = e
+    for name, future in futures:
+        try:
+            result[name] = future.result()
+        except Exception as e:
+            result.errors[name] = e
+    return result
+
+class _TrackedCursor:
+    """Cursor wrapper that remembers which tables were written, for cache invalidation."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.written = set()
+
+    def execute(self, query, params=None):
+        if is_write_query(query):
+            self.written |= query_tables(query)
+        return self._timed(query, self._cursor.execute, query, params)
+
+    def executemany(self, query, seq_params):
+        if is_write_query(query):
+            self.written |= query_tables(query)
+        return self._timed(query, self._cursor.executemany, query, seq_params)
+
+    def _timed(self, query, method, *args):
+        started = time.perf_counter()
+        error = True
+        try:
+            result = method(*args)
+            error = False
+            return result
+        finally:
+            # SELECT satır sayısı fetch sonrası belli olur; burada yazılan satırlar sayılır
+            rows = self._cursor.rowcount if is_write_query(query) and not error else 0
+            get_query_stats().record(query, time.perf_counter() - started, max(rows, 0), error=error)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+@contextmanager
+def transaction():
+    """
+    Runs several statements on one pooled connection and commits them together.
+    Rolls back everything if the block raises.
+
+        with transaction() as cursor:
+            cursor.execute(...)
+            cursor.executemany(...)
+    """
+    with get_pool().connection() as conn:
+        cursor = _TrackedCursor(conn.cursor(dictionary=True))
+        try:
+            yield cursor
             conn.commit()
-            return cursor.rowcount
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+    get_query_cache().invalidate(cursor.written)
+    get_router().wrote(cursor.written)
+
+# ID ALLOCATION
+
+class IdSpaceExhausted(Exception):
+    pass
+
+class IdAllocator:
+    """
+    Monotonic, prefix-aware IDs per table (CG001, TR002, INV03 ...) from IdCounters.
+    A block of any size costs one counter-row UPDATE on its own short transaction,
+    so the row is never locked for the length of a bulk insert. Single IDs are
+    served from a small per-process block; unused numbers are simply skipped.
+    Inside transaction() either reserve before opening it or pass its cursor: a
+    second pooled connection while the first holds locks can wait for the pool forever.
+    """
+
+    def __init__(self, block_size=20):
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._formats = None  # table -> (prefix, width, max_length)
+        self._blocks = {}     # table -> [next, end)
+
+    def _format(self, table, cursor=None):
+        if self._formats is None:
+            sql = "SELECT TableName, Prefix, Width, MaxLength FROM IdCounters"
+            if cursor is None:
+                rows = run_query(sql)
+            else:
+                cursor.execute(sql)
+                rows = cursor.fetchall()
+            self._formats = {r['TableName']: (r['Prefix'], r['Width'], r['MaxLength']) for r in rows}
+        if table not in self._formats:
+            raise KeyError(f"No IdCounters row for table {table}")
+        return self._formats[table]
+
+    @staticmethod
+    def _bump(cursor, table, count):
+        cursor.execute(
+            "UPDATE IdCounters SET NextValue = LAST_INSERT_ID(NextValue + %s) WHERE TableName = %s",
+            (count, table)
+        )
+        end = cursor.lastrowid
+        if not end:
+            cursor.execute("SELECT LAST_INSERT_ID() AS NextValue")
+            row = cursor.fetchone()
+            end = row['NextValue'] if isinstance(row, dict) else row[0]
+        return end
+
+    def reserve(self, table, count, cursor=None):
+        """
+        Reserves `count` consecutive numbers. Returns (first, prefix, width).
+        With `cursor` (a transaction's) the counter row is updated there and stays
+        locked until that transaction ends; otherwise on its own connection.
+        """
+        prefix, width, max_length = self._format(table, cursor)
+        if cursor is not None:
+            end = self._bump(cursor, table, count)
         else:
-            return cursor.fetchall()
-    finally:
-        conn.close()
+            with get_pool().connection() as conn:
+                own = conn.cursor()
+                try:
+                    end = self._bump(own, table, count)
+                    conn.commit()
+                finally:
+                    own.close()
+        first = end - count
+        if end - 1 >= 10 ** width or len(prefix) + width > max_length:
+            raise IdSpaceExhausted(
+                f"{table} IDs ran past {prefix}{'9' * width}; see migrations/014_widen_ids.sql"
+            )
+        return first, prefix, width
+
+    def allocate(self, table, count, cursor=None):
+        first, prefix, width = self.reserve(table, count, cursor)
+        return [f"{prefix}{n:0{width}d}" for n in range(first, first + count)]
+
+    def next_id(self, table):
+        with self._lock:
+            block = self._blocks.get(table)
+            if not block or block[0] >= block[1]:
+                first, _, _ = self.reserve(table, self.block_size)
+                block = self._blocks[table] = [first, first + self.block_size]
+            number = block[0]
+            block[0] += 1
+        prefix, width, _ = self._format(table)
+        return f"{prefix}{number:0{width}d}"
+
+@st.cache_resource
+def get_id_allocator():
+    return IdAllocator()
+
+def allocate_ids(table, count, cursor=None):
+    """
+    `count` new IDs for `table` in one round trip, e.g. allocate_ids('TrackingLog', 500).
+    Pass the cursor when called inside transaction() (see IdAllocator).
+    """
+    if count <= 0:
+        return []
+    return get_id_allocator().allocate(table, count, cursor)
+
+def reserve_id_block(table, count, cursor=None):
+    """
+    Same as allocate_ids but returns (first, prefix, width) so an INSERT ... SELECT can
+    number its rows itself: CONCAT(prefix, LPAD(first + ROW_NUMBER() OVER (...) - 1, width, '0')).
+    """
+    return get_id_allocator().reserve(table, count, cursor)
 
-def generate_id():
-    return ''.join(random.choices(string.ascii_uppercase + string.digits, k=5))
\ No newline at end of file
+def generate_id(table):
+    return get_id_allocator().next_id(table)
@@ -1,6 +1,6 @@
+import importlib
 import streamlit as st
-import time
-from views import guest, admin, customer
+from database import get_query_stats, read_your_writes
 
 # CONFIGURATION 
 st.set_page_config(page_title="Thunder Cargo", layout="wide", page_icon="⚡")
@@ -11,19 +11,27 @@ if 'user_role' not in st.session_state:
 if 'username' not in st.session_state:
     st.session_state['username'] = ''
 
+def view(name):
+    """views.<name> modülünü ilk kullanımda yükler: misafir oturumu admin / customer
+    sayfalarını (ve onların pandas / plotly bağımlılıklarını) hiç import etmez."""
+    return importlib.import_module(f"views.{name}")
+
+def render(page_fn):
+    """Sayfayı çalıştırır; sorguları sayfa adıyla gruplanır (örn. admin.show_dashboard),
+    oturumun kendi yazdıkları kısa süre primary'den okunur."""
+    with get_query_stats().page(f"{page_fn.__module__.split('.')[-1]}.{page_fn.__name__}"), \
+            read_your_writes(st.session_state):
+        page_fn()
+
 # AUTHENTICATION FUNCTIONS 
 def login_process(username, password):
     if username == "admin" and password == "admin123":
         st.session_state['user_role'] = 'admin'
         st.session_state['username'] = 'Administrator'
-        st.success("Login Successful! Redirecting...")
-        time.sleep(0.5)
         st.rerun()
     elif username == "client" and password == "1234":
         st.session_state['user_role'] = 'customer'
         st.session_state['username'] = 'Ahmet Yilmaz' 
-        st.success("Login Successful! Redirecting...")
-        time.sleep(0.5)
         st.rerun()
     else:
         st.error("Invalid Username or Password")
@@ -35,7 +43,8 @@ def logout_process():
 
 # --- GUEST NAVIGATION ---
 if st.session_state['user_role'] == 'guest':
-    
+    guest = view("guest")
+
     # Ekranı dikeyde biraz ortalamak için boşluk bırakalım
     st.write("") 
     st.write("")
@@ -69,21 +78,22 @@ if st.session_state['user_role'] == 'guest':
             st.info("Demo Accounts:\n\n👤 **Admin:** admin / admin123\n👤 **Customer:** client / 1234")
             about_thunder = st.radio("Informations",["About Us","Branches","Where is My Cargo?"])
             if about_thunder == "About Us":
-                guest.show_about()
+                render(guest.show_about)
             elif about_thunder == "Branches":
-                guest.show_branch_locator()
+                render(guest.show_branch_locator)
             elif about_thunder == "Where is My Cargo?":    
-                guest.show_public_tracking()
+                render(guest.show_public_tracking)
 
 
 
 
 # --- ADMIN NAVIGATION ---
 elif st.session_state['user_role'] == 'admin':
+    admin = view("admin")
     st.sidebar.success(f"User: **{st.session_state['username']}**")
     st.sidebar.subheader("Admin Panel")
     page_selection = st.sidebar.radio("Operations", 
-        ["📊 Dashboard", "📦 Cargo Tracking", "📋 All Shipments", "➕ New Registration","👥 Employee Management","🔧 Admin"])
+        ["📊 Dashboard", "💹 Analytics", "📦 Cargo Tracking", "📋 All Shipments", "➕ New Registration","👥 Employee Management","🚚 Manifests","📤 Export","📈 Query Stats","🔧 Admin"])
     
     st.sidebar.divider()
     if st.sidebar.button("Logout"):
@@ -91,22 +101,31 @@ elif st.session_state['user_role'] == 'admin':
 
     # Yönlendirme
     if page_selection == "📊 Dashboard":
-        admin.show_dashboard()
+        render(admin.show_dashboard)
+    elif page_selection == "💹 Analytics":
+        render(admin.show_analytics)
     elif page_selection == "📦 Cargo Tracking":
-        admin.show_tracking()
+        render(admin.show_tracking)
     elif page_selection == "📋 All Shipments":
-        admin.show_all_shipments()
+        render(admin.show_all_shipments)
     elif page_selection == "➕ New Registration":
-        admin.show_new_registration()
+        render(admin.show_new_registration)
     elif page_selection == "👥 Employee Management":
-        admin.show_employee_management()
+        render(admin.show_employee_management)
+    elif page_selection == "🚚 Manifests":
+        render(admin.show_manifests)
+    elif page_selection == "📤 Export":
+        render(admin.show_export)
+    elif page_selection == "📈 Query Stats":
+        render(admin.show_query_stats)
     elif page_selection == "🔧 Admin":
-        admin.show_admin_tools()
+        render(admin.show_admin_tools)
 
 
 
 # --- CUSTOMER NAVIGATION ---
 elif st.session_state['user_role'] == 'customer':
+    customer = view("customer")
     st.sidebar.info(f"Welcome, **{st.session_state['username']}**")
     st.sidebar.subheader("Customer Portal")
     
@@ -120,12 +139,12 @@ elif st.session_state['user_role'] == 'customer':
 
     # Yönlendirmeler
     if page_selection == "📊 Dashboard":
-        customer.show_dashboard()
+        render(customer.show_dashboard)
     elif page_selection == "📦 My Shipments":
-        customer.show_my_shipments()
+        render(customer.show_my_shipments)
     elif page_selection == "📥 Incoming Deliveries":
-        customer.show_incoming()
+        render(customer.show_incoming)
     elif page_selection == "🧾 Invoices":
-        customer.show_invoices()
+        render(customer.show_invoices)
     elif page_selection == "🚚 Request Courier":
-        customer.show_courier_request()
\ No newline at end of file
+        render(customer.show_courier_request)
\ No newline at end of file
@@ -0,0 +1,83 @@
+import argparse
+import os
+import re
+from database import get_db_connection
+
+# Applies the versioned SQL files in migrations/ (NNN_description.sql) in order
+# and records each one in SchemaMigrations so it only ever runs once.
+#   python migrate.py          -> apply pending migrations
+#   python migrate.py --list   -> show applied / pending versions
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+_FILE_RE = re.compile(r"^(\d+)_[\w\-]+\.sql$")
+
+def list_migrations():
+    found = []
+    for name in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = _FILE_RE.match(name)
+        if match:
+            found.append((match.group(1), os.path.join(MIGRATIONS_DIR, name)))
+    return found
+
+def split_statements(sql):
+    """Splits a script into statements, honouring mysql-client style DELIMITER lines."""
+    statements, buffer, delimiter = [], [], ";"
+    for line in sql.splitlines():
+        stripped = line.strip()
+        if not buffer and not stripped:
+            continue
+        if not buffer and stripped.upper().startswith("DELIMITER "):
+            delimiter = stripped.split(None, 1)[1]
+            continue
+        buffer.append(line)
+        if stripped.endswith(delimiter):
+            statement = "\n".join(buffer).rstrip()[: -len(delimiter)].strip()
+            if statement:
+                statements.append(statement)
+            buffer = []
+    tail = "\n".join(buffer).strip()
+    if tail:
+        statements.append(tail)
+    return statements
+
+def applied_versions(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS SchemaMigrations(
+            Version varchar(10) not null,
+            AppliedAt datetime not null default CURRENT_TIMESTAMP,
+            PRIMARY KEY(Version)
+        )
+    """)
+    cursor.execute("SELECT Version FROM SchemaMigrations")
+    return {row[0] for row in cursor.fetchall()}
+
+def migrate(list_only=False):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        done = applied_versions(cursor)
+        for version, path in list_migrations():
+            name = os.path.basename(path)
+            if version in done:
+                print(f"[applied] {name}")
+                continue
+            if list_only:
+                print(f"[pending] {name}")
+                continue
+            print(f"Applying {name} ...")
+            with open(path, encoding="utf-8") as f:
+                for statement in split_statements(f.read()):
+                    cursor.execute(statement)
+                    if cursor.with_rows:
+                        cursor.fetchall()
+            cursor.execute("INSERT INTO SchemaMigrations (Version) VALUES (%s)", (version,))
+            conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply Thunder Cargo schema migrations.")
+    parser.add_argument("--list", action="store_true", help="only list applied and pending migrations")
+    args = parser.parse_args()
+    migrate(list_only=args.list)
@@ -0,0 +1,52 @@
+/* Per branch / per status cargo counters for the admin dashboard.
+   Kept current by triggers on Cargos, so the dashboard never scans Cargos. */
+
+CREATE TABLE BranchCargoSummary(
+    BranchID char(5) not null,
+    CurrentStatus varchar(50) not null,
+    CargoCount int not null default 0,
+    Revenue decimal(14,2) not null default 0,
+    PRIMARY KEY(BranchID, CurrentStatus),
+    FOREIGN KEY(BranchID) references CargoBranches(BranchID)
+);
+
+INSERT INTO BranchCargoSummary (BranchID, CurrentStatus, CargoCount, Revenue)
+SELECT OriginBranchID, CurrentStatus, COUNT(*), SUM(ShippingCost)
+FROM Cargos
+GROUP BY OriginBranchID, CurrentStatus;
+
+DELIMITER $$
+
+CREATE TRIGGER trg_Cargos_Summary_Insert AFTER INSERT ON Cargos
+FOR EACH ROW
+BEGIN
+    INSERT INTO BranchCargoSummary (BranchID, CurrentStatus, CargoCount, Revenue)
+    VALUES (NEW.OriginBranchID, NEW.CurrentStatus, 1, NEW.ShippingCost)
+    ON DUPLICATE KEY UPDATE CargoCount = CargoCount + 1, Revenue = Revenue + NEW.ShippingCost;
+END$$
+
+CREATE TRIGGER trg_Cargos_Summary_Update AFTER UPDATE ON Cargos
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.OriginBranchID <=> NEW.OriginBranchID
+            AND OLD.CurrentStatus <=> NEW.CurrentStatus
+            AND OLD.ShippingCost <=> NEW.ShippingCost) THEN
+        UPDATE BranchCargoSummary
+        SET CargoCount = CargoCount - 1, Revenue = Revenue - OLD.ShippingCost
+        WHERE BranchID = OLD.OriginBranchID AND CurrentStatus = OLD.CurrentStatus;
+
+        INSERT INTO BranchCargoSummary (BranchID, CurrentStatus, CargoCount, Revenue)
+        VALUES (NEW.OriginBranchID, NEW.CurrentStatus, 1, NEW.ShippingCost)
+        ON DUPLICATE KEY UPDATE CargoCount = CargoCount + 1, Revenue = Revenue + NEW.ShippingCost;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_Cargos_Summary_Delete AFTER DELETE ON Cargos
+FOR EACH ROW
+BEGIN
+    UPDATE BranchCargoSummary
+    SET CargoCount = CargoCount - 1, Revenue = Revenue - OLD.ShippingCost
+    WHERE BranchID = OLD.OriginBranchID AND CurrentStatus = OLD.CurrentStatus;
+END$$
+
+DELIMITER ;
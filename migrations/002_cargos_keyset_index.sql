@@ -0,0 +1,10 @@
+/* Keyset pagination for the admin "All Shipments" page walks Cargos in
+   (LastUpdated DESC, CargoID DESC) order, so LastUpdated must never be NULL
+   and both orderings (unfiltered / per origin branch) need a matching index. */
+
+UPDATE Cargos SET LastUpdated = NOW() WHERE LastUpdated IS NULL;
+
+ALTER TABLE Cargos
+    MODIFY LastUpdated datetime not null default CURRENT_TIMESTAMP,
+    ADD INDEX IX_Cargos_LastUpdated (LastUpdated, CargoID),
+    ADD INDEX IX_Cargos_Origin_LastUpdated (OriginBranchID, LastUpdated, CargoID);
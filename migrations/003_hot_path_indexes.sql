@@ -0,0 +1,21 @@
+/* Covering composite indexes for the hot access paths in views/*.py.
+   InnoDB secondary indexes already carry the primary key, so CargoID /
+   TrackID / InvoiceID come along for free.
+   Verify with: python -m scripts.check_indexes */
+
+-- Customer dashboard, My Shipments, Incoming Deliveries
+ALTER TABLE Cargos
+    ADD INDEX IX_Cargos_Sender_LastUpdated (SenderCustID, LastUpdated, CurrentStatus),
+    ADD INDEX IX_Cargos_Receiver_LastUpdated (ReceiverCustID, LastUpdated, CurrentStatus);
+
+-- Public tracking timeline
+ALTER TABLE TrackingLog
+    ADD INDEX IX_TrackingLog_Cargo_Time (CargoID, LogTimestamps, StatusID, BranchID);
+
+-- Customer invoices
+ALTER TABLE Invoice
+    ADD INDEX IX_Invoice_Cust_Date (CustID, InvoiceDate, TotalAmount, CargoID);
+
+-- Branch locator
+ALTER TABLE CargoBranches
+    ADD INDEX IX_CargoBranches_City_District (BranchCity, BranchDistrict);
@@ -0,0 +1,94 @@
+/* Per-customer counters for the customer dashboard, maintained by triggers
+   on Cargos and Invoice so the dashboard reads one row instead of counting
+   the customer's whole history. ActiveIncoming uses the same rule as the
+   Incoming Deliveries page (anything not Delivered / Returned). */
+
+CREATE TABLE CustomerStats(
+    CustID char(5) not null,
+    OutgoingCount int not null default 0,
+    IncomingCount int not null default 0,
+    ActiveIncoming int not null default 0,
+    TotalSpend decimal(14,2) not null default 0,
+    PRIMARY KEY(CustID),
+    FOREIGN KEY(CustID) references Customers(CustID)
+);
+
+INSERT INTO CustomerStats (CustID, OutgoingCount, IncomingCount, ActiveIncoming, TotalSpend)
+SELECT cu.CustID,
+       (SELECT COUNT(*) FROM Cargos c WHERE c.SenderCustID = cu.CustID),
+       (SELECT COUNT(*) FROM Cargos c WHERE c.ReceiverCustID = cu.CustID),
+       (SELECT COUNT(*) FROM Cargos c WHERE c.ReceiverCustID = cu.CustID
+            AND c.CurrentStatus NOT IN ('Delivered', 'Returned')),
+       (SELECT COALESCE(SUM(i.TotalAmount), 0) FROM Invoice i WHERE i.CustID = cu.CustID)
+FROM Customers cu;
+
+DELIMITER $$
+
+CREATE TRIGGER trg_Cargos_CustomerStats_Insert AFTER INSERT ON Cargos
+FOR EACH ROW
+BEGIN
+    INSERT INTO CustomerStats (CustID, OutgoingCount) VALUES (NEW.SenderCustID, 1)
+    ON DUPLICATE KEY UPDATE OutgoingCount = OutgoingCount + 1;
+
+    INSERT INTO CustomerStats (CustID, IncomingCount, ActiveIncoming)
+    VALUES (NEW.ReceiverCustID, 1, NEW.CurrentStatus NOT IN ('Delivered', 'Returned'))
+    ON DUPLICATE KEY UPDATE IncomingCount = IncomingCount + 1,
+                            ActiveIncoming = ActiveIncoming + VALUES(ActiveIncoming);
+END$$
+
+CREATE TRIGGER trg_Cargos_CustomerStats_Update AFTER UPDATE ON Cargos
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.SenderCustID <=> NEW.SenderCustID) THEN
+        UPDATE CustomerStats SET OutgoingCount = OutgoingCount - 1 WHERE CustID = OLD.SenderCustID;
+        INSERT INTO CustomerStats (CustID, OutgoingCount) VALUES (NEW.SenderCustID, 1)
+        ON DUPLICATE KEY UPDATE OutgoingCount = OutgoingCount + 1;
+    END IF;
+
+    IF NOT (OLD.ReceiverCustID <=> NEW.ReceiverCustID AND OLD.CurrentStatus <=> NEW.CurrentStatus) THEN
+        UPDATE CustomerStats
+        SET IncomingCount = IncomingCount - 1,
+            ActiveIncoming = ActiveIncoming - (OLD.CurrentStatus NOT IN ('Delivered', 'Returned'))
+        WHERE CustID = OLD.ReceiverCustID;
+
+        INSERT INTO CustomerStats (CustID, IncomingCount, ActiveIncoming)
+        VALUES (NEW.ReceiverCustID, 1, NEW.CurrentStatus NOT IN ('Delivered', 'Returned'))
+        ON DUPLICATE KEY UPDATE IncomingCount = IncomingCount + 1,
+                                ActiveIncoming = ActiveIncoming + VALUES(ActiveIncoming);
+    END IF;
+END$$
+
+CREATE TRIGGER trg_Cargos_CustomerStats_Delete AFTER DELETE ON Cargos
+FOR EACH ROW
+BEGIN
+    UPDATE CustomerStats SET OutgoingCount = OutgoingCount - 1 WHERE CustID = OLD.SenderCustID;
+    UPDATE CustomerStats
+    SET IncomingCount = IncomingCount - 1,
+        ActiveIncoming = ActiveIncoming - (OLD.CurrentStatus NOT IN ('Delivered', 'Returned'))
+    WHERE CustID = OLD.ReceiverCustID;
+END$$
+
+CREATE TRIGGER trg_Invoice_CustomerStats_Insert AFTER INSERT ON Invoice
+FOR EACH ROW
+BEGIN
+    INSERT INTO CustomerStats (CustID, TotalSpend) VALUES (NEW.CustID, NEW.TotalAmount)
+    ON DUPLICATE KEY UPDATE TotalSpend = TotalSpend + NEW.TotalAmount;
+END$$
+
+CREATE TRIGGER trg_Invoice_CustomerStats_Update AFTER UPDATE ON Invoice
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.CustID <=> NEW.CustID AND OLD.TotalAmount <=> NEW.TotalAmount) THEN
+        UPDATE CustomerStats SET TotalSpend = TotalSpend - OLD.TotalAmount WHERE CustID = OLD.CustID;
+        INSERT INTO CustomerStats (CustID, TotalSpend) VALUES (NEW.CustID, NEW.TotalAmount)
+        ON DUPLICATE KEY UPDATE TotalSpend = TotalSpend + NEW.TotalAmount;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_Invoice_CustomerStats_Delete AFTER DELETE ON Invoice
+FOR EACH ROW
+BEGIN
+    UPDATE CustomerStats SET TotalSpend = TotalSpend - OLD.TotalAmount WHERE CustID = OLD.CustID;
+END$$
+
+DELIMITER ;
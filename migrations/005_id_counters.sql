@@ -0,0 +1,38 @@
+/* Counter rows for database.allocate_ids / generate_id.
+   IDs are Prefix + NextValue zero-padded to Width digits (CG001, INV01, ...).
+   Each counter starts after the highest numeric ID already in its table.
+   migrations/014_widen_ids.sql widens them to 12 characters. */
+
+CREATE TABLE IdCounters(
+    TableName varchar(50) not null,
+    Prefix varchar(5) not null,
+    NextValue bigint not null,
+    Width tinyint not null,
+    MaxLength tinyint not null,
+    PRIMARY KEY(TableName)
+);
+
+INSERT INTO IdCounters (TableName, Prefix, NextValue, Width, MaxLength)
+SELECT 'CargoBranches', 'BR', COALESCE(MAX(CAST(SUBSTRING(BranchID, 3) AS UNSIGNED)), 0) + 1, 3, 5
+FROM CargoBranches WHERE BranchID REGEXP '^BR[0-9]+$'
+UNION ALL
+SELECT 'Customers', 'CU', COALESCE(MAX(CAST(SUBSTRING(CustID, 3) AS UNSIGNED)), 0) + 1, 3, 5
+FROM Customers WHERE CustID REGEXP '^CU[0-9]+$'
+UNION ALL
+SELECT 'Vehicles', 'VH', COALESCE(MAX(CAST(SUBSTRING(VehicleID, 3) AS UNSIGNED)), 0) + 1, 3, 5
+FROM Vehicles WHERE VehicleID REGEXP '^VH[0-9]+$'
+UNION ALL
+SELECT 'Manifests', 'MN', COALESCE(MAX(CAST(SUBSTRING(ManifestID, 3) AS UNSIGNED)), 0) + 1, 3, 5
+FROM Manifests WHERE ManifestID REGEXP '^MN[0-9]+$'
+UNION ALL
+SELECT 'Cargos', 'CG', COALESCE(MAX(CAST(SUBSTRING(CargoID, 3) AS UNSIGNED)), 0) + 1, 3, 5
+FROM Cargos WHERE CargoID REGEXP '^CG[0-9]+$'
+UNION ALL
+SELECT 'Employees', 'EM', COALESCE(MAX(CAST(SUBSTRING(EmployeeID, 3) AS UNSIGNED)), 0) + 1, 3, 5
+FROM Employees WHERE EmployeeID REGEXP '^EM[0-9]+$'
+UNION ALL
+SELECT 'TrackingLog', 'TR', COALESCE(MAX(CAST(SUBSTRING(TrackID, 3) AS UNSIGNED)), 0) + 1, 3, 5
+FROM TrackingLog WHERE TrackID REGEXP '^TR[0-9]+$'
+UNION ALL
+SELECT 'Invoice', 'INV', COALESCE(MAX(CAST(SUBSTRING(InvoiceID, 4) AS UNSIGNED)), 0) + 1, 2, 5
+FROM Invoice WHERE InvoiceID REGEXP '^INV[0-9]+$';
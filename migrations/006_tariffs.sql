@@ -0,0 +1,72 @@
+/* Tariff tables for services/pricing.py.
+   Price = (BaseFee + PerKg * chargeable weight) * service Multiplier + service Surcharge,
+   with BaseFee / PerKg looked up by (origin zone, destination zone). */
+
+CREATE TABLE PricingZones(
+    ZoneID char(5) not null,
+    ZoneName varchar(50) not null,
+    PRIMARY KEY(ZoneID)
+);
+
+INSERT INTO PricingZones (ZoneID, ZoneName) VALUES
+('ZN001', 'Marmara'),
+('ZN002', 'Aegean'),
+('ZN003', 'Central Anatolia'),
+('ZN004', 'Mediterranean'),
+('ZN005', 'Black Sea'),
+('ZN006', 'Southeastern Anatolia');
+
+ALTER TABLE CargoBranches
+    ADD ZoneID char(5) null,
+    ADD FOREIGN KEY(ZoneID) references PricingZones(ZoneID);
+
+UPDATE CargoBranches SET ZoneID = CASE
+    WHEN BranchCity IN ('Istanbul', 'Bursa') THEN 'ZN001'
+    WHEN BranchCity IN ('Izmir', 'Mugla') THEN 'ZN002'
+    WHEN BranchCity IN ('Ankara', 'Eskisehir', 'Konya', 'Kayseri') THEN 'ZN003'
+    WHEN BranchCity IN ('Antalya', 'Adana') THEN 'ZN004'
+    WHEN BranchCity IN ('Trabzon', 'Samsun') THEN 'ZN005'
+    WHEN BranchCity IN ('Gaziantep') THEN 'ZN006'
+END;
+
+CREATE TABLE ZoneTariffs(
+    OriginZoneID char(5) not null,
+    DestZoneID char(5) not null,
+    BaseFee decimal(10,2) not null,
+    PerKg decimal(10,2) not null,
+    PRIMARY KEY(OriginZoneID, DestZoneID),
+    FOREIGN KEY(OriginZoneID) references PricingZones(ZoneID),
+    FOREIGN KEY(DestZoneID) references PricingZones(ZoneID)
+);
+
+-- Intra-zone is cheapest; every other pair starts from the same long-haul rate
+INSERT INTO ZoneTariffs (OriginZoneID, DestZoneID, BaseFee, PerKg)
+SELECT o.ZoneID, d.ZoneID,
+       CASE WHEN o.ZoneID = d.ZoneID THEN 40.00 ELSE 70.00 END,
+       CASE WHEN o.ZoneID = d.ZoneID THEN 6.00 ELSE 9.50 END
+FROM PricingZones o CROSS JOIN PricingZones d;
+
+CREATE TABLE ServiceTariffs(
+    ServiceTypeID char(5) not null,
+    Multiplier decimal(6,3) not null default 1,
+    Surcharge decimal(10,2) not null default 0,
+    PRIMARY KEY(ServiceTypeID),
+    FOREIGN KEY(ServiceTypeID) references ServiceTypes(ServiceTypeID)
+);
+
+INSERT INTO ServiceTariffs (ServiceTypeID, Multiplier, Surcharge) VALUES
+('SV001', 1.000, 0),
+('SV002', 1.400, 0),
+('SV003', 2.200, 0),
+('SV004', 1.800, 0),
+('SV005', 1.250, 100.00),
+('SV006', 1.300, 25.00),
+('SV007', 0.800, 0),
+('SV008', 1.600, 50.00),
+('SV009', 2.500, 0),
+('SV010', 3.500, 0),
+('SV011', 1.100, 15.00),
+('SV012', 1.200, 30.00),
+('SV013', 1.500, 250.00),
+('SV014', 0.900, 0),
+('SV015', 4.000, 500.00);
@@ -0,0 +1,146 @@
+/* Status registry. Cargos.CurrentStatus is free text ("Processing", "Lost",
+   "Arrived at Branch", ...) that does not always match CargoStatusType, so
+   progress / "is it finished" used to be guessed with substring matching.
+
+   - CargoStatusType gets Progress (0-100) and IsTerminal.
+   - CargoStatusAlias maps every spelling we have seen (English + Turkish)
+     to a StatusID; the descriptions themselves are aliases too.
+   - Cargos.StatusID is resolved from CurrentStatus by a BEFORE trigger, so
+     existing writers keep working. Unknown text leaves it NULL.
+   - CustomerStats.ActiveIncoming now follows IsTerminal, the same rule the
+     Incoming Deliveries page uses. */
+
+ALTER TABLE CargoStatusType
+    ADD COLUMN Progress tinyint not null default 0,
+    ADD COLUMN IsTerminal tinyint(1) not null default 0;
+
+UPDATE CargoStatusType
+SET Progress = CASE StatusID
+        WHEN 'ST001' THEN 10
+        WHEN 'ST002' THEN 20
+        WHEN 'ST003' THEN 25
+        WHEN 'ST004' THEN 35
+        WHEN 'ST005' THEN 50
+        WHEN 'ST006' THEN 55
+        WHEN 'ST007' THEN 60
+        WHEN 'ST008' THEN 70
+        WHEN 'ST009' THEN 75
+        WHEN 'ST010' THEN 100
+        WHEN 'ST011' THEN 75
+        WHEN 'ST012' THEN 75
+        WHEN 'ST014' THEN 100
+        ELSE 0 END,
+    IsTerminal = StatusID IN ('ST010', 'ST014', 'ST015');
+
+CREATE TABLE CargoStatusAlias(
+    Alias varchar(50) not null,
+    StatusID char(5) not null,
+    PRIMARY KEY(Alias),
+    FOREIGN KEY(StatusID) references CargoStatusType(StatusID)
+);
+
+INSERT INTO CargoStatusAlias (Alias, StatusID)
+SELECT StatusDescription, StatusID FROM CargoStatusType;
+
+INSERT IGNORE INTO CargoStatusAlias (Alias, StatusID) VALUES
+('Created', 'ST001'),
+('Pending', 'ST001'),
+('Hazırlanıyor', 'ST001'),
+('Processing', 'ST002'),
+('Picked Up', 'ST002'),
+('Arrived at Branch', 'ST003'),
+('Loaded', 'ST004'),
+('Yolda', 'ST005'),
+('Unloaded', 'ST008'),
+('Dağıtımda', 'ST009'),
+('Teslim Edildi', 'ST010'),
+('Returned', 'ST014'),
+('İade Edildi', 'ST014'),
+('Lost', 'ST015');
+
+ALTER TABLE Cargos
+    ADD COLUMN StatusID char(5) null AFTER CurrentStatus,
+    ADD CONSTRAINT FK_Cargos_StatusID FOREIGN KEY (StatusID) REFERENCES CargoStatusType(StatusID),
+    ADD INDEX IX_Cargos_Receiver_Status (ReceiverCustID, StatusID);
+
+UPDATE Cargos c
+JOIN CargoStatusAlias a ON a.Alias = c.CurrentStatus
+SET c.StatusID = a.StatusID;
+
+UPDATE CustomerStats cs
+SET cs.ActiveIncoming = (
+    SELECT COUNT(*) FROM Cargos c
+    LEFT JOIN CargoStatusType s ON s.StatusID = c.StatusID
+    WHERE c.ReceiverCustID = cs.CustID AND COALESCE(s.IsTerminal, 0) = 0);
+
+DROP TRIGGER IF EXISTS trg_Cargos_CustomerStats_Insert;
+DROP TRIGGER IF EXISTS trg_Cargos_CustomerStats_Update;
+DROP TRIGGER IF EXISTS trg_Cargos_CustomerStats_Delete;
+
+DELIMITER $$
+
+CREATE TRIGGER trg_Cargos_StatusID_Insert BEFORE INSERT ON Cargos
+FOR EACH ROW
+BEGIN
+    IF NEW.StatusID IS NULL THEN
+        SET NEW.StatusID = (SELECT StatusID FROM CargoStatusAlias WHERE Alias = NEW.CurrentStatus);
+    END IF;
+END$$
+
+CREATE TRIGGER trg_Cargos_StatusID_Update BEFORE UPDATE ON Cargos
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.CurrentStatus <=> NEW.CurrentStatus) AND OLD.StatusID <=> NEW.StatusID THEN
+        SET NEW.StatusID = (SELECT StatusID FROM CargoStatusAlias WHERE Alias = NEW.CurrentStatus);
+    END IF;
+END$$
+
+CREATE TRIGGER trg_Cargos_CustomerStats_Insert AFTER INSERT ON Cargos
+FOR EACH ROW
+BEGIN
+    INSERT INTO CustomerStats (CustID, OutgoingCount) VALUES (NEW.SenderCustID, 1)
+    ON DUPLICATE KEY UPDATE OutgoingCount = OutgoingCount + 1;
+
+    INSERT INTO CustomerStats (CustID, IncomingCount, ActiveIncoming)
+    VALUES (NEW.ReceiverCustID, 1,
+            1 - COALESCE((SELECT IsTerminal FROM CargoStatusType WHERE StatusID = NEW.StatusID), 0))
+    ON DUPLICATE KEY UPDATE IncomingCount = IncomingCount + 1,
+                            ActiveIncoming = ActiveIncoming + VALUES(ActiveIncoming);
+END$$
+
+CREATE TRIGGER trg_Cargos_CustomerStats_Update AFTER UPDATE ON Cargos
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.SenderCustID <=> NEW.SenderCustID) THEN
+        UPDATE CustomerStats SET OutgoingCount = OutgoingCount - 1 WHERE CustID = OLD.SenderCustID;
+        INSERT INTO CustomerStats (CustID, OutgoingCount) VALUES (NEW.SenderCustID, 1)
+        ON DUPLICATE KEY UPDATE OutgoingCount = OutgoingCount + 1;
+    END IF;
+
+    IF NOT (OLD.ReceiverCustID <=> NEW.ReceiverCustID AND OLD.StatusID <=> NEW.StatusID) THEN
+        UPDATE CustomerStats
+        SET IncomingCount = IncomingCount - 1,
+            ActiveIncoming = ActiveIncoming
+                - (1 - COALESCE((SELECT IsTerminal FROM CargoStatusType WHERE StatusID = OLD.StatusID), 0))
+        WHERE CustID = OLD.ReceiverCustID;
+
+        INSERT INTO CustomerStats (CustID, IncomingCount, ActiveIncoming)
+        VALUES (NEW.ReceiverCustID, 1,
+                1 - COALESCE((SELECT IsTerminal FROM CargoStatusType WHERE StatusID = NEW.StatusID), 0))
+        ON DUPLICATE KEY UPDATE IncomingCount = IncomingCount + 1,
+                                ActiveIncoming = ActiveIncoming + VALUES(ActiveIncoming);
+    END IF;
+END$$
+
+CREATE TRIGGER trg_Cargos_CustomerStats_Delete AFTER DELETE ON Cargos
+FOR EACH ROW
+BEGIN
+    UPDATE CustomerStats SET OutgoingCount = OutgoingCount - 1 WHERE CustID = OLD.SenderCustID;
+    UPDATE CustomerStats
+    SET IncomingCount = IncomingCount - 1,
+        ActiveIncoming = ActiveIncoming
+            - (1 - COALESCE((SELECT IsTerminal FROM CargoStatusType WHERE StatusID = OLD.StatusID), 0))
+    WHERE CustID = OLD.ReceiverCustID;
+END$$
+
+DELIMITER ;
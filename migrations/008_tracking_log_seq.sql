@@ -0,0 +1,8 @@
+/* Insert-order sequence on TrackingLog for the change feed (services/change_feed.py).
+   LogTimestamps is set by the application and may be back-dated or tie, so the
+   feed's high-water mark is this AUTO_INCREMENT column instead. Existing rows are
+   numbered when the column is added. */
+
+ALTER TABLE TrackingLog
+    ADD COLUMN LogSeq bigint not null AUTO_INCREMENT,
+    ADD INDEX IX_TrackingLog_LogSeq (LogSeq);
@@ -0,0 +1,144 @@
+/* Bulk loaders and the archiver write millions of Cargos / Invoice rows and then
+   rebuild or adjust BranchCargoSummary and CustomerStats in one set-based pass
+   (services/summaries.py). Per-row counter maintenance would dominate their run
+   time, so the counter triggers now skip their work while the session variable
+   @skip_summary_triggers is set:
+
+       SET @skip_summary_triggers = 1;  -- ... load ...;  SET @skip_summary_triggers = NULL;
+
+   The bodies are otherwise unchanged (001, 004, 007). The StatusID triggers stay on. */
+
+DROP TRIGGER IF EXISTS trg_Cargos_Summary_Insert;
+DROP TRIGGER IF EXISTS trg_Cargos_Summary_Update;
+DROP TRIGGER IF EXISTS trg_Cargos_Summary_Delete;
+DROP TRIGGER IF EXISTS trg_Cargos_CustomerStats_Insert;
+DROP TRIGGER IF EXISTS trg_Cargos_CustomerStats_Update;
+DROP TRIGGER IF EXISTS trg_Cargos_CustomerStats_Delete;
+DROP TRIGGER IF EXISTS trg_Invoice_CustomerStats_Insert;
+DROP TRIGGER IF EXISTS trg_Invoice_CustomerStats_Update;
+DROP TRIGGER IF EXISTS trg_Invoice_CustomerStats_Delete;
+
+DELIMITER $$
+
+CREATE TRIGGER trg_Cargos_Summary_Insert AFTER INSERT ON Cargos
+FOR EACH ROW
+BEGIN
+    IF @skip_summary_triggers IS NULL THEN
+        INSERT INTO BranchCargoSummary (BranchID, CurrentStatus, CargoCount, Revenue)
+        VALUES (NEW.OriginBranchID, NEW.CurrentStatus, 1, NEW.ShippingCost)
+        ON DUPLICATE KEY UPDATE CargoCount = CargoCount + 1, Revenue = Revenue + NEW.ShippingCost;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_Cargos_Summary_Update AFTER UPDATE ON Cargos
+FOR EACH ROW
+BEGIN
+    IF @skip_summary_triggers IS NULL THEN
+        IF NOT (OLD.OriginBranchID <=> NEW.OriginBranchID
+                AND OLD.CurrentStatus <=> NEW.CurrentStatus
+                AND OLD.ShippingCost <=> NEW.ShippingCost) THEN
+            UPDATE BranchCargoSummary
+            SET CargoCount = CargoCount - 1, Revenue = Revenue - OLD.ShippingCost
+            WHERE BranchID = OLD.OriginBranchID AND CurrentStatus = OLD.CurrentStatus;
+
+            INSERT INTO BranchCargoSummary (BranchID, CurrentStatus, CargoCount, Revenue)
+            VALUES (NEW.OriginBranchID, NEW.CurrentStatus, 1, NEW.ShippingCost)
+            ON DUPLICATE KEY UPDATE CargoCount = CargoCount + 1, Revenue = Revenue + NEW.ShippingCost;
+        END IF;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_Cargos_Summary_Delete AFTER DELETE ON Cargos
+FOR EACH ROW
+BEGIN
+    IF @skip_summary_triggers IS NULL THEN
+        UPDATE BranchCargoSummary
+        SET CargoCount = CargoCount - 1, Revenue = Revenue - OLD.ShippingCost
+        WHERE BranchID = OLD.OriginBranchID AND CurrentStatus = OLD.CurrentStatus;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_Cargos_CustomerStats_Insert AFTER INSERT ON Cargos
+FOR EACH ROW
+BEGIN
+    IF @skip_summary_triggers IS NULL THEN
+        INSERT INTO CustomerStats (CustID, OutgoingCount) VALUES (NEW.SenderCustID, 1)
+        ON DUPLICATE KEY UPDATE OutgoingCount = OutgoingCount + 1;
+
+        INSERT INTO CustomerStats (CustID, IncomingCount, ActiveIncoming)
+        VALUES (NEW.ReceiverCustID, 1,
+                1 - COALESCE((SELECT IsTerminal FROM CargoStatusType WHERE StatusID = NEW.StatusID), 0))
+        ON DUPLICATE KEY UPDATE IncomingCount = IncomingCount + 1,
+                                ActiveIncoming = ActiveIncoming + VALUES(ActiveIncoming);
+    END IF;
+END$$
+
+CREATE TRIGGER trg_Cargos_CustomerStats_Update AFTER UPDATE ON Cargos
+FOR EACH ROW
+BEGIN
+    IF @skip_summary_triggers IS NULL THEN
+        IF NOT (OLD.SenderCustID <=> NEW.SenderCustID) THEN
+            UPDATE CustomerStats SET OutgoingCount = OutgoingCount - 1 WHERE CustID = OLD.SenderCustID;
+            INSERT INTO CustomerStats (CustID, OutgoingCount) VALUES (NEW.SenderCustID, 1)
+            ON DUPLICATE KEY UPDATE OutgoingCount = OutgoingCount + 1;
+        END IF;
+
+        IF NOT (OLD.ReceiverCustID <=> NEW.ReceiverCustID AND OLD.StatusID <=> NEW.StatusID) THEN
+            UPDATE CustomerStats
+            SET IncomingCount = IncomingCount - 1,
+                ActiveIncoming = ActiveIncoming
+                    - (1 - COALESCE((SELECT IsTerminal FROM CargoStatusType WHERE StatusID = OLD.StatusID), 0))
+            WHERE CustID = OLD.ReceiverCustID;
+
+            INSERT INTO CustomerStats (CustID, IncomingCount, ActiveIncoming)
+            VALUES (NEW.ReceiverCustID, 1,
+                    1 - COALESCE((SELECT IsTerminal FROM CargoStatusType WHERE StatusID = NEW.StatusID), 0))
+            ON DUPLICATE KEY UPDATE IncomingCount = IncomingCount + 1,
+                                    ActiveIncoming = ActiveIncoming + VALUES(ActiveIncoming);
+        END IF;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_Cargos_CustomerStats_Delete AFTER DELETE ON Cargos
+FOR EACH ROW
+BEGIN
+    IF @skip_summary_triggers IS NULL THEN
+        UPDATE CustomerStats SET OutgoingCount = OutgoingCount - 1 WHERE CustID = OLD.SenderCustID;
+        UPDATE CustomerStats
+        SET IncomingCount = IncomingCount - 1,
+            ActiveIncoming = ActiveIncoming
+                - (1 - COALESCE((SELECT IsTerminal FROM CargoStatusType WHERE StatusID = OLD.StatusID), 0))
+        WHERE CustID = OLD.ReceiverCustID;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_Invoice_CustomerStats_Insert AFTER INSERT ON Invoice
+FOR EACH ROW
+BEGIN
+    IF @skip_summary_triggers IS NULL THEN
+        INSERT INTO CustomerStats (CustID, TotalSpend) VALUES (NEW.CustID, NEW.TotalAmount)
+        ON DUPLICATE KEY UPDATE TotalSpend = TotalSpend + NEW.TotalAmount;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_Invoice_CustomerStats_Update AFTER UPDATE ON Invoice
+FOR EACH ROW
+BEGIN
+    IF @skip_summary_triggers IS NULL THEN
+        IF NOT (OLD.CustID <=> NEW.CustID AND OLD.TotalAmount <=> NEW.TotalAmount) THEN
+            UPDATE CustomerStats SET TotalSpend = TotalSpend - OLD.TotalAmount WHERE CustID = OLD.CustID;
+            INSERT INTO CustomerStats (CustID, TotalSpend) VALUES (NEW.CustID, NEW.TotalAmount)
+            ON DUPLICATE KEY UPDATE TotalSpend = TotalSpend + NEW.TotalAmount;
+        END IF;
+    END IF;
+END$$
+
+CREATE TRIGGER trg_Invoice_CustomerStats_Delete AFTER DELETE ON Invoice
+FOR EACH ROW
+BEGIN
+    IF @skip_summary_triggers IS NULL THEN
+        UPDATE CustomerStats SET TotalSpend = TotalSpend - OLD.TotalAmount WHERE CustID = OLD.CustID;
+    END IF;
+END$$
+
+DELIMITER ;
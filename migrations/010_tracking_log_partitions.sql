@@ -0,0 +1,50 @@
+/* Monthly RANGE partitions on TrackingLog.LogTimestamps, and archive tables for the
+   archiver (services/archive.py). Delivered / returned / lost cargos older than
+   ARCHIVE_AGE_DAYS move with their tracking rows, invoices and manifest lines into
+   the *Archive tables, so the live tables only hold recent and open shipments.
+   Tracking lookups fall back to the archive.
+
+   MySQL cannot partition a table with foreign keys, and every unique key has to
+   contain the partitioning column. TrackingLog therefore loses its foreign keys
+   (rows are only written by services/ with IDs from the same lookups) and its
+   primary key becomes (TrackID, LogTimestamps); TrackIDs still come from IdCounters.
+   There is one partition per month from the oldest row to three months ahead, plus
+   pmax. `python -m services.archive` adds the coming months and drops emptied ones. */
+
+-- Same columns and indexes, no foreign keys or triggers (created before partitioning,
+-- CREATE TABLE ... LIKE would copy the partitions)
+CREATE TABLE IF NOT EXISTS CargosArchive LIKE Cargos;
+CREATE TABLE IF NOT EXISTS TrackingLogArchive LIKE TrackingLog;
+CREATE TABLE IF NOT EXISTS InvoiceArchive LIKE Invoice;
+CREATE TABLE IF NOT EXISTS ManifestCargoArchive LIKE ManifestCargo;
+ALTER TABLE TrackingLogArchive MODIFY LogSeq bigint not null;
+
+SELECT GROUP_CONCAT(CONCAT('DROP FOREIGN KEY `', CONSTRAINT_NAME, '`')) INTO @drops
+FROM information_schema.TABLE_CONSTRAINTS
+WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'TrackingLog' AND CONSTRAINT_TYPE = 'FOREIGN KEY';
+SET @sql = IF(@drops IS NULL, 'DO 0', CONCAT('ALTER TABLE TrackingLog ', @drops));
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+ALTER TABLE TrackingLog DROP PRIMARY KEY, ADD PRIMARY KEY (TrackID, LogTimestamps);
+
+SET SESSION group_concat_max_len = 65536;
+SELECT GROUP_CONCAT(
+           CONCAT('PARTITION p', DATE_FORMAT(m, '%Y%m'), ' VALUES LESS THAN (''',
+                  DATE_FORMAT(m + INTERVAL 1 MONTH, '%Y-%m-%d'), ''')')
+           ORDER BY m SEPARATOR ', ') INTO @parts
+FROM (
+    WITH RECURSIVE months (m) AS (
+        SELECT CAST(DATE_FORMAT(COALESCE((SELECT MIN(LogTimestamps) FROM TrackingLog), CURDATE()), '%Y-%m-01') AS DATE)
+        UNION ALL
+        SELECT m + INTERVAL 1 MONTH FROM months
+        WHERE m < CAST(DATE_FORMAT(CURDATE(), '%Y-%m-01') AS DATE) + INTERVAL 3 MONTH
+    )
+    SELECT m FROM months
+) month_list;
+SET @sql = CONCAT('ALTER TABLE TrackingLog PARTITION BY RANGE COLUMNS(LogTimestamps) (',
+                  @parts, ', PARTITION pmax VALUES LESS THAN (MAXVALUE))');
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
@@ -0,0 +1,56 @@
+/* Daily revenue / volume cube for the admin analytics page (services/analytics.py).
+   One row per day x origin branch x destination branch x service type x payment type;
+   weeks and months are rolled up from the days when the page reads them.
+
+   Cargos had no creation time, so CreatedAt is added (the first tracking event or the
+   invoice date for existing rows) and a cargo's volume and shipping revenue count on
+   the day it was created; invoiced amounts count on InvoiceDate. The rollup job only
+   recomputes the days touched since RollupWatermarks.Watermark. Archived cargos
+   (migration 010) stay in the cube. */
+
+ALTER TABLE Cargos ADD COLUMN CreatedAt datetime null;
+ALTER TABLE CargosArchive ADD COLUMN CreatedAt datetime null;
+
+-- Counter triggers would recompute every row for an unchanged value
+SET @skip_summary_triggers = 1;
+UPDATE Cargos c
+SET c.CreatedAt = COALESCE(
+    (SELECT MIN(t.LogTimestamps) FROM TrackingLog t WHERE t.CargoID = c.CargoID),
+    (SELECT MIN(i.InvoiceDate) FROM Invoice i WHERE i.CargoID = c.CargoID),
+    c.LastUpdated, NOW());
+SET @skip_summary_triggers = NULL;
+UPDATE CargosArchive c
+SET c.CreatedAt = COALESCE(
+    (SELECT MIN(t.LogTimestamps) FROM TrackingLogArchive t WHERE t.CargoID = c.CargoID),
+    (SELECT MIN(i.InvoiceDate) FROM InvoiceArchive i WHERE i.CargoID = c.CargoID),
+    c.LastUpdated, NOW());
+
+ALTER TABLE Cargos
+    MODIFY CreatedAt datetime not null default CURRENT_TIMESTAMP,
+    ADD INDEX IX_Cargos_CreatedAt (CreatedAt);
+ALTER TABLE CargosArchive
+    MODIFY CreatedAt datetime not null default CURRENT_TIMESTAMP,
+    ADD INDEX IX_Cargos_CreatedAt (CreatedAt);
+ALTER TABLE Invoice ADD INDEX IX_Invoice_Date (InvoiceDate);
+ALTER TABLE InvoiceArchive ADD INDEX IX_Invoice_Date (InvoiceDate);
+
+CREATE TABLE CargoDailyFacts(
+    Day date not null,
+    OriginBranchID char(5) not null,
+    DestBranchID char(5) not null,
+    ServiceTypeID char(5) not null,
+    PaymentType varchar(50) not null,
+    CargoCount int not null default 0,
+    TotalWeight decimal(14,2) not null default 0,
+    ShippingRevenue decimal(14,2) not null default 0,
+    InvoiceCount int not null default 0,
+    InvoicedAmount decimal(14,2) not null default 0,
+    PRIMARY KEY(Day, OriginBranchID, DestBranchID, ServiceTypeID, PaymentType)
+);
+
+CREATE TABLE RollupWatermarks(
+    Name varchar(50) not null,
+    Watermark datetime not null,
+    UpdatedAt datetime not null default CURRENT_TIMESTAMP,
+    PRIMARY KEY(Name)
+);
@@ -0,0 +1,28 @@
+/* Branch coordinates for the nearest-branch search and the "Show on Map" button of
+   the branch locator (services/branches.py). WGS84 degrees; branches without
+   coordinates are still listed by city / district but not found by distance. */
+
+ALTER TABLE CargoBranches
+    ADD COLUMN Latitude decimal(9,6) null,
+    ADD COLUMN Longitude decimal(9,6) null;
+
+UPDATE CargoBranches b
+JOIN (
+    SELECT 'BR001' AS BranchID, 41.112400 AS Latitude, 29.020900 AS Longitude
+    UNION ALL SELECT 'BR002', 40.987900, 29.028600
+    UNION ALL SELECT 'BR003', 41.043000, 29.006900
+    UNION ALL SELECT 'BR004', 39.920800, 32.854100
+    UNION ALL SELECT 'BR005', 38.435800, 27.143600
+    UNION ALL SELECT 'BR006', 40.214500, 28.983900
+    UNION ALL SELECT 'BR007', 36.855100, 30.752800
+    UNION ALL SELECT 'BR008', 36.991400, 35.330800
+    UNION ALL SELECT 'BR009', 37.066200, 37.383300
+    UNION ALL SELECT 'BR010', 41.004800, 39.717800
+    UNION ALL SELECT 'BR011', 39.766700, 30.525600
+    UNION ALL SELECT 'BR012', 41.328900, 36.273100
+    UNION ALL SELECT 'BR013', 37.872600, 32.492400
+    UNION ALL SELECT 'BR014', 38.725000, 35.487900
+    UNION ALL SELECT 'BR015', 37.034400, 27.430500
+) seed ON seed.BranchID = b.BranchID
+SET b.Latitude = seed.Latitude, b.Longitude = seed.Longitude
+WHERE b.Latitude IS NULL;
@@ -0,0 +1,35 @@
+/* Every cargo gets a StatusID. Migration 007 left Cargos.StatusID NULL when
+   CurrentStatus matched no alias, and the Incoming Deliveries page had to add
+   "OR StatusID IS NULL", which turns its (ReceiverCustID, StatusID) equality
+   lookup into a second range.
+
+   - Unresolved rows (live and archive) get DEFAULT_STATUS 'ST001' (Order Created):
+     active, like NULL was counted so far (CustomerStats.ActiveIncoming does not change).
+   - The StatusID triggers fall back to the same status for unknown text, so no new
+     NULLs appear. Add an alias to CargoStatusAlias to map a new spelling properly. */
+
+UPDATE Cargos SET StatusID = 'ST001' WHERE StatusID IS NULL;
+UPDATE CargosArchive SET StatusID = 'ST001' WHERE StatusID IS NULL;
+
+DROP TRIGGER IF EXISTS trg_Cargos_StatusID_Insert;
+DROP TRIGGER IF EXISTS trg_Cargos_StatusID_Update;
+
+DELIMITER $$
+
+CREATE TRIGGER trg_Cargos_StatusID_Insert BEFORE INSERT ON Cargos
+FOR EACH ROW
+BEGIN
+    IF NEW.StatusID IS NULL THEN
+        SET NEW.StatusID = COALESCE((SELECT StatusID FROM CargoStatusAlias WHERE Alias = NEW.CurrentStatus), 'ST001');
+    END IF;
+END$$
+
+CREATE TRIGGER trg_Cargos_StatusID_Update BEFORE UPDATE ON Cargos
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.CurrentStatus <=> NEW.CurrentStatus) AND OLD.StatusID <=> NEW.StatusID THEN
+        SET NEW.StatusID = COALESCE((SELECT StatusID FROM CargoStatusAlias WHERE Alias = NEW.CurrentStatus), 'ST001');
+    END IF;
+END$$
+
+DELIMITER ;
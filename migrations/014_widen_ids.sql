@@ -0,0 +1,55 @@
+/* Wide IDs, applied by migrate.py. The 5-character IDs of the initial schema leave
+   999 cargos / customers / tracking rows (99 invoices) per prefix, so a demo database
+   ran out after a few hundred status changes. Every ID column and its foreign keys
+   become char(12) and the counters switch to 10 (invoices 9) digit numbers:
+   CG0000001000, INV000000100, ... New IDs sort before the old short ones but stay
+   unique and monotonic among themselves, so inserts still append to one end of each index.
+   It rebuilds the tables: on a large existing database run it in a maintenance window.
+   Later migrations create ID columns as char(12). */
+
+SET FOREIGN_KEY_CHECKS = 0;
+
+ALTER TABLE CargoStatusType MODIFY StatusID char(12) not null;
+ALTER TABLE EmployeeRoles MODIFY RoleID char(12) not null;
+ALTER TABLE ServiceTypes MODIFY ServiceTypeID char(12) not null;
+ALTER TABLE CargoBranches MODIFY BranchID char(12) not null;
+ALTER TABLE Customers MODIFY CustID char(12) not null;
+ALTER TABLE Vehicles MODIFY VehicleID char(12) not null, MODIFY CurrentBranchID char(12) not null;
+ALTER TABLE Manifests
+    MODIFY ManifestID char(12) not null, MODIFY VehicleID char(12) not null,
+    MODIFY DestBranchID char(12) not null, MODIFY OriginBranchID char(12) not null;
+ALTER TABLE Cargos
+    MODIFY CargoID char(12) not null, MODIFY ReceiverCustID char(12) not null,
+    MODIFY SenderCustID char(12) not null, MODIFY OriginBranchID char(12) not null,
+    MODIFY DestBranchID char(12) not null, MODIFY ServiceTypeID char(12) not null,
+    MODIFY StatusID char(12) null;
+ALTER TABLE ManifestCargo MODIFY ManifestID char(12) not null, MODIFY CargoID char(12) not null;
+ALTER TABLE Employees
+    MODIFY EmployeeID char(12) not null, MODIFY BranchID char(12) not null, MODIFY RoleID char(12) not null;
+ALTER TABLE TrackingLog
+    MODIFY TrackID char(12) not null, MODIFY CargoID char(12) not null, MODIFY BranchID char(12) not null,
+    MODIFY EmployeeID char(12) not null, MODIFY StatusID char(12) not null;
+ALTER TABLE Invoice
+    MODIFY InvoiceID char(12) not null, MODIFY CargoID char(12) not null, MODIFY CustID char(12) not null;
+ALTER TABLE BranchCargoSummary MODIFY BranchID char(12) not null;
+ALTER TABLE CustomerStats MODIFY CustID char(12) not null;
+ALTER TABLE CargoStatusAlias MODIFY StatusID char(12) not null;
+ALTER TABLE ServiceTariffs MODIFY ServiceTypeID char(12) not null;
+ALTER TABLE CargosArchive
+    MODIFY CargoID char(12) not null, MODIFY ReceiverCustID char(12) not null,
+    MODIFY SenderCustID char(12) not null, MODIFY OriginBranchID char(12) not null,
+    MODIFY DestBranchID char(12) not null, MODIFY ServiceTypeID char(12) not null,
+    MODIFY StatusID char(12) null;
+ALTER TABLE TrackingLogArchive
+    MODIFY TrackID char(12) not null, MODIFY CargoID char(12) not null, MODIFY BranchID char(12) not null,
+    MODIFY EmployeeID char(12) not null, MODIFY StatusID char(12) not null;
+ALTER TABLE InvoiceArchive
+    MODIFY InvoiceID char(12) not null, MODIFY CargoID char(12) not null, MODIFY CustID char(12) not null;
+ALTER TABLE ManifestCargoArchive MODIFY ManifestID char(12) not null, MODIFY CargoID char(12) not null;
+ALTER TABLE CargoDailyFacts
+    MODIFY OriginBranchID char(12) not null, MODIFY DestBranchID char(12) not null,
+    MODIFY ServiceTypeID char(12) not null;
+
+SET FOREIGN_KEY_CHECKS = 1;
+
+UPDATE IdCounters SET Width = 12 - CHAR_LENGTH(Prefix), MaxLength = 12;
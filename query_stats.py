@@ -0,0 +1,163 @@
+import contextvars
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from contextlib import contextmanager
+import numpy as np
+
+# Sorgu ölçümleri: run_query / transaction her ifadeyi buraya yazar.
+# İfade başına süre dağılımı (p50/p95/p99), satır sayısı, bağlantı bekleme süresi;
+# sayfa başına (her rerun) sorgu sayısı, yavaş sorgu günlüğü ve N+1 tespiti.
+
+log = logging.getLogger("thunder.queries")
+
+SAMPLES = 1000          # latest durations kept per statement for percentiles
+MAX_STATEMENTS = 2000
+SLOW_LOG_SIZE = 200
+
+_PLACEHOLDER_LIST_RE = re.compile(r"%s(?:\s*,\s*%s)+")
+_current_page = contextvars.ContextVar("query_stats_page", default=None)
+
+def normalize(query):
+    """Statement key: whitespace collapsed, expanded IN (%s, %s, ...) lists folded to one."""
+    return _PLACEHOLDER_LIST_RE.sub("%s, ...", " ".join(query.split()))
+
+class _Rerun:
+    def __init__(self, name):
+        self.name = name
+        self.queries = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+
+class _Statement:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.rows = 0
+        self.acquire = 0.0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=SAMPLES)
+        self.pages = Counter()
+
+class QueryStats:
+    def __init__(self, slow_ms=200, n_plus_one=5):
+        self.slow_ms = slow_ms
+        self.n_plus_one = n_plus_one
+        self._lock = threading.Lock()
+        self._statements = OrderedDict()  # normalized sql -> _Statement
+        self._pages = {}                  # page -> {"reruns", "queries", "max_queries", "seconds"}
+        self._n_plus_one = {}             # (page, sql) -> {"repeats", "seen"}
+        self.slow = deque(maxlen=SLOW_LOG_SIZE)
+
+    def record(self, query, seconds, rows=0, acquire=0.0, cached=False, error=False):
+        sql = normalize(query)
+        rerun = _current_page.get()
+        page = rerun.name if rerun else None
+        with self._lock:
+            stmt = self._statements.get(sql)
+            if stmt is None:
+                stmt = self._statements[sql] = _Statement()
+                if len(self._statements) > MAX_STATEMENTS:
+                    self._statements.popitem(last=False)
+            else:
+                self._statements.move_to_end(sql)
+            stmt.count += 1
+            stmt.errors += error
+            stmt.cache_hits += cached
+            stmt.rows += rows or 0
+            stmt.acquire += acquire
+            stmt.total += seconds
+            stmt.max = max(stmt.max, seconds)
+            stmt.samples.append(seconds)
+            stmt.pages[page] += 1
+            if rerun is not None:
+                rerun.queries += 1
+                rerun.seconds += seconds
+                rerun.statements[sql] += 1
+        if seconds * 1000 >= self.slow_ms:
+            entry = {"at": time.strftime("%Y-%m-%d %H:%M:%S"), "page": page, "ms": round(seconds * 1000, 1),
+                     "rows": rows, "acquire_ms": round(acquire * 1000, 1), "sql": sql}
+            self.slow.append(entry)
+            log.warning("Slow query (%.0f ms, %s rows, page %s): %s", seconds * 1000, rows, page, sql)
+
+    @contextmanager
+    def page(self, name):
+        """Groups the queries of one script rerun under `name`, e.g. 'admin.show_dashboard'."""
+        rerun = _Rerun(name)
+        token = _current_page.set(rerun)
+        try:
+            yield rerun
+        finally:
+            _current_page.reset(token)
+            self._finish(rerun)
+
+    def _finish(self, rerun):
+        with self._lock:
+            page = self._pages.setdefault(rerun.name, {"reruns": 0, "queries": 0, "max_queries": 0, "seconds": 0.0})
+            page["reruns"] += 1
+            page["queries"] += rerun.queries
+            page["max_queries"] = max(page["max_queries"], rerun.queries)
+            page["seconds"] += rerun.seconds
+            repeated = [(sql, n) for sql, n in rerun.statements.items() if n >= self.n_plus_one]
+            for sql, n in repeated:
+                found = self._n_plus_one.setdefault((rerun.name, sql), {"repeats": 0, "seen": 0})
+                found["repeats"] = max(found["repeats"], n)
+                found["seen"] += 1
+        for sql, n in repeated:
+            log.warning("Possible N+1 on %s: same statement %d times in one rerun: %s", rerun.name, n, sql)
+
+    def summary(self):
+        """One dict per statement, slowest total time first."""
+        with self._lock:
+            snapshot = [(sql, dict(vars(s), samples=np.array(s.samples), pages=dict(s.pages)))
+                        for sql, s in self._statements.items()]
+        result = []
+        for sql, s in snapshot:
+            p50, p95, p99 = np.percentile(s["samples"], [50, 95, 99])
+            result.append({
+                "statement": sql,
+                "count": s["count"],
+                "errors": s["errors"],
+                "cache_hits": s["cache_hits"],
+                "total_ms": round(s["total"] * 1000, 1),
+                "mean_ms": round(s["total"] / s["count"] * 1000, 2),
+                "p50_ms": round(p50 * 1000, 2),
+                "p95_ms": round(p95 * 1000, 2),
+                "p99_ms": round(p99 * 1000, 2),
+                "max_ms": round(s["max"] * 1000, 2),
+                "rows_avg": round(s["rows"] / s["count"], 1),
+                "acquire_avg_ms": round(s["acquire"] / s["count"] * 1000, 2),
+                "pages": {str(k): v for k, v in s["pages"].items()},
+            })
+        return sorted(result, key=lambda r: r["total_ms"], reverse=True)
+
+    def pages(self):
+        with self._lock:
+            return [
+                {"page": name, "reruns": p["reruns"], "queries_per_rerun": round(p["queries"] / p["reruns"], 1),
+                 "max_queries": p["max_queries"], "db_ms_per_rerun": round(p["seconds"] / p["reruns"] * 1000, 1)}
+                for name, p in sorted(self._pages.items())
+            ]
+
+    def n_plus_one_findings(self):
+        with self._lock:
+            return [{"page": page, "statement": sql, **found} for (page, sql), found in self._n_plus_one.items()]
+
+    def write_jsonl(self, f):
+        """Per-statement summary as JSON lines; returns the number of lines written."""
+        rows = self.summary()
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        return len(rows)
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+            self._pages.clear()
+            self._n_plus_one.clear()
+            self.slow.clear()
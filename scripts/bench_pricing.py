@@ -0,0 +1,62 @@
+import argparse
+import time
+import numpy as np
+from services.pricing import Tariffs, quote, get_tariffs
+
+# Quotes-per-second benchmark for services/pricing.py.
+#   python -m scripts.bench_pricing --parcels 1000000            (synthetic tariffs, no DB)
+#   python -m scripts.bench_pricing --parcels 1000000 --from-db  (tariffs from the database)
+
+def synthetic_tariffs(branches, zones=6, services=15, seed=42):
+    rng = np.random.default_rng(seed)
+    base = rng.uniform(40, 90, (zones, zones))
+    np.fill_diagonal(base, 40)
+    return Tariffs(
+        [f"BR{i:06d}" for i in range(branches)],
+        [f"ZN{z:03d}" for z in rng.integers(0, zones, branches)],
+        [f"ZN{z:03d}" for z in range(zones)],
+        base, base / 8,
+        [f"SV{i:03d}" for i in range(1, services + 1)],
+        rng.uniform(0.8, 4.0, services), rng.choice([0, 25, 100], services),
+    )
+
+def synthetic_parcels(n, tariffs, seed=7):
+    rng = np.random.default_rng(seed)
+    return (
+        np.round(rng.lognormal(1.2, 0.9, n), 2),
+        rng.uniform(5, 120, n), rng.uniform(5, 80, n), rng.uniform(1, 80, n),
+        rng.choice(tariffs.branch_ids, n), rng.choice(tariffs.branch_ids, n),
+        rng.choice(tariffs.service_ids, n),
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized quoting engine.")
+    parser.add_argument("--parcels", type=int, default=1_000_000)
+    parser.add_argument("--branches", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--from-db", action="store_true", help="use the tariff tables from the database")
+    args = parser.parse_args()
+
+    tariffs = get_tariffs() if args.from_db else synthetic_tariffs(args.branches)
+    parcels = synthetic_parcels(args.parcels, tariffs)
+
+    quote(*(p[:1] for p in parcels), tariffs=tariffs)  # warm-up
+    single = []
+    for _ in range(1000):
+        started = time.perf_counter()
+        quote(*(p[0] for p in parcels), tariffs=tariffs)
+        single.append(time.perf_counter() - started)
+
+    runs = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        prices = quote(*parcels, tariffs=tariffs)
+        runs.append(time.perf_counter() - started)
+
+    best = min(runs)
+    print(f"single parcel : {np.median(single) * 1e6:,.1f} µs median")
+    print(f"{args.parcels:,} parcels: {best:.3f} s best of {args.repeat} -> {args.parcels / best:,.0f} quotes/s")
+    print(f"unpriced (unknown IDs): {int(np.isnan(prices).sum())}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import argparse
+import json
+import subprocess
+import sys
+import time
+from datetime import datetime
+import numpy as np
+from scripts.bench_views import git_commit
+from scripts.common import ROOT
+
+# Cold start per role: a fresh interpreter imports what main.py loads for that role
+# (streamlit + database, then views.<role>) and reports import times, peak RSS and which
+# heavy libraries came with it. "eager" is the old behaviour: all three view modules at once.
+#   python -m scripts.bench_startup --runs 5 --out bench/startup.json
+#   python -m scripts.bench_startup --compare bench/startup.json
+
+ROLES = {"guest": ["guest"], "customer": ["customer"], "admin": ["admin"],
+         "eager": ["guest", "admin", "customer"]}
+HEAVY = ("numpy", "pandas", "plotly", "pyarrow", "mysql.connector")
+TOLERANCE = 0.25    # slower / bigger than the baseline by this much is a regression
+MIN_DELTA_MS = 50   # ... and at least this many ms (interpreter start-up noise)
+MIN_DELTA_MB = 10
+
+# Runs in the child with `python -c`, so nothing from this module is preloaded there
+CHILD = r"""
+import importlib, json, sys, time
+t0 = time.perf_counter()
+import streamlit, database
+t1 = time.perf_counter()
+for name in sys.argv[1].split(","):
+    importlib.import_module("views." + name)
+t2 = time.perf_counter()
+try:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+except ImportError:
+    rss = None
+print(json.dumps({"base_ms": (t1 - t0) * 1e3, "views_ms": (t2 - t1) * 1e3, "rss_mb": rss,
+                  "heavy": [m for m in HEAVY if m in sys.modules]}))
+"""
+
+def measure(views, runs):
+    """Median of `runs` cold imports of `views` (each in a new interpreter)."""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", f"HEAVY = {HEAVY!r}\n" + CHILD, ",".join(views)],
+                             cwd=ROOT, capture_output=True, text=True)
+        if out.returncode != 0:
+            return {"error": (out.stderr.strip().splitlines() or ["exit code %d" % out.returncode])[-1]}
+        sample = json.loads(out.stdout.strip().splitlines()[-1])
+        sample["process_ms"] = (time.perf_counter() - started) * 1e3
+        samples.append(sample)
+    result = {key: round(float(np.median([s[key] for s in samples])), 1)
+              for key in ("base_ms", "views_ms", "process_ms")}
+    rss = [s["rss_mb"] for s in samples if s["rss_mb"] is not None]
+    result["rss_mb"] = round(float(np.median(rss)), 1) if rss else None
+    result["import_ms"] = round(result["base_ms"] + result["views_ms"], 1)
+    result["heavy"] = samples[-1]["heavy"]
+    return result
+
+def _line(role, entry):
+    if "error" in entry:
+        return f"{role:>9}  ERROR: {entry['error']}"
+    rss = f"{entry['rss_mb']:>7.1f} MB" if entry["rss_mb"] is not None else "    n/a   "
+    return (f"{role:>9}  import {entry['import_ms']:>7.1f} ms (streamlit+db {entry['base_ms']:>6.1f}, "
+            f"views {entry['views_ms']:>6.1f})  process {entry['process_ms']:>7.1f} ms  rss {rss}  "
+            f"{', '.join(entry['heavy']) or '-'}")
+
+def compare(current, baseline, tolerance=TOLERANCE):
+    """Prints changes against a baseline run; returns the number of regressions."""
+    regressions = 0
+    for role, entry in current.items():
+        base = baseline.get(role)
+        if base is None or "error" in base or "error" in entry:
+            continue
+        slower = entry["import_ms"] > base["import_ms"] * (1 + tolerance) and \
+            entry["import_ms"] - base["import_ms"] >= MIN_DELTA_MS
+        bigger = None not in (entry["rss_mb"], base["rss_mb"]) and \
+            entry["rss_mb"] > base["rss_mb"] * (1 + tolerance) and entry["rss_mb"] - base["rss_mb"] >= MIN_DELTA_MB
+        if slower or bigger:
+            regressions += 1
+            print(f"{'REGRESSED':>10}  {role}: import {base['import_ms']:.0f} -> {entry['import_ms']:.0f} ms, "
+                  f"rss {base['rss_mb']} -> {entry['rss_mb']} MB")
+        elif base["import_ms"] - entry["import_ms"] >= MIN_DELTA_MS:
+            print(f"{'faster':>10}  {role}: import {base['import_ms']:.0f} -> {entry['import_ms']:.0f} ms")
+        added = set(entry["heavy"]) - set(base["heavy"])
+        if added:
+            print(f"{'note':>10}  {role} now loads {', '.join(sorted(added))}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start import time and memory per role.")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per role (median is kept)")
+    parser.add_argument("--roles", nargs="+", choices=list(ROLES), default=list(ROLES))
+    parser.add_argument("--out", help="write the results as JSON")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON of an earlier run; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="allowed slowdown, 0.25 = 25%%")
+    args = parser.parse_args()
+
+    results = {}
+    for role in args.roles:
+        results[role] = measure(ROLES[role], args.runs)
+        print(_line(role, results[role]))
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"created": datetime.now().isoformat(timespec="seconds"), "git": git_commit(),
+                       "python": sys.version.split()[0], "runs": args.runs, "roles": results}, f, indent=2)
+        print(f"results written to {args.out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline["roles"], args.tolerance)
+        print(f"{regressions} regression{'' if regressions == 1 else 's'}")
+        sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import asyncio
+import multiprocessing
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+import numpy as np
+
+# Lookups-per-second benchmark for services/tracking_api.py (keep-alive HTTP/1.1 clients).
+#   python -m services.tracking_api --port 8081 &  python -m scripts.bench_tracking --ids 200
+#   python -m scripts.bench_tracking --synthetic   (server with in-memory rows in a child process, no DB)
+
+def synthetic_fetch(sql, params):
+    """Stands in for the pooled MySQL fetch: every CG### below 900 exists with four events."""
+    cargo_id = params[0]
+    if not cargo_id.startswith("CG") or not cargo_id[2:].isdigit() or int(cargo_id[2:]) >= 900:
+        return []
+    time.sleep(0.002)  # a fast indexed round trip
+    now = datetime(2023, 10, 29, 12, 0)
+    if "FROM TrackingLog" in sql:
+        return [{"LogTimestamps": now - timedelta(hours=6 * i), "StatusDescription": "In Transit",
+                 "BranchName": "Kadikoy Branch", "BranchCity": "Istanbul"} for i in range(4)]
+    return [{"CargoID": cargo_id, "CurrentStatus": "In Transit", "LastUpdated": now,
+             "SenderName": "Ahmet", "SenderLast": "Yilmaz", "ReceiverName": "Ayse", "ReceiverLast": "Demir",
+             "Origin": "Istanbul", "Dest": "Ankara"}]
+
+def _run_synthetic_server(port):
+    from services.tracking import TrackingGuard
+    from services.tracking_api import TrackingService, serve
+    # One client IP drives all the load here, so the per-client limit is lifted
+    service = TrackingService(synthetic_fetch, guard=TrackingGuard(rate=1e9, burst=10**9))
+    asyncio.run(serve(service, "127.0.0.1", port))
+
+async def _client(host, port, paths, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for path in paths:
+            started = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+            head = await reader.readuntil(b"\r\n\r\n")
+            lines = head.decode("latin-1").split("\r\n")
+            length = next(int(l.split(":", 1)[1]) for l in lines if l.lower().startswith("content-length"))
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+            statuses[lines[0].split(" ")[1]] += 1
+    finally:
+        writer.close()
+
+async def run(url, ids, requests, concurrency, seed=1):
+    parts = urlsplit(url)
+    rng = np.random.default_rng(seed)
+    # Zipf-like popularity: a few IDs take most of the traffic, like real tracking
+    weights = 1.0 / np.arange(1, len(ids) + 1)
+    picks = rng.choice(len(ids), requests, p=weights / weights.sum())
+    paths = [f"/track/{ids[i]}" for i in picks]
+    latencies, statuses = [], Counter()
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _client(parts.hostname, parts.port or 80, paths[i::concurrency], latencies, statuses)
+        for i in range(concurrency)
+    ))
+    return time.perf_counter() - started, np.array(latencies), statuses
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the public tracking JSON endpoint.")
+    parser.add_argument("--url", default="http://127.0.0.1:8081")
+    parser.add_argument("--ids", type=int, default=200, help="distinct Cargo IDs (CG001, CG002, ...)")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--synthetic", action="store_true", help="start a server on in-memory rows first")
+    args = parser.parse_args()
+
+    server = None
+    if args.synthetic:
+        args.url = "http://127.0.0.1:8099"
+        server = multiprocessing.Process(target=_run_synthetic_server, args=(8099,), daemon=True)
+        server.start()
+        time.sleep(1.0)
+
+    ids = [f"CG{i:03d}" for i in range(1, args.ids + 1)]
+    try:
+        seconds, latencies, statuses = asyncio.run(run(args.url, ids, args.requests, args.concurrency))
+    finally:
+        if server is not None:
+            server.terminate()
+
+    print(f"{args.requests:,} lookups in {seconds:.2f} s -> {args.requests / seconds:,.0f} lookups/s")
+    print(f"latency p50 {np.percentile(latencies, 50) * 1e3:.2f} ms, "
+          f"p99 {np.percentile(latencies, 99) * 1e3:.2f} ms")
+    print("status codes: " + ", ".join(f"{code}={n}" for code, n in sorted(statuses.items())))
+
+if __name__ == "__main__":
+    main()
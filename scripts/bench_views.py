@@ -0,0 +1,192 @@
+import json
+import subprocess
+import sys
+import time
+from datetime import datetime
+import numpy as np
+from query_stats import normalize
+from scripts.common import ROOT, SAMPLE_VALUES, base_parser, connect, sample_params, view_queries
+
+# Latency / rows-read benchmark for every query in views/admin.py, customer.py and guest.py.
+# Run it on a generated data set (scripts.generate_data), keep the JSON, compare later runs:
+#   python -m scripts.bench_views --out bench/baseline.json
+#   python -m scripts.bench_views --out bench/today.json --compare bench/baseline.json
+# Rows read are the session Handler_read_* counters (MySQL and MariaDB), i.e. index and
+# table rows the engine touched, not rows returned. UPDATE / DELETE statements are skipped.
+
+VIEW_FILES = ("views/admin.py", "views/customer.py", "views/guest.py", "services/employees.py",
+              "services/branches.py")
+HANDLER_READS = ("Handler_read_first", "Handler_read_key", "Handler_read_last", "Handler_read_next",
+                 "Handler_read_prev", "Handler_read_rnd", "Handler_read_rnd_next")
+TOLERANCE = 0.25         # a query is a regression when this much slower / reading this much more
+MIN_DELTA_MS = 2.0       # ... and at least this many ms slower (timer noise on fast queries)
+MIN_DELTA_ROWS = 100
+STATEMENT_TIMEOUT = 30   # seconds
+
+# Busy rows of the current data set, so the measured plans see realistic fan-out
+SAMPLE_SQL = {
+    "custid": "SELECT CustID FROM CustomerStats ORDER BY OutgoingCount DESC LIMIT 1",
+    "receivercustid": "SELECT CustID FROM CustomerStats ORDER BY IncomingCount DESC LIMIT 1",
+    "branchid": "SELECT BranchID FROM BranchCargoSummary GROUP BY BranchID ORDER BY SUM(CargoCount) DESC LIMIT 1",
+    "cargoid": "SELECT CargoID FROM TrackingLog ORDER BY LogSeq DESC LIMIT 1",
+    "employeeid": "SELECT EmployeeID FROM Employees ORDER BY EmployeeID DESC LIMIT 1",
+    "manifestid": "SELECT ManifestID FROM Manifests ORDER BY ManifestID DESC LIMIT 1",
+}
+
+def pick_samples(cursor):
+    samples = dict(SAMPLE_VALUES)
+    for column, sql in SAMPLE_SQL.items():
+        try:
+            cursor.execute(sql)
+            row = cursor.fetchone()
+        except Exception:
+            continue
+        if row:
+            samples[column] = row[0]
+    samples["sendercustid"] = samples["custid"]
+    samples["originbranchid"] = samples["branchid"]
+    samples["lastupdated"] = samples["logtimestamps"] = samples["invoicedate"] = \
+        datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return samples
+
+def handler_reads(cursor):
+    cursor.execute("SHOW SESSION STATUS LIKE 'Handler_read%'")
+    return sum(int(value) for name, value in cursor.fetchall() if name in HANDLER_READS)
+
+def measure(cursor, sql, params, repeat):
+    """(latencies in seconds, rows returned, rows read by the last run)."""
+    cursor.execute(sql, params)  # warm-up: buffer pool, plan cache
+    cursor.fetchall()
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        latencies.append(time.perf_counter() - started)
+    # SHOW STATUS reads a few rows itself; measure that and subtract it
+    before = handler_reads(cursor)
+    overhead = handler_reads(cursor) - before
+    before = handler_reads(cursor)
+    cursor.execute(sql, params)
+    cursor.fetchall()
+    return np.array(latencies), len(rows), handler_reads(cursor) - before - overhead
+
+def run(conn, repeat):
+    cursor = conn.cursor()
+    for setting in (f"SET SESSION max_execution_time = {STATEMENT_TIMEOUT * 1000}",   # MySQL
+                    f"SET SESSION max_statement_time = {STATEMENT_TIMEOUT}"):         # MariaDB
+        try:
+            cursor.execute(setting)
+        except Exception:
+            pass
+    samples = pick_samples(cursor)
+    results = {}
+    for location, sql in view_queries(VIEW_FILES):
+        if not sql.lstrip().upper().startswith("SELECT"):
+            continue
+        entry = {"location": location, "sql": sql}
+        try:
+            latencies, returned, read = measure(cursor, sql, sample_params(sql, samples), repeat)
+            entry.update({
+                "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 3),
+                "p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 3),
+                "min_ms": round(float(latencies.min()) * 1000, 3),
+                "rows_returned": returned,
+                "rows_read": read,
+            })
+        except Exception as e:
+            entry["error"] = str(e)
+        results[normalize(sql)] = entry
+        print(_line(entry))
+    cursor.close()
+    return results, samples
+
+def table_rows(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT TABLE_NAME, TABLE_ROWS FROM information_schema.TABLES "
+                   "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_TYPE = 'BASE TABLE'")
+    rows = {name: int(count or 0) for name, count in cursor.fetchall()}
+    cursor.execute("SELECT VERSION()")
+    version = cursor.fetchone()[0]
+    cursor.close()
+    return rows, version
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+def _line(entry):
+    if "error" in entry:
+        return f"{'ERROR':>10}  {entry['location']}: {entry['error']}"
+    return (f"{entry['p50_ms']:>8.2f}ms  p95 {entry['p95_ms']:>8.2f}ms  read {entry['rows_read']:>10,}  "
+            f"out {entry['rows_returned']:>6,}  {entry['location']}")
+
+def compare(current, baseline, tolerance=TOLERANCE):
+    """Prints changes against a baseline run; returns the number of regressions."""
+    regressions = 0
+    for key, entry in current.items():
+        base = baseline.get(key)
+        if base is None or "error" in base:
+            print(f"{'new':>10}  {entry['location']}")
+            continue
+        if "error" in entry:
+            print(f"{'BROKEN':>10}  {entry['location']}: {entry['error']}")
+            regressions += 1
+            continue
+        slower = entry["p50_ms"] > base["p50_ms"] * (1 + tolerance) and \
+            entry["p50_ms"] - base["p50_ms"] >= MIN_DELTA_MS
+        more_rows = entry["rows_read"] > base["rows_read"] * (1 + tolerance) and \
+            entry["rows_read"] - base["rows_read"] >= MIN_DELTA_ROWS
+        if slower or more_rows:
+            regressions += 1
+            print(f"{'REGRESSED':>10}  {entry['location']}: p50 {base['p50_ms']:.2f} -> {entry['p50_ms']:.2f} ms, "
+                  f"rows read {base['rows_read']:,} -> {entry['rows_read']:,}")
+        elif entry["p50_ms"] < base["p50_ms"] * (1 - tolerance) and base["p50_ms"] - entry["p50_ms"] >= MIN_DELTA_MS:
+            print(f"{'faster':>10}  {entry['location']}: p50 {base['p50_ms']:.2f} -> {entry['p50_ms']:.2f} ms")
+    for key in baseline.keys() - current.keys():
+        print(f"{'gone':>10}  {baseline[key]['location']}")
+    return regressions
+
+def main():
+    parser = base_parser("Benchmark every SELECT in the admin, customer and guest views.")
+    parser.add_argument("--repeat", type=int, default=10, help="timed runs per query")
+    parser.add_argument("--out", help="write the results as JSON")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON of an earlier run; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="allowed slowdown, 0.25 = 25%%")
+    args = parser.parse_args()
+
+    conn = connect(args)
+    try:
+        tables, version = table_rows(conn)
+        queries, samples = run(conn, args.repeat)
+    finally:
+        conn.close()
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "git": git_commit(),
+        "server": version,
+        "repeat": args.repeat,
+        "tables": tables,
+        "samples": {k: str(v) for k, v in samples.items()},
+        "queries": queries,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"results written to {args.out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("tables") and tables:
+            print(f"baseline: {baseline.get('git')} on {baseline.get('server')}, "
+                  f"{baseline['tables'].get('Cargos', 0):,} cargos (now {tables.get('Cargos', 0):,})")
+        regressions = compare(queries, baseline["queries"], args.tolerance)
+        print(f"{regressions} regression{'' if regressions == 1 else 's'}")
+        sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import re
+import sys
+from scripts.common import base_parser, connect, sample_params, view_queries
+
+# Runs EXPLAIN for every query in views/*.py and fails if any of them reads a
+# large table with a full table scan.
+#   python -m scripts.check_indexes [--host ... --database ...]
+# Run it against a realistically sized database (see the data generator):
+# on the 15-row sample data MySQL happily scans everything.
+
+# Small, bounded lookup tables that may be scanned without harm. Employees is read whole on
+# purpose by the employee directory (services.employees.DIRECTORY_SQL, once per process).
+SCAN_ALLOWED = {"cargostatustype", "servicetypes", "employeeroles", "cargobranches", "branchcargosummary",
+                "employees"}
+
+def check(conn, verbose=False):
+    cursor = conn.cursor(dictionary=True)
+    failures = 0
+    for location, sql in view_queries():
+        params = sample_params(sql)
+        try:
+            cursor.execute("EXPLAIN " + sql, params)
+            plan = cursor.fetchall()
+        except Exception as e:
+            print(f"ERROR {location}: {e}")
+            failures += 1
+            continue
+
+        bad = [
+            row for row in plan
+            if row.get("type") == "ALL"
+            and row.get("table")
+            and not row["table"].startswith("<")
+            and row["table"].lower() not in SCAN_ALLOWED
+        ]
+        # EXPLAIN shows aliases; map them back to table names through the query text
+        bad = [row for row in bad if _real_table(sql, row["table"]).lower() not in SCAN_ALLOWED]
+        status = "FULL SCAN" if bad else "ok"
+        if bad:
+            failures += 1
+        if bad or verbose:
+            print(f"{status:9} {location}")
+            print(f"          {sql[:140]}")
+            for row in plan:
+                print(f"          - {row.get('table')}: type={row.get('type')} key={row.get('key')} rows={row.get('rows')}")
+    cursor.close()
+    return failures
+
+def _real_table(sql, alias):
+    match = re.search(r"(?:FROM|JOIN)\s+`?(\w+)`?\s+(?:AS\s+)?" + re.escape(alias) + r"\b", sql, re.IGNORECASE)
+    return match.group(1) if match else alias
+
+if __name__ == "__main__":
+    parser = base_parser("EXPLAIN every query used in views/*.py and flag full table scans.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print the plan of every query")
+    args = parser.parse_args()
+    conn = connect(args)
+    try:
+        failures = check(conn, verbose=args.verbose)
+    finally:
+        conn.close()
+    print(f"{failures} quer{'y' if failures == 1 else 'ies'} without index access")
+    sys.exit(1 if failures else 0)
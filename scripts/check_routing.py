@@ -0,0 +1,46 @@
+import argparse
+import sys
+from collections import Counter
+from database import get_router, read_your_writes, run_query
+
+# Read/write splitting check against the servers in .streamlit/secrets.toml
+# (primary + [mysql] replicas = ["127.0.0.1:3307"]). Probes every replica, shows where
+# SELECTs land, and verifies a session reads its own write from the primary.
+#   python -m scripts.check_routing --reads 20
+
+SERVER_SQL = "SELECT @@hostname AS Host, @@port AS Port"
+
+def main():
+    parser = argparse.ArgumentParser(description="Check replica health and read/write routing.")
+    parser.add_argument("--reads", type=int, default=20)
+    args = parser.parse_args()
+
+    router = get_router()
+    if not router.replicas:
+        print("No replicas configured: every query goes to the primary.")
+    for replica in router.replicas:
+        router.check(replica)
+        state = "healthy" if replica.healthy else f"DOWN ({replica.last_error})"
+        print(f"{replica.name:30} {state}, lag {replica.lag if replica.lag is not None else 'n/a'}")
+
+    landed = Counter()
+    for _ in range(args.reads):
+        row = run_query(SERVER_SQL)[0]
+        landed[f"{row['Host']}:{row['Port']}"] += 1
+    print("reads by server: " + ", ".join(f"{k}={v}" for k, v in landed.most_common()))
+
+    # A write that changes nothing still makes the session sticky
+    session = {}
+    with read_your_writes(session):
+        run_query("UPDATE IdCounters SET NextValue = NextValue WHERE TableName = %s", ("",))
+        endpoint = router.for_read()
+    ok = endpoint is router.primary
+    print(f"read after own write -> {endpoint.name}: {'ok' if ok else 'FAILED'}")
+
+    for stats in router.stats():
+        print(f"{stats['endpoint']:30} queries {stats['queries']:>5}  errors {stats['errors']:>3}  "
+              f"failovers {stats['failovers']:>3}  p50 {stats['p50_ms']} ms  p95 {stats['p95_ms']} ms")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import argparse
+import ast
+import glob
+import os
+import re
+import mysql.connector
+
+# Shared helpers for the maintenance scripts in this package.
+# Run them from the project root, e.g. `python -m scripts.check_indexes`.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def add_connection_args(parser):
+    """Connection flags; anything left out falls back to .streamlit/secrets.toml."""
+    group = parser.add_argument_group("database")
+    group.add_argument("--host")
+    group.add_argument("--port", type=int)
+    group.add_argument("--user")
+    group.add_argument("--password")
+    group.add_argument("--database")
+    return parser
+
+def connect(args, **kwargs):
+    config = {}
+    if not all([args.host, args.user, args.database]):
+        import streamlit as st
+        config.update({k: st.secrets["mysql"][k] for k in ("host", "user", "password", "database")})
+    for key in ("host", "port", "user", "password", "database"):
+        value = getattr(args, key, None)
+        if value is not None:
+            config[key] = value
+    config.update(kwargs)
+    return mysql.connector.connect(**config)
+
+# VIEW QUERY CATALOG
+
+_STATEMENT_RE = re.compile(r"^\s*(SELECT\b[\s\S]*\bFROM\b|UPDATE\s+\w+\s+SET\b|DELETE\s+FROM\b)", re.IGNORECASE)
+
+# Queries the views assemble at runtime, so they never appear as one literal.
+DYNAMIC_QUERIES = [
+    ("views/admin.py:fetch_shipments_page",
+     "SELECT c.CargoID, c.CurrentStatus, c.ShippingCost, c.LastUpdated FROM Cargos c "
+     "WHERE c.OriginBranchID = %s AND (c.LastUpdated < %s OR (c.LastUpdated = %s AND c.CargoID < %s)) "
+     "ORDER BY c.LastUpdated DESC, c.CargoID DESC LIMIT %s"),
+    ("services/employees.py:fetch_employee_page",
+     "SELECT e.EmployeeID, e.EmployeeName, e.EmployeeLastName, e.EmployeeNumber, e.Username, r.RoleName, "
+     "b.BranchName, e.Salary, e.HireDate, e.LastLogin, CAST(e.IsActive AS UNSIGNED) AS IsActive FROM Employees e "
+     "LEFT JOIN EmployeeRoles r ON r.RoleID = e.RoleID LEFT JOIN CargoBranches b ON b.BranchID = e.BranchID "
+     "WHERE e.BranchID = %s AND e.RoleID = %s AND e.IsActive = 1 AND e.EmployeeID < %s "
+     "ORDER BY e.EmployeeID DESC LIMIT %s"),
+    ("services/employees.py:delete_employee",
+     "SELECT 1 AS Found FROM TrackingLog WHERE EmployeeID = %s LIMIT 1"),
+    ("services/employees.py:delete_employee",
+     "SELECT 1 AS Found FROM TrackingLogArchive WHERE EmployeeID = %s LIMIT 1"),
+    # Analytics page, as built for a service filter / the default revenue-by-origin breakdown
+    ("services/analytics.py:daily_totals_query",
+     "SELECT Day, SUM(CargoCount) AS CargoCount, SUM(ShippingRevenue) AS ShippingRevenue, "
+     "SUM(InvoiceCount) AS InvoiceCount, SUM(InvoicedAmount) AS InvoicedAmount, SUM(TotalWeight) AS TotalWeight "
+     "FROM CargoDailyFacts WHERE Day >= %s AND Day < %s AND ServiceTypeID IN (%s) GROUP BY Day ORDER BY Day"),
+    ("services/analytics.py:breakdown_query",
+     "SELECT f.Day, f.OriginBranchID AS Slice, SUM(f.ShippingRevenue) AS Value FROM CargoDailyFacts f "
+     "JOIN (SELECT OriginBranchID AS Slice FROM CargoDailyFacts WHERE Day >= %s AND Day < %s "
+     "GROUP BY OriginBranchID ORDER BY SUM(ShippingRevenue) DESC LIMIT %s) ranked ON ranked.Slice = f.OriginBranchID "
+     "WHERE f.Day >= %s AND f.Day < %s GROUP BY f.Day, f.OriginBranchID ORDER BY f.Day"),
+    ("services/analytics.py:lanes_query",
+     "SELECT OriginBranchID, DestBranchID, SUM(ShippingRevenue) AS Value FROM CargoDailyFacts "
+     "WHERE Day >= %s AND Day < %s GROUP BY OriginBranchID, DestBranchID ORDER BY Value DESC LIMIT %s"),
+]
+
+# Modules whose literal queries run on page views (services.tracking backs the public tracking page,
+# services.change_feed polls on behalf of every open live view, services.employees backs Employee Management,
+# services.branches loads the branch locator's in-memory index).
+VIEW_MODULES = ("views/*.py", "services/tracking.py", "services/change_feed.py", "services/employees.py",
+                "services/branches.py")
+
+def view_queries(patterns=VIEW_MODULES):
+    """Yields (location, sql) for every SELECT/UPDATE/DELETE literal in the view modules."""
+    paths = sorted({p for pattern in patterns for p in glob.glob(os.path.join(ROOT, pattern))})
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), path)
+        rel = os.path.relpath(path, ROOT).replace(os.sep, "/")
+        # f-string fragments are only pieces of a query, see DYNAMIC_QUERIES
+        fragments = {id(part) for node in ast.walk(tree) if isinstance(node, ast.JoinedStr) for part in node.values}
+        found = [
+            node for node in ast.walk(tree)
+            if isinstance(node, ast.Constant) and isinstance(node.value, str)
+            and id(node) not in fragments and _STATEMENT_RE.match(node.value)
+        ]
+        for node in sorted(found, key=lambda n: n.lineno):
+            # "IN ({})" is filled with one %s per value at runtime; one is enough for EXPLAIN
+            yield f"{rel}:{node.lineno}", " ".join(node.value.split()).replace("{}", "%s")
+    for location, sql in DYNAMIC_QUERIES:
+        yield location, sql
+
+# Representative values for %s placeholders, chosen by the column they are compared with.
+SAMPLE_VALUES = {
+    "cargoid": "CG001",
+    "custid": "CU001",
+    "sendercustid": "CU001",
+    "receivercustid": "CU001",
+    "branchid": "BR001",
+    "originbranchid": "BR001",
+    "destbranchid": "BR004",
+    "employeeid": "EM001",
+    "roleid": "RL002",
+    "manifestid": "MN001",
+    "statusid": "ST005",
+    "currentstatus": "In Transit",
+    "paymentstatus": "Pending",
+    "lastupdated": "2023-10-29 00:00:00",
+    "logtimestamps": "2023-10-29 00:00:00",
+    "logseq": 0,
+    "invoicedate": "2023-10-29 00:00:00",
+    "day": ("2023-10-01", "2023-11-01"),   # (lower, upper) bound of a range
+    "servicetypeid": "SV001",
+}
+_BEFORE_PLACEHOLDER = [
+    re.compile(r"(\w+)\s*(=|<>|!=|<=|>=|<|>)\s*$"),
+    re.compile(r"(\w+)\s+IN\s*\([^)]*$", re.IGNORECASE),
+    re.compile(r"(LIMIT)\s+$", re.IGNORECASE),
+]
+
+def sample_params(sql, samples=None):
+    """Guesses a realistic parameter tuple for a %s-style query."""
+    samples = samples or SAMPLE_VALUES
+    params = []
+    for match in re.finditer(r"%s", sql):
+        before = sql[:match.start()]
+        column = operator = None
+        for pattern in _BEFORE_PLACEHOLDER:
+            found = pattern.search(before)
+            if found:
+                column = found.group(1).lower()
+                operator = found.group(2) if found.re.groups > 1 else None
+                break
+        if column == "limit":
+            params.append(50)
+            continue
+        value = samples.get(column, "X")
+        if isinstance(value, tuple):
+            value = value[1] if operator in ("<", "<=") else value[0]
+        params.append(value)
+    return tuple(params)
+
+def base_parser(description):
+    return add_connection_args(argparse.ArgumentParser(description=description))
@@ -0,0 +1,403 @@
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from scripts.common import base_parser, connect
+from services.pricing import Tariffs, quote
+from services.analytics import refresh_cube
+from services.summaries import rebuild_summaries
+
+# Seeded synthetic data for load tests and benchmarks (scripts.bench_views, check_indexes).
+# Branches, employees, customers, cargos with their TrackingLog history and invoices are
+# generated chunk by chunk with NumPy and bulk loaded with LOAD DATA LOCAL INFILE.
+#   python -m scripts.generate_data --scale small             (~100k cargos)
+#   python -m scripts.generate_data --scale large --seed 7    (10k branches, 10M cargos, ~50M events)
+# IDs are 12 characters wide since migrations/014_widen_ids.sql (run python migrate.py first)
+
+SCALES = {
+    # branches, customers, cargos
+    "small": (100, 10_000, 100_000),
+    "medium": (1_000, 200_000, 1_000_000),
+    "large": (10_000, 2_000_000, 10_000_000),
+}
+CHUNK = 100_000          # cargos generated and loaded per transaction
+INSERT_BATCH = 1000      # rows per multi-row INSERT with --method insert
+EMPLOYEES_PER_BRANCH = 4
+
+# City -> (relative weight, pricing zone, districts); zones as in migrations/006_tariffs.sql
+CITIES = {
+    "Istanbul": (15.8, "ZN001", ["Kadikoy", "Besiktas", "Maslak", "Uskudar", "Bakirkoy", "Sisli"]),
+    "Ankara": (5.8, "ZN003", ["Cankaya", "Kecioren", "Yenimahalle"]),
+    "Izmir": (4.5, "ZN002", ["Konak", "Karsiyaka", "Bornova"]),
+    "Bursa": (3.2, "ZN001", ["Nilufer", "Osmangazi", "Yildirim"]),
+    "Antalya": (2.7, "ZN004", ["Muratpasa", "Konyaalti", "Kepez"]),
+    "Konya": (2.3, "ZN003", ["Selcuklu", "Meram", "Karatay"]),
+    "Adana": (2.3, "ZN004", ["Seyhan", "Cukurova", "Yuregir"]),
+    "Gaziantep": (2.1, "ZN006", ["Sehitkamil", "Sahinbey"]),
+    "Kayseri": (1.4, "ZN003", ["Melikgazi", "Kocasinan"]),
+    "Samsun": (1.4, "ZN005", ["Atakum", "Ilkadim"]),
+    "Mugla": (1.0, "ZN002", ["Bodrum", "Fethiye", "Marmaris"]),
+    "Eskisehir": (0.9, "ZN003", ["Odunpazari", "Tepebasi"]),
+    "Trabzon": (0.8, "ZN005", ["Ortahisar", "Akcaabat"]),
+}
+FIRST_NAMES = ["Ahmet", "Mehmet", "Mustafa", "Ali", "Huseyin", "Hasan", "Ibrahim", "Emre", "Burak", "Can",
+               "Ayse", "Fatma", "Emine", "Hatice", "Zeynep", "Elif", "Merve", "Selin", "Deniz", "Ece"]
+LAST_NAMES = ["Yilmaz", "Kaya", "Demir", "Sahin", "Celik", "Yildiz", "Yildirim", "Ozturk", "Aydin", "Ozdemir",
+              "Arslan", "Dogan", "Kilic", "Aslan", "Cetin", "Kara", "Koc", "Kurt", "Ozkan", "Simsek"]
+# City centre (latitude, longitude); branches are scattered around it
+CITY_CENTERS = {
+    "Istanbul": (41.0082, 28.9784), "Ankara": (39.9334, 32.8597), "Izmir": (38.4237, 27.1428),
+    "Bursa": (40.1885, 29.0610), "Antalya": (36.8969, 30.7133), "Konya": (37.8746, 32.4932),
+    "Adana": (37.0000, 35.3213), "Gaziantep": (37.0662, 37.3833), "Kayseri": (38.7312, 35.4787),
+    "Samsun": (41.2867, 36.3300), "Mugla": (37.2153, 28.3636), "Eskisehir": (39.7767, 30.5206),
+    "Trabzon": (41.0015, 39.7178),
+}
+BRANCH_SPREAD_DEG = 0.08   # ~9 km standard deviation around the city centre
+STREETS = ["Ataturk Cad.", "Cumhuriyet Cad.", "Istiklal Cad.", "Lale Sok.", "Gul Sok.", "Inonu Bulv."]
+
+# Main path of a parcel and the mean hours spent before each next step
+PATH = np.array(["ST001", "ST003", "ST005", "ST008", "ST009", "ST010"], dtype=object)
+STEP_HOURS = [6, 10, 20, 8, 5]
+AT_ORIGIN = 3            # the first three events are scanned at the origin branch
+RETURNED, LOST = 0.015, 0.004   # share of finished parcels ending Returned to Sender / Lost in Transit
+PAYMENT_TYPES = (["Credit Card", "Cash", "Bank Transfer", "Sender Pays", "Receiver Pays"],
+                 [0.45, 0.2, 0.1, 0.15, 0.1])
+EMPLOYEE_ROLES = ["RL002", "RL004", "RL005", "RL009"]  # branch manager, desk, courier, warehouse
+
+# IDS
+
+def reserve(conn, table, count):
+    """Takes `count` numbers from IdCounters (own commit). Returns (first, prefix, width)."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT NextValue, Prefix, Width, MaxLength FROM IdCounters WHERE TableName = %s FOR UPDATE",
+                   (table,))
+    first, prefix, width, max_length = cursor.fetchone()
+    if first + count - 1 >= 10 ** width or len(prefix) + width > max_length:
+        conn.rollback()
+        sys.exit(f"{table}: {count:,} new IDs do not fit after {prefix}{first - 1:0{width}d}; "
+                 f"run python migrate.py first (migrations/014_widen_ids.sql)")
+    cursor.execute("UPDATE IdCounters SET NextValue = NextValue + %s WHERE TableName = %s", (count, table))
+    conn.commit()
+    cursor.close()
+    return first, prefix, width
+
+def format_ids(first, prefix, width, numbers):
+    return np.array([f"{prefix}{n:0{width}d}" for n in (first + np.asarray(numbers)).tolist()], dtype=object)
+
+def weighted_picker(rng, weights):
+    """Sampler for a fixed discrete distribution: one searchsorted per batch."""
+    cdf = np.cumsum(weights, dtype=np.float64)
+    cdf /= cdf[-1]
+    return lambda n: np.minimum(np.searchsorted(cdf, rng.random(n), side="right"), len(cdf) - 1)
+
+# REFERENCE DATA
+
+def make_branches(rng, n, ids):
+    names = list(CITIES)
+    weights = np.array([CITIES[c][0] for c in names])
+    city = rng.choice(len(names), n, p=weights / weights.sum())
+    cities = np.array(names)[city]
+    districts = np.array([rng.choice(CITIES[c][2]) for c in cities])
+    numbers = np.arange(n)
+    frame = pd.DataFrame({
+        "BranchID": ids,
+        "BranchName": [f"{c} {d} {k}" for c, d, k in zip(cities, districts, numbers)],
+        "BranchNumber": [f"0850{k:07d}" for k in rng.integers(0, 10 ** 7, n)],
+        "BranchEmail": [f"{i.lower()}@thunder.com" for i in ids],
+        "BranchCity": cities,
+        "BranchDistrict": districts,
+        "BranchAddress": [f"{STREETS[s]} No:{k}" for s, k in zip(rng.integers(0, len(STREETS), n),
+                                                                rng.integers(1, 200, n))],
+        "ZoneID": [CITIES[c][1] for c in cities],
+        # Text, so the TSV keeps six decimals (float columns are written with two)
+        "Latitude": [f"{CITY_CENTERS[c][0] + d:.6f}" for c, d in zip(cities, rng.normal(0, BRANCH_SPREAD_DEG, n))],
+        "Longitude": [f"{CITY_CENTERS[c][1] + d:.6f}" for c, d in zip(cities, rng.normal(0, BRANCH_SPREAD_DEG, n))],
+    })
+    # Busy and quiet branches: lognormal volume on top of the city's share
+    volume = weights[city] * rng.lognormal(0, 0.8, n)
+    return frame, city, volume
+
+def make_employees(rng, branch_ids, ids):
+    n = len(ids)
+    branch = np.repeat(branch_ids, EMPLOYEES_PER_BRANCH)
+    role = np.tile(EMPLOYEE_ROLES, len(branch_ids))
+    hire_days = rng.integers(30, 3650, n).astype("timedelta64[D]")
+    return pd.DataFrame({
+        "EmployeeID": ids,
+        "EmployeeName": rng.choice(FIRST_NAMES, n),
+        "EmployeeLastName": rng.choice(LAST_NAMES, n),
+        "EmployeeNumber": [f"555{k:07d}" for k in rng.integers(0, 10 ** 7, n)],
+        "BranchID": branch,
+        "RoleID": role,
+        "Username": [i.lower() for i in ids],
+        "PasswordHash": [f"hash{i.lower()}" for i in ids],
+        "Salary": (np.round(rng.lognormal(10.2, 0.3, n), -2)).astype(int).astype(str),
+        "HireDate": np.datetime64("today", "D") - hire_days,
+    })
+
+def make_customers(rng, ids, numbers, first_name, last_name):
+    n = len(ids)
+    names = list(CITIES)
+    weights = np.array([CITIES[c][0] for c in names])
+    usernames = [i.lower() for i in ids]
+    return pd.DataFrame({
+        "CustID": ids,
+        "FirstName": np.array(FIRST_NAMES)[first_name],
+        "LastName": np.array(LAST_NAMES)[last_name],
+        "CustNumber": [f"9{k:010d}" for k in numbers],
+        "Email": [f"{u}@example.com" for u in usernames],
+        "Address": [f"{STREETS[s]} No:{k}" for s, k in zip(rng.integers(0, len(STREETS), n),
+                                                          rng.integers(1, 200, n))],
+        "Country": "Turkey",
+        "City": np.array(names)[rng.choice(len(names), n, p=weights / weights.sum())],
+        "Username": usernames,
+        "PasswordHash": [f"hash{k}" for k in numbers],
+    })
+
+def load_tariffs(conn, branches):
+    cursor = conn.cursor()
+    cursor.execute("SELECT ZoneID FROM PricingZones ORDER BY ZoneID")
+    zone_ids = [r[0] for r in cursor.fetchall()]
+    index = {z: i for i, z in enumerate(zone_ids)}
+    base_fee = np.full((len(zone_ids), len(zone_ids)), np.nan)
+    per_kg = np.full((len(zone_ids), len(zone_ids)), np.nan)
+    cursor.execute("SELECT OriginZoneID, DestZoneID, BaseFee, PerKg FROM ZoneTariffs")
+    for origin, dest, fee, kg in cursor.fetchall():
+        base_fee[index[origin], index[dest]] = float(fee)
+        per_kg[index[origin], index[dest]] = float(kg)
+    cursor.execute("SELECT ServiceTypeID, Multiplier, Surcharge FROM ServiceTariffs ORDER BY ServiceTypeID")
+    services = cursor.fetchall()
+    cursor.close()
+    return Tariffs(branches["BranchID"], branches["ZoneID"], zone_ids, base_fee, per_kg,
+                   [s[0] for s in services], [float(s[1]) for s in services], [float(s[2]) for s in services])
+
+# CARGOS
+
+class CargoGenerator:
+    def __init__(self, rng, branches, branch_city, branch_volume, employee_ids, customers, tariffs, statuses, days):
+        self.rng = rng
+        self.branch_ids = branches["BranchID"].to_numpy()
+        self.branch_city = branch_city
+        self.employee_ids = employee_ids  # EMPLOYEES_PER_BRANCH per branch, in branch order
+        self.pick_branch = weighted_picker(rng, branch_volume)
+        # Same-city destinations: branches grouped by city, picked by offset into the group
+        self.city_order = np.argsort(branch_city, kind="stable")
+        self.city_start = np.searchsorted(branch_city[self.city_order], np.arange(len(CITIES)))
+        self.city_count = np.bincount(branch_city, minlength=len(CITIES))
+        self.customers = customers
+        # A few customers ship and receive most parcels
+        self.pick_sender = weighted_picker(rng, rng.pareto(1.2, len(customers["ids"])) + 0.05)
+        self.pick_receiver = weighted_picker(rng, rng.lognormal(0, 1.0, len(customers["ids"])))
+        self.tariffs = tariffs
+        self.pick_service = weighted_picker(rng, 1.0 / np.arange(1, len(tariffs.service_ids) + 1) ** 1.3)
+        self.statuses = statuses
+        self.now = np.datetime64("now", "s")
+        self.days = days
+
+    def chunk(self, cargo_ids):
+        rng, n = self.rng, len(cargo_ids)
+        origin = self.pick_branch(n)
+        city = self.branch_city[origin]
+        same_city = (rng.random(n) < 0.35) & (self.city_count[city] > 1)
+        local = self.city_order[self.city_start[city] + (rng.random(n) * self.city_count[city]).astype(int)]
+        dest = np.where(same_city, local, self.pick_branch(n))
+
+        # Creation time: volume grows towards today, parcels handed in during working hours
+        age_days = (self.days * (1 - np.sqrt(rng.random(n)))).astype("timedelta64[D]")
+        hour = np.clip(rng.normal(13, 3, n), 8, 20)
+        created = (self.now.astype("datetime64[D]") - age_days).astype("datetime64[s]") \
+            + (hour * 3600).astype("timedelta64[s]")
+        created = np.minimum(created, self.now - np.timedelta64(60, "s"))
+
+        # Time of every later step; a parcel has reached the steps that lie in the past
+        gaps = rng.exponential(STEP_HOURS, (n, len(STEP_HOURS))) * 3600
+        steps = created[:, None] + np.cumsum(gaps, axis=1).astype("timedelta64[s]")
+        reached = 1 + (steps <= self.now).sum(axis=1)
+        finished = reached == len(PATH)
+        outcome = rng.random(n)
+        final = np.where(finished & (outcome < RETURNED), "ST014",
+                         np.where(finished & (outcome > 1 - LOST), "ST015", PATH[reached - 1]))
+
+        # One TrackingLog row per reached step
+        cargo = np.repeat(np.arange(n), reached)
+        step = np.arange(len(cargo)) - np.repeat(np.cumsum(reached) - reached, reached)
+        times = np.where(step == 0, created[cargo], steps[cargo, np.maximum(step - 1, 0)])
+        status = PATH[step]
+        last = step == reached[cargo] - 1
+        status[last] = final[cargo[last]]
+        at_branch = np.where(step < AT_ORIGIN, origin[cargo], dest[cargo])
+        employee = at_branch * EMPLOYEES_PER_BRANCH + rng.integers(0, EMPLOYEES_PER_BRANCH, len(cargo))
+        delivered = status == "ST010"
+        receiver = self.pick_receiver(n)
+        sender = self.pick_sender(n)
+        receiver_name = np.full(len(cargo), None, dtype=object)
+        receiver_name[delivered] = self.customers["name"][receiver[cargo[delivered]]]
+        relation = np.full(len(cargo), None, dtype=object)
+        relation[delivered] = rng.choice(["Self", "Family", "Neighbor", "Security"], delivered.sum(),
+                                         p=[0.8, 0.1, 0.06, 0.04])
+
+        weight = np.round(rng.lognormal(1.2, 0.9, n), 2) + 0.1
+        length, width, height = (np.round(rng.uniform(5, hi, n)) for hi in (120, 80, 80))
+        service = self.tariffs.service_ids[self.pick_service(n)]
+        cost = quote(weight, length, width, height, self.branch_ids[origin], self.branch_ids[dest], service,
+                     tariffs=self.tariffs)
+        cost = np.where(np.isnan(cost), np.round(40 + 12 * weight, 2), cost)
+        payment = rng.choice(PAYMENT_TYPES[0], n, p=PAYMENT_TYPES[1])
+        paid = rng.random(n) < np.where(np.isin(final, ["ST010", "ST014", "ST015"]), 0.97, 0.6)
+        customer_ids = self.customers["ids"]
+
+        cargos = pd.DataFrame({
+            "CargoID": cargo_ids,
+            "ReceiverCustID": customer_ids[receiver],
+            "SenderCustID": customer_ids[sender],
+            "CargoWeight": weight, "CargoLength": length, "CargoWidth": width, "CargoHeight": height,
+            "ShippingCost": cost,
+            "OriginBranchID": self.branch_ids[origin],
+            "DestBranchID": self.branch_ids[dest],
+            "CurrentStatus": pd.Series(final).map(self.statuses).to_numpy(),
+            "StatusID": final,
+            "LastUpdated": times[last],
+            "PaymentType": payment,
+            "PaymentStatus": np.where(paid, "Paid", "Pending"),
+            "ServiceTypeID": service,
+            "CreatedAt": created,
+        })
+        logs = pd.DataFrame({
+            "TrackID": None,  # numbered by the caller once the row count is known
+            "LogTimestamps": times,
+            "CargoID": cargo_ids[cargo],
+            "BranchID": self.branch_ids[at_branch],
+            "EmployeeID": self.employee_ids[employee],
+            "ReceiverName": receiver_name,
+            "ReceiverRelation": relation,
+            "StatusID": status,
+        })
+        invoices = pd.DataFrame({
+            "InvoiceID": None,
+            "CargoID": cargo_ids,
+            "CustID": np.where(payment == "Receiver Pays", customer_ids[receiver], customer_ids[sender]),
+            "InvoiceDate": created,
+            "TotalAmount": cost,
+        })
+        return cargos, logs, invoices
+
+# LOADING
+
+def load(conn, table, frame, method):
+    cursor = conn.cursor()
+    columns = ", ".join(frame.columns)
+    if method == "load-data":
+        with tempfile.NamedTemporaryFile("w", suffix=".tsv", delete=False, encoding="utf-8", newline="") as f:
+            frame.to_csv(f, sep="\t", header=False, index=False, na_rep="\\N", float_format="%.2f",
+                         date_format="%Y-%m-%d %H:%M:%S")
+        try:
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 "
+                f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({columns})",
+                (f.name,))
+        finally:
+            os.unlink(f.name)
+    else:
+        sql = f"INSERT INTO {table} ({columns}) VALUES ({', '.join(['%s'] * len(frame.columns))})"
+        rows = frame.astype(object).where(frame.notna(), None)
+        for start in range(0, len(rows), INSERT_BATCH):
+            batch = rows.iloc[start:start + INSERT_BATCH]
+            cursor.executemany(sql, list(batch.itertuples(index=False, name=None)))
+    cursor.close()
+    return len(frame)
+
+def main():
+    parser = base_parser("Generate and bulk load a seeded synthetic data set.")
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--branches", type=int)
+    parser.add_argument("--customers", type=int)
+    parser.add_argument("--cargos", type=int)
+    parser.add_argument("--days", type=int, default=365, help="history length")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk", type=int, default=CHUNK, help="cargos per transaction")
+    parser.add_argument("--method", choices=["load-data", "insert"], default="load-data",
+                        help="LOAD DATA LOCAL INFILE (needs local_infile=ON on the server) or multi-row INSERT")
+    args = parser.parse_args()
+    n_branches, n_customers, n_cargos = (
+        override or default for override, default in zip((args.branches, args.customers, args.cargos),
+                                                          SCALES[args.scale]))
+
+    rng = np.random.default_rng(args.seed)
+    conn = connect(args, allow_local_infile=args.method == "load-data")
+    cursor = conn.cursor()
+    # Summary counters are rebuilt once at the end instead of by the per-row triggers
+    cursor.execute("SET unique_checks = 0, foreign_key_checks = 0, @skip_summary_triggers = 1")
+    cursor.execute("SELECT StatusID, StatusDescription FROM CargoStatusType")
+    statuses = dict(cursor.fetchall())
+    started = time.perf_counter()
+
+    def timed(label, table, frame):
+        count = load(conn, table, frame, args.method)
+        conn.commit()
+        print(f"{label:>10}: {count:>12,} rows  ({time.perf_counter() - started:7.1f} s)")
+
+    # Check every ID range before writing anything
+    for table, count in (("CargoBranches", n_branches), ("Employees", n_branches * EMPLOYEES_PER_BRANCH),
+                         ("Customers", n_customers), ("Cargos", n_cargos), ("Invoice", n_cargos),
+                         ("TrackingLog", n_cargos * len(PATH))):
+        cursor.execute("SELECT NextValue, Width FROM IdCounters WHERE TableName = %s", (table,))
+        next_value, width = cursor.fetchone()
+        if next_value + count - 1 >= 10 ** width:
+            sys.exit(f"{table}: {count:,} new IDs need wider IDs; run python migrate.py first (migrations/014_widen_ids.sql)")
+
+    branch_ids = format_ids(*reserve(conn, "CargoBranches", n_branches), np.arange(n_branches))
+    branches, branch_city, branch_volume = make_branches(rng, n_branches, branch_ids)
+    timed("branches", "CargoBranches", branches)
+
+    n_employees = n_branches * EMPLOYEES_PER_BRANCH
+    employee_ids = format_ids(*reserve(conn, "Employees", n_employees), np.arange(n_employees))
+    timed("employees", "Employees", make_employees(rng, branch_ids, employee_ids))
+
+    customer_first = reserve(conn, "Customers", n_customers)
+    customer_ids = format_ids(*customer_first, np.arange(n_customers))
+    first_name = rng.integers(0, len(FIRST_NAMES), n_customers)
+    last_name = rng.integers(0, len(LAST_NAMES), n_customers)
+    for start in range(0, n_customers, args.chunk):
+        part = slice(start, start + args.chunk)
+        timed("customers", "Customers", make_customers(rng, customer_ids[part], customer_first[0] + np.arange(n_customers)[part],
+                                                               first_name[part], last_name[part]))
+
+    full_names = np.array([f"{f} {l}" for f in FIRST_NAMES for l in LAST_NAMES], dtype=object)
+    customers = {"ids": customer_ids, "name": full_names[first_name * len(LAST_NAMES) + last_name]}
+    generator = CargoGenerator(rng, branches, branch_city, branch_volume, employee_ids, customers,
+                               load_tariffs(conn, branches), statuses, args.days)
+    cargo_first = reserve(conn, "Cargos", n_cargos)
+    invoice_first = reserve(conn, "Invoice", n_cargos)
+    events = 0
+    for start in range(0, n_cargos, args.chunk):
+        numbers = np.arange(start, min(start + args.chunk, n_cargos))
+        cargos, logs, invoices = generator.chunk(format_ids(*cargo_first, numbers))
+        logs = logs.sort_values("LogTimestamps", kind="stable")
+        logs["TrackID"] = format_ids(*reserve(conn, "TrackingLog", len(logs)), np.arange(len(logs)))
+        invoices["InvoiceID"] = format_ids(*invoice_first, numbers)
+        load(conn, "Cargos", cargos, args.method)
+        load(conn, "TrackingLog", logs, args.method)
+        load(conn, "Invoice", invoices, args.method)
+        conn.commit()
+        events += len(logs)
+        done = start + len(numbers)
+        elapsed = time.perf_counter() - started
+        print(f"{'cargos':>10}: {done:>12,} / {n_cargos:,}  events {events:,}  "
+              f"({elapsed:7.1f} s, {done / elapsed:,.0f} cargos/s)")
+
+    cursor.execute("SET unique_checks = 1, foreign_key_checks = 1, @skip_summary_triggers = NULL")
+    rebuild_summaries(cursor)
+    conn.commit()
+    cursor.close()
+    cursor = conn.cursor(dictionary=True)
+    refresh_cube(full=True, cursor=cursor)
+    conn.commit()
+    cursor.close()
+    conn.close()
+    print(f"summaries and analytics cube rebuilt; {n_cargos:,} cargos, {events:,} tracking events, "
+          f"{n_cargos:,} invoices in {time.perf_counter() - started:.1f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import argparse
+import time
+from datetime import timedelta
+from database import transaction
+
+# Günlük gelir / hacim küpü (CargoDailyFacts, migration 011): gün x çıkış şubesi x varış şubesi
+# x servis tipi x ödeme tipi. Rollup işi yalnızca son watermark'tan beri değişen günleri
+# yeniden hesaplar; analiz sayfası ham tablolara (Cargos, Invoice) hiç dokunmaz.
+#   python -m services.analytics refresh           (incremental)
+#   python -m services.analytics refresh --full    (every day, e.g. after services.pricing reprice)
+
+WATERMARK = "CargoDailyFacts"
+WATERMARK_OVERLAP = timedelta(minutes=10)  # rows committed late with an earlier timestamp
+RANGE_DAYS = 31                            # days recomputed per transaction
+TOP_SLICES = 8                             # breakdown lines on the analytics page
+
+DIMENSIONS = {"Origin branch": "OriginBranchID", "Destination branch": "DestBranchID",
+              "Service type": "ServiceTypeID", "Payment type": "PaymentType"}
+MEASURES = {"Cargos": "CargoCount", "Shipping revenue": "ShippingRevenue",
+            "Invoiced amount": "InvoicedAmount", "Weight (kg)": "TotalWeight"}
+
+_CARGO_PART = """
+    SELECT DATE(CreatedAt) AS Day, OriginBranchID, DestBranchID, ServiceTypeID, PaymentType,
+           COUNT(*) AS CargoCount, SUM(CargoWeight) AS TotalWeight, SUM(ShippingCost) AS ShippingRevenue,
+           0 AS InvoiceCount, 0 AS InvoicedAmount
+    FROM {cargos} WHERE CreatedAt >= %s AND CreatedAt < %s
+    GROUP BY DATE(CreatedAt), OriginBranchID, DestBranchID, ServiceTypeID, PaymentType"""
+
+_INVOICE_PART = """
+    SELECT DATE(i.InvoiceDate), c.OriginBranchID, c.DestBranchID, c.ServiceTypeID, c.PaymentType,
+           0, 0, 0, COUNT(*), SUM(i.TotalAmount)
+    FROM {invoices} i JOIN {cargos} c ON c.CargoID = i.CargoID
+    WHERE i.InvoiceDate >= %s AND i.InvoiceDate < %s
+    GROUP BY DATE(i.InvoiceDate), c.OriginBranchID, c.DestBranchID, c.ServiceTypeID, c.PaymentType"""
+
+# Archived cargos move together with their invoices, so live and archive are joined separately
+ROLLUP_SQL = """
+INSERT INTO CargoDailyFacts (Day, OriginBranchID, DestBranchID, ServiceTypeID, PaymentType,
+                             CargoCount, TotalWeight, ShippingRevenue, InvoiceCount, InvoicedAmount)
+SELECT Day, OriginBranchID, DestBranchID, ServiceTypeID, PaymentType,
+       SUM(CargoCount), SUM(TotalWeight), SUM(ShippingRevenue), SUM(InvoiceCount), SUM(InvoicedAmount)
+FROM ({parts}
+) parts
+GROUP BY Day, OriginBranchID, DestBranchID, ServiceTypeID, PaymentType
+""".format(parts="\n    UNION ALL".join([
+    _CARGO_PART.format(cargos="Cargos"),
+    _CARGO_PART.format(cargos="CargosArchive"),
+    _INVOICE_PART.format(invoices="Invoice", cargos="Cargos"),
+    _INVOICE_PART.format(invoices="InvoiceArchive", cargos="CargosArchive"),
+]))
+
+TOUCHED_SQL = """
+SELECT DATE(CreatedAt) AS Day FROM Cargos WHERE LastUpdated >= %s
+UNION SELECT DATE(CreatedAt) FROM Cargos WHERE CreatedAt >= %s
+UNION SELECT DATE(InvoiceDate) FROM Invoice WHERE InvoiceDate >= %s
+"""
+
+SPAN_SQL = """
+SELECT DATE(LEAST(COALESCE((SELECT MIN(CreatedAt) FROM Cargos), NOW()),
+                  COALESCE((SELECT MIN(CreatedAt) FROM CargosArchive), NOW()),
+                  COALESCE((SELECT MIN(InvoiceDate) FROM Invoice), NOW()),
+                  COALESCE((SELECT MIN(InvoiceDate) FROM InvoiceArchive), NOW()),
+                  COALESCE((SELECT MIN(Day) FROM CargoDailyFacts), NOW()))) AS First,
+       DATE(GREATEST(COALESCE((SELECT MAX(CreatedAt) FROM Cargos), NOW()),
+                     COALESCE((SELECT MAX(InvoiceDate) FROM Invoice), NOW()),
+                     COALESCE((SELECT MAX(Day) FROM CargoDailyFacts), NOW()), NOW())) AS Last
+"""
+
+def _in_transaction(cursor, fn, *args):
+    """Runs `fn(cursor, *args)` on the caller's cursor, or in a transaction of its own."""
+    if cursor is not None:
+        return fn(cursor, *args)
+    with transaction() as own:
+        return fn(own, *args)
+
+def _read_watermark(cursor):
+    cursor.execute("SELECT NOW() AS Now, (SELECT Watermark FROM RollupWatermarks WHERE Name = %s) AS Watermark",
+                   (WATERMARK,))
+    row = cursor.fetchall()[0]
+    return row['Now'], row['Watermark']
+
+def _write_watermark(cursor, watermark):
+    cursor.execute("""
+        INSERT INTO RollupWatermarks (Name, Watermark) VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE Watermark = VALUES(Watermark), UpdatedAt = NOW()
+    """, (WATERMARK, watermark))
+
+def _touched_days(cursor, since):
+    cursor.execute(TOUCHED_SQL, (since, since, since))
+    return [row['Day'] for row in cursor.fetchall() if row['Day'] is not None]
+
+def _all_days(cursor):
+    cursor.execute(SPAN_SQL)
+    row = cursor.fetchall()[0]
+    return [row['First'] + timedelta(days=i) for i in range((row['Last'] - row['First']).days + 1)]
+
+def day_ranges(days, max_days=RANGE_DAYS):
+    """Days -> sorted [start, end) ranges of consecutive days, each at most `max_days` long."""
+    ranges = []
+    for day in sorted(set(days)):
+        if ranges and ranges[-1][1] == day and (day - ranges[-1][0]).days < max_days:
+            ranges[-1][1] = day + timedelta(days=1)
+        else:
+            ranges.append([day, day + timedelta(days=1)])
+    return [tuple(r) for r in ranges]
+
+def rebuild_days(cursor, start, end):
+    """Replaces the cube rows of the days in [start, end) with a fresh aggregate."""
+    cursor.execute("DELETE FROM CargoDailyFacts WHERE Day >= %s AND Day < %s", (start, end))
+    cursor.execute(ROLLUP_SQL, (start, end) * 4)
+
+def refresh_cube(full=False, cursor=None):
+    """
+    Brings CargoDailyFacts up to date: only the days with cargos / invoices written since
+    the last watermark (all days on the first run or with `full`). On `cursor` if given,
+    otherwise one transaction per range of days so readers always see whole days.
+    """
+    started = time.perf_counter()
+    now, watermark = _in_transaction(cursor, _read_watermark)
+    full = full or watermark is None
+    if full:
+        days = _in_transaction(cursor, _all_days)
+    else:
+        days = _in_transaction(cursor, _touched_days, watermark - WATERMARK_OVERLAP)
+    ranges = day_ranges(days)
+    for start, end in ranges:
+        _in_transaction(cursor, rebuild_days, start, end)
+    _in_transaction(cursor, _write_watermark, now)
+    return {'full': full, 'days': len(days), 'ranges': len(ranges), 'watermark': now,
+            'seconds': time.perf_counter() - started}
+
+# ANALYTICS PAGE QUERIES (cube only; (sql, params) pairs for run_queries)
+
+def _where(date_from, date_to, services, alias=""):
+    where, params = [f"{alias}Day >= %s", f"{alias}Day < %s"], [date_from, date_to + timedelta(days=1)]
+    if services:
+        where.append(f"{alias}ServiceTypeID IN ({', '.join(['%s'] * len(services))})")
+        params.extend(services)
+    return " AND ".join(where), params
+
+def daily_totals_query(date_from, date_to, services=()):
+    where, params = _where(date_from, date_to, services)
+    return f"""
+        SELECT Day, SUM(CargoCount) AS CargoCount, SUM(ShippingRevenue) AS ShippingRevenue,
+               SUM(InvoiceCount) AS InvoiceCount, SUM(InvoicedAmount) AS InvoicedAmount,
+               SUM(TotalWeight) AS TotalWeight
+        FROM CargoDailyFacts WHERE {where}
+        GROUP BY Day ORDER BY Day
+    """, tuple(params)
+
+def breakdown_query(date_from, date_to, measure, dimension, services=(), top=TOP_SLICES):
+    """Daily `measure` of the `top` values of `dimension` (by their total over the period)."""
+    where, params = _where(date_from, date_to, services)
+    outer_where, _ = _where(date_from, date_to, services, alias="f.")
+    return f"""
+        SELECT f.Day, f.{dimension} AS Slice, SUM(f.{measure}) AS Value
+        FROM CargoDailyFacts f
+        JOIN (SELECT {dimension} AS Slice FROM CargoDailyFacts WHERE {where}
+              GROUP BY {dimension} ORDER BY SUM({measure}) DESC LIMIT %s) ranked ON ranked.Slice = f.{dimension}
+        WHERE {outer_where}
+        GROUP BY f.Day, f.{dimension} ORDER BY f.Day
+    """, tuple(params) + (top,) + tuple(params)
+
+def lanes_query(date_from, date_to, measure, services=(), top=15):
+    where, params = _where(date_from, date_to, services)
+    return f"""
+        SELECT OriginBranchID, DestBranchID, SUM({measure}) AS Value
+        FROM CargoDailyFacts WHERE {where}
+        GROUP BY OriginBranchID, DestBranchID ORDER BY Value DESC LIMIT %s
+    """, tuple(params) + (top,)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Thunder Cargo analytics rollups.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rp = sub.add_parser("refresh", help="update the daily cube (CargoDailyFacts) from Cargos and Invoice")
+    rp.add_argument("--full", action="store_true", help="recompute every day instead of the touched ones")
+    args = parser.parse_args()
+    report = refresh_cube(full=args.full)
+    print(f"{'Rebuilt' if report['full'] else 'Refreshed'} {report['days']} days in {report['ranges']} "
+          f"transactions, {report['seconds']:.1f}s; watermark {report['watermark']}")
@@ -0,0 +1,179 @@
+import argparse
+import time
+from datetime import date, datetime, timedelta
+from database import run_query, transaction
+
+# Arşivleme: teslim edilmiş / iade / kayıp (IsTerminal) ve ARCHIVE_AGE_DAYS'ten eski kargolar,
+# hareketleri, faturaları ve manifest satırlarıyla birlikte *Archive tablolarına taşınır
+# (migration 010). Her parti tek transaction'dır; takip sorguları arşive düşer (services.tracking).
+# TrackingLog aylık bölümlenmiştir: gelecek aylar eklenir, boşalan eski aylar silinir.
+#   python -m services.archive run --days 180 --dry-run
+#   python -m services.archive partitions
+
+ARCHIVE_AGE_DAYS = 180
+ARCHIVE_BATCH = 1000
+MONTHS_AHEAD = 3
+
+# (live, archive) in insert order; rows are deleted in reverse (children before Cargos)
+ARCHIVE_TABLES = (
+    ("Cargos", "CargosArchive"),
+    ("TrackingLog", "TrackingLogArchive"),
+    ("Invoice", "InvoiceArchive"),
+    ("ManifestCargo", "ManifestCargoArchive"),
+)
+
+PARTITIONS_SQL = """
+SELECT PARTITION_NAME AS Name, PARTITION_DESCRIPTION AS Bound, TABLE_ROWS AS Estimate
+FROM information_schema.PARTITIONS
+WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'TrackingLog' AND PARTITION_NAME IS NOT NULL
+ORDER BY PARTITION_ORDINAL_POSITION
+"""
+
+def terminal_statuses(cursor):
+    # Kilitlenen sorguda JOIN yerine ID listesi: CargoStatusType satırları FOR UPDATE ile
+    # kilitlenirse her TrackingLog / Cargos yazımının FK kontrolü partiyi beklerdi.
+    cursor.execute("SELECT StatusID FROM CargoStatusType WHERE IsTerminal = 1")
+    return [row['StatusID'] for row in cursor.fetchall()]
+
+def _candidates(cursor, statuses, cutoff, after, limit, lock):
+    where = [f"StatusID IN ({', '.join(['%s'] * len(statuses))})", "LastUpdated < %s"]
+    params = list(statuses) + [cutoff]
+    if after:
+        where.append("(LastUpdated > %s OR (LastUpdated = %s AND CargoID > %s))")
+        params.extend([after[0], after[0], after[1]])
+    cursor.execute(f"""
+        SELECT CargoID, LastUpdated FROM Cargos
+        WHERE {' AND '.join(where)}
+        ORDER BY LastUpdated, CargoID LIMIT %s {'FOR UPDATE' if lock else ''}
+    """, tuple(params) + (limit,))
+    return cursor.fetchall()
+
+def _move(cursor, cargo_ids, moved):
+    marks = ", ".join(["%s"] * len(cargo_ids))
+    for live, archived in ARCHIVE_TABLES:
+        cursor.execute(f"INSERT INTO {archived} SELECT * FROM {live} WHERE CargoID IN ({marks})", cargo_ids)
+        moved[live] += cursor.rowcount
+    for live, _ in reversed(ARCHIVE_TABLES):
+        cursor.execute(f"DELETE FROM {live} WHERE CargoID IN ({marks})", cargo_ids)
+
+def archive(older_than_days=ARCHIVE_AGE_DAYS, batch_size=ARCHIVE_BATCH, dry_run=False, max_batches=None):
+    """
+    Moves finished cargos whose LastUpdated is older than `older_than_days` into the archive
+    tables, `batch_size` cargos per transaction, walking Cargos by (LastUpdated, CargoID).
+    BranchCargoSummary / CustomerStats keep counting archived cargos (their triggers are
+    skipped for the move; services.summaries rebuilds from live + archive).
+    """
+    started = time.perf_counter()
+    cutoff = datetime.now() - timedelta(days=older_than_days)
+    moved = {live: 0 for live, _ in ARCHIVE_TABLES}
+    batches = 0
+    after = None
+    while max_batches is None or batches < max_batches:
+        with transaction() as cursor:
+            statuses = terminal_statuses(cursor)
+            if not statuses:
+                break
+            rows = _candidates(cursor, statuses, cutoff, after, batch_size, lock=not dry_run)
+            if not rows:
+                break
+            after = (rows[-1]['LastUpdated'], rows[-1]['CargoID'])
+            if dry_run:
+                moved["Cargos"] += len(rows)
+            else:
+                # Session variable outlives the transaction on a pooled connection
+                cursor.execute("SET @skip_summary_triggers = 1")
+                try:
+                    _move(cursor, [row['CargoID'] for row in rows], moved)
+                finally:
+                    cursor.execute("SET @skip_summary_triggers = NULL")
+        batches += 1
+        if len(rows) < batch_size:
+            break
+
+    seconds = time.perf_counter() - started
+    return {'cutoff': cutoff, 'batches': batches, 'moved': moved, 'dry_run': dry_run, 'seconds': seconds}
+
+def _month(value):
+    return date(value.year, value.month, 1)
+
+def _next_month(value):
+    return date(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+def _bound(description):
+    """Upper bound of a RANGE COLUMNS partition as a date, None for MAXVALUE."""
+    text = str(description or "").strip("'\" ")
+    return None if text.upper() == "MAXVALUE" else datetime.strptime(text[:10], "%Y-%m-%d").date()
+
+def list_partitions():
+    """TrackingLog partitions as dicts (Name, Bound, Estimate); empty if it is not partitioned."""
+    return run_query(PARTITIONS_SQL) or []
+
+def ensure_partitions(months_ahead=MONTHS_AHEAD):
+    """Splits pmax so that every month up to `months_ahead` from now has its own partition."""
+    parts = list_partitions()
+    bounds = [_bound(p['Bound']) for p in parts]
+    if not parts or bounds[-1] is not None:
+        return []
+    last = max((b for b in bounds if b is not None), default=_month(date.today()))
+    target = _month(date.today())
+    for _ in range(months_ahead + 1):
+        target = _next_month(target)
+    added = []
+    while last < target:
+        # Partition p202405 holds May 2024: its bound is the first day of June
+        added.append(f"PARTITION p{last.strftime('%Y%m')} "
+                     f"VALUES LESS THAN ('{_next_month(last).isoformat()}')")
+        last = _next_month(last)
+    if added:
+        with transaction() as cursor:
+            cursor.execute(f"ALTER TABLE TrackingLog REORGANIZE PARTITION pmax INTO "
+                           f"({', '.join(added)}, PARTITION pmax VALUES LESS THAN (MAXVALUE))")
+    return added
+
+def drop_empty_partitions(older_than_days=ARCHIVE_AGE_DAYS):
+    """Drops month partitions that end before the archive cutoff and hold no rows any more."""
+    cutoff = (datetime.now() - timedelta(days=older_than_days)).date()
+    dropped = []
+    with transaction() as cursor:
+        for part in list_partitions():
+            bound = _bound(part['Bound'])
+            if bound is None or bound > cutoff:
+                continue
+            cursor.execute(f"SELECT 1 AS Found FROM TrackingLog PARTITION ({part['Name']}) LIMIT 1")
+            if cursor.fetchall():
+                continue
+            cursor.execute(f"ALTER TABLE TrackingLog DROP PARTITION {part['Name']}")
+            dropped.append(part['Name'])
+    return dropped
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Thunder Cargo archiving jobs.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rp = sub.add_parser("run", help="archive finished cargos, then maintain the TrackingLog partitions")
+    rp.add_argument("--days", type=int, default=ARCHIVE_AGE_DAYS, help="archive cargos finished before this many days")
+    rp.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH)
+    rp.add_argument("--max-batches", type=int, help="stop after this many batches (spread over several runs)")
+    rp.add_argument("--dry-run", action="store_true", help="only count the cargos that would be archived")
+    pp = sub.add_parser("partitions", help="list TrackingLog partitions, add coming months, drop emptied ones")
+    pp.add_argument("--days", type=int, default=ARCHIVE_AGE_DAYS)
+    pp.add_argument("--months-ahead", type=int, default=MONTHS_AHEAD)
+    args = parser.parse_args()
+
+    if args.command == "run":
+        report = archive(args.days, args.batch_size, args.dry_run, args.max_batches)
+        moved = report['moved']
+        print(f"{'Would archive' if report['dry_run'] else 'Archived'} {moved['Cargos']} cargos finished before "
+              f"{report['cutoff']:%Y-%m-%d}" + ("" if report['dry_run'] else
+              f" ({moved['TrackingLog']} tracking rows, {moved['Invoice']} invoices, "
+              f"{moved['ManifestCargo']} manifest lines)") + f" in {report['batches']} batches, {report['seconds']:.1f}s")
+        if report['dry_run']:
+            raise SystemExit(0)
+        months_ahead = MONTHS_AHEAD
+    else:
+        months_ahead = args.months_ahead
+    added = ensure_partitions(months_ahead)
+    dropped = drop_empty_partitions(args.days)
+    print(f"Partitions added: {', '.join(added) or '-'}; dropped: {', '.join(dropped) or '-'}")
+    if args.command == "partitions":
+        for part in list_partitions():
+            print(f"{part['Name']:10} < {part['Bound']:24} ~{int(part['Estimate'] or 0):,} rows")
@@ -0,0 +1,130 @@
+import re
+import numpy as np
+from database import run_query, cached
+
+# Şube bulucu: tüm şubeler süreç başına bir kez belleğe alınır (CargoBranches yazılınca
+# yeniden kurulur). Koordinatı olan şubeler enlem/boylam ızgara hücrelerine dağıtılır;
+# en yakın k şube, yalnızca çevredeki hücrelerin adaylarına vektörel haversine ile bulunur.
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = np.pi * EARTH_RADIUS_KM / 180
+CELL_DEG = 0.25          # grid cell edge (~28 km north-south)
+BRUTE_FORCE_BELOW = 256  # fewer branches: one vectorized pass over all of them is faster
+
+BRANCHES_SQL = """
+SELECT BranchID, BranchName, BranchNumber, BranchEmail, BranchCity, BranchDistrict, BranchAddress,
+       Latitude, Longitude
+FROM CargoBranches
+"""
+
+_POINT_RE = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*[,; ]\s*(-?\d+(?:\.\d+)?)\s*$")
+
+def haversine_km(lat, lon, lats, lons):
+    """Great-circle distances in km from one point to arrays of points (all in radians)."""
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+class BranchIndex:
+    """Every branch row, plus a grid of CELL_DEG cells over the ones with coordinates."""
+
+    def __init__(self, rows, cell_deg=CELL_DEG):
+        self.rows = list(rows)
+        self.cell_deg = cell_deg
+        located = [i for i, r in enumerate(self.rows) if r['Latitude'] is not None and r['Longitude'] is not None]
+        self.located = np.array(located, dtype=np.int64)
+        lat_deg = np.array([float(self.rows[i]['Latitude']) for i in located])
+        lon_deg = np.array([float(self.rows[i]['Longitude']) for i in located])
+        self.lat, self.lon = np.radians(lat_deg), np.radians(lon_deg)
+
+        # cell -> positions in self.located, grouped with one sort instead of a dict per branch
+        cy, cx = np.floor(lat_deg / cell_deg).astype(np.int64), np.floor(lon_deg / cell_deg).astype(np.int64)
+        order = np.lexsort((cx, cy))
+        keys = np.stack([cy[order], cx[order]], axis=1)
+        starts = np.flatnonzero(np.r_[True, np.any(keys[1:] != keys[:-1], axis=1)]) if len(order) else []
+        bounds = np.r_[starts, len(order)]
+        self.cells = {(int(keys[s][0]), int(keys[s][1])): order[s:e] for s, e in zip(bounds[:-1], bounds[1:])}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def cities(self):
+        return sorted({r['BranchCity'] for r in self.rows})
+
+    def districts(self, city):
+        return sorted({r['BranchDistrict'] for r in self.rows if r['BranchCity'] == city})
+
+    def in_area(self, city, district=None):
+        return [r for r in self.rows
+                if r['BranchCity'] == city and (district is None or r['BranchDistrict'] == district)]
+
+    def _candidates(self, lat_deg, lon_deg, k):
+        """Positions of branches that must contain the k nearest: grid rings around the point."""
+        if len(self.located) <= BRUTE_FORCE_BELOW:
+            return np.arange(len(self.located))
+        cy, cx = int(np.floor(lat_deg / self.cell_deg)), int(np.floor(lon_deg / self.cell_deg))
+        found, ring = [], 0
+        while (2 * ring + 1) ** 2 <= 4 * len(self.cells):
+            for y in range(cy - ring, cy + ring + 1):
+                step = 1 if abs(y - cy) == ring else 2 * ring  # inner rows: only the two edge cells
+                for x in range(cx - ring, cx + ring + 1, max(step, 1)):
+                    cell = self.cells.get((y, x))
+                    if cell is not None:
+                        found.append(cell)
+            count = sum(len(c) for c in found)
+            if count >= k:
+                candidates = np.concatenate(found)
+                # Anything outside the searched square is at least `ring` cells away; east-west
+                # cells narrow with the cosine of the latitude
+                edge_lat = min(89.9, abs(lat_deg) + (ring + 1) * self.cell_deg)
+                reach = ring * self.cell_deg * KM_PER_DEGREE * np.cos(np.radians(edge_lat))
+                distances = haversine_km(np.radians(lat_deg), np.radians(lon_deg),
+                                         self.lat[candidates], self.lon[candidates])
+                if np.partition(distances, k - 1)[k - 1] <= reach:
+                    return candidates
+            ring += 1
+        return np.arange(len(self.located))
+
+    def nearest(self, lat_deg, lon_deg, k=5, max_km=None):
+        """Up to k branch rows (dicts with DistanceKm) nearest to the point, closest first."""
+        if k <= 0 or not len(self.located):
+            return []
+        candidates = self._candidates(lat_deg, lon_deg, k)
+        distances = haversine_km(np.radians(lat_deg), np.radians(lon_deg),
+                                 self.lat[candidates], self.lon[candidates])
+        take = min(k, len(candidates))
+        best = np.argpartition(distances, take - 1)[:take]
+        best = best[np.argsort(distances[best], kind="stable")]
+        result = []
+        for position in best:
+            if max_km is not None and distances[position] > max_km:
+                break
+            row = dict(self.rows[self.located[candidates[position]]])
+            row['DistanceKm'] = round(float(distances[position]), 2)
+            result.append(row)
+        return result
+
+    def locate(self, text):
+        """
+        (lat, lon) for "41.01, 28.97", or the centre of the branches whose district / city
+        (or address) matches the text; None if nothing matches. No external geocoder.
+        """
+        match = _POINT_RE.match(text or "")
+        if match:
+            lat, lon = float(match.group(1)), float(match.group(2))
+            return (lat, lon) if -90 <= lat <= 90 and -180 <= lon <= 180 else None
+        words = [w for w in re.split(r"[\s,/]+", (text or "").casefold()) if w]
+        if not words or not len(self.located):
+            return None
+        for field in ("BranchDistrict", "BranchCity", "BranchAddress"):
+            hits = [p for p, i in enumerate(self.located)
+                    if any(w in str(self.rows[i][field]).casefold() for w in words)]
+            if hits:
+                return float(np.degrees(self.lat[hits].mean())), float(np.degrees(self.lon[hits].mean()))
+        return None
+
+def load_branch_index():
+    return BranchIndex(run_query(BRANCHES_SQL) or [])
+
+def get_branch_index():
+    """Process-wide BranchIndex; rebuilt when CargoBranches is written (or after its cache TTL)."""
+    return cached("branches.index", ("CargoBranches",), load_branch_index)
@@ -0,0 +1,256 @@
+import logging
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+import streamlit as st
+from database import get_pool, pool_fetch
+
+# Canlı takip: süreç başına tek bir thread TrackingLog (LogSeq) ve Cargos.LastUpdated'ı
+# high-water mark ile sorgular, yeni olayları abone oturumlara dağıtır. Oturumlar sadece
+# kendi kuyruklarını okur; veritabanı yükü izleyici sayısıyla değil olay sayısıyla artar.
+# İşaretler süreç boyunca korunur: kimse izlemezken sorgu durur ama işaret sıfırlanmaz,
+# ilk abonelikte de sayfanın kendi sorgusundan sonra gelen olaylar kaçmasın diye
+# son olaylar yeniden oynatılır (aynı durumun tekrar gelmesi zararsız).
+
+log = logging.getLogger(__name__)
+
+POLL_INTERVAL = 2.0     # seconds between feed polls (only while someone is subscribed)
+LIVE_REFRESH = 3        # seconds between UI fragment reruns
+BATCH = 1000
+SUBSCRIPTION_TTL = 120  # subscriptions not drained for this long belong to closed tabs
+MAX_PENDING = 200       # events kept per subscription
+GAP_WAIT = 10           # seconds to wait for a LogSeq still held by an open transaction
+MAX_GAPS = 1000
+CARGO_LOOKBACK = 5      # seconds of overlap when polling Cargos.LastUpdated
+PRIME_REPLAY = 2000     # TrackingLog rows before MAX(LogSeq) replayed when the feed starts
+PRIME_LOOKBACK = 30     # seconds of Cargos changes replayed when the feed starts
+
+LOG_FEED_SQL = """
+SELECT t.LogSeq, t.CargoID, t.LogTimestamps, st.StatusDescription, b.BranchName, b.BranchCity
+FROM TrackingLog t
+JOIN CargoStatusType st ON t.StatusID = st.StatusID
+JOIN CargoBranches b ON t.BranchID = b.BranchID
+WHERE t.LogSeq > %s
+ORDER BY t.LogSeq
+LIMIT %s
+"""
+
+CARGO_FEED_SQL = """
+SELECT c.CargoID, c.CurrentStatus, c.LastUpdated
+FROM Cargos c
+WHERE c.LastUpdated > %s OR (c.LastUpdated = %s AND c.CargoID > %s)
+ORDER BY c.LastUpdated, c.CargoID
+LIMIT %s
+"""
+
+class Subscription:
+    """Pending events for one session, filtered to `cargo_ids`."""
+
+    def __init__(self, feed, cargo_ids):
+        self.feed = feed
+        self.cargo_ids = frozenset(cargo_ids)
+        self.events = deque(maxlen=MAX_PENDING)
+        self.last_drained = time.monotonic()
+
+    def drain(self):
+        """Events since the previous call, oldest first."""
+        with self.feed._lock:
+            events = list(self.events)
+            self.events.clear()
+            self.last_drained = time.monotonic()
+        return events
+
+class ChangeFeed:
+    def __init__(self, fetch, interval=POLL_INTERVAL):
+        self.fetch = fetch
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._by_cargo = {}      # cargo_id -> set of Subscription
+        self._subscriptions = set()
+        self._thread = None
+        self._stop = threading.Event()
+        self._prime_lock = threading.Lock()
+        self._primed = False
+        self._log_hwm = 0
+        self._gaps = {}          # LogSeq not seen yet below the mark -> first noticed
+        self._cargo_hwm = None
+        self._cargo_seen = {}    # cargo_id -> LastUpdated already published
+        self._stats = {"polls": 0, "log_events": 0, "cargo_events": 0, "delivered": 0, "errors": 0}
+
+    # --- subscriptions
+
+    def subscribe(self, cargo_ids):
+        # Marks are set before the first subscription is live, not a poll interval later
+        try:
+            self._ensure_primed()
+        except Exception:
+            self._stats["errors"] += 1
+            log.exception("Change feed prime failed; the poller retries")
+        sub = Subscription(self, cargo_ids)
+        with self._lock:
+            self._subscriptions.add(sub)
+            for cargo_id in sub.cargo_ids:
+                self._by_cargo.setdefault(cargo_id, set()).add(sub)
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="change-feed", daemon=True)
+                self._thread.start()
+        return sub
+
+    def is_active(self, sub):
+        with self._lock:
+            return sub in self._subscriptions
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._drop(sub)
+
+    def _drop(self, sub):
+        self._subscriptions.discard(sub)
+        for cargo_id in sub.cargo_ids:
+            subs = self._by_cargo.get(cargo_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._by_cargo[cargo_id]
+
+    def _expire(self):
+        cutoff = time.monotonic() - SUBSCRIPTION_TTL
+        with self._lock:
+            for sub in [s for s in self._subscriptions if s.last_drained < cutoff]:
+                self._drop(sub)
+            return bool(self._subscriptions)
+
+    # --- polling
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not self._expire():
+                # Nobody is watching: stop polling but keep the marks, the next poll catches up
+                continue
+            try:
+                self.poll()
+            except Exception:
+                self._stats["errors"] += 1
+                log.exception("Change feed poll failed")
+
+    def stop(self):
+        self._stop.set()
+
+    def _ensure_primed(self):
+        with self._prime_lock:
+            if not self._primed:
+                self._prime()
+
+    def _prime(self):
+        """
+        Sets the marks once per process, a little in the past: whatever committed between a
+        page's own query and its subscription is replayed instead of skipped.
+        """
+        row = self.fetch("SELECT COALESCE(MAX(LogSeq), 0) AS LogSeq FROM TrackingLog")[0]
+        self._log_hwm, self._gaps = max(int(row['LogSeq']) - PRIME_REPLAY, 0), {}
+        row = self.fetch("SELECT MAX(LastUpdated) AS LastUpdated FROM Cargos")[0]
+        self._cargo_seen = {}
+        self._cargo_hwm = row['LastUpdated'] - timedelta(seconds=PRIME_LOOKBACK) if row['LastUpdated'] else None
+        self._primed = True
+
+    def poll(self):
+        """One round: new TrackingLog rows and Cargos changes, fanned out to subscribers."""
+        self._ensure_primed()
+        events = self._poll_logs() + self._poll_cargos()
+        self._stats["polls"] += 1
+        delivered = 0
+        with self._lock:
+            for event in events:
+                for sub in self._by_cargo.get(event['cargo_id'], ()):
+                    sub.events.append(event)
+                    delivered += 1
+        self._stats["delivered"] += delivered
+        return events
+
+    def _poll_logs(self):
+        # An AUTO_INCREMENT value can commit after a higher one, so holes below the mark are
+        # re-read for GAP_WAIT seconds before they are given up (rolled back inserts).
+        now = time.monotonic()
+        self._gaps = {seq: at for seq, at in self._gaps.items() if now - at < GAP_WAIT}
+        floor = min(self._gaps) - 1 if self._gaps else self._log_hwm
+        events = []
+        while True:
+            rows = self.fetch(LOG_FEED_SQL, (floor, BATCH))
+            for row in rows:
+                seq = int(row['LogSeq'])
+                if seq <= self._log_hwm and self._gaps.pop(seq, None) is None:
+                    continue
+                if seq > self._log_hwm + 1 and len(self._gaps) < MAX_GAPS:
+                    for missing in range(self._log_hwm + 1, min(seq, self._log_hwm + 1 + MAX_GAPS)):
+                        self._gaps[missing] = now
+                self._log_hwm = max(self._log_hwm, seq)
+                events.append({
+                    "type": "log",
+                    "cargo_id": row['CargoID'],
+                    "timestamp": row['LogTimestamps'],
+                    "status": row['StatusDescription'],
+                    "branch": row['BranchName'],
+                    "city": row['BranchCity'],
+                })
+            if len(rows) < BATCH:
+                break
+            floor = int(rows[-1]['LogSeq'])
+        self._stats["log_events"] += len(events)
+        return events
+
+    def _poll_cargos(self):
+        # LastUpdated comes from the writers' clocks, so the last few seconds are re-read and
+        # de-duplicated against what was already published.
+        if self._cargo_hwm is None:
+            row = self.fetch("SELECT MAX(LastUpdated) AS LastUpdated FROM Cargos")[0]
+            self._cargo_hwm = row['LastUpdated']
+            return []
+        since = self._cargo_hwm - timedelta(seconds=CARGO_LOOKBACK)
+        cursor = (since, "")
+        events = []
+        while True:
+            rows = self.fetch(CARGO_FEED_SQL, (cursor[0], cursor[0], cursor[1], BATCH))
+            for row in rows:
+                if self._cargo_seen.get(row['CargoID']) == row['LastUpdated']:
+                    continue
+                self._cargo_seen[row['CargoID']] = row['LastUpdated']
+                self._cargo_hwm = max(self._cargo_hwm, row['LastUpdated'])
+                events.append({
+                    "type": "cargo",
+                    "cargo_id": row['CargoID'],
+                    "timestamp": row['LastUpdated'],
+                    "status": row['CurrentStatus'],
+                })
+            if len(rows) < BATCH:
+                break
+            cursor = (rows[-1]['LastUpdated'], rows[-1]['CargoID'])
+        cutoff = self._cargo_hwm - timedelta(seconds=CARGO_LOOKBACK)
+        self._cargo_seen = {k: v for k, v in self._cargo_seen.items() if v >= cutoff}
+        self._stats["cargo_events"] += len(events)
+        return events
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["subscriptions"] = len(self._subscriptions)
+            stats["watched_cargo"] = len(self._by_cargo)
+        stats["log_hwm"] = self._log_hwm
+        stats["cargo_hwm"] = self._cargo_hwm
+        return stats
+
+@st.cache_resource
+def get_change_feed():
+    # Background thread: query through the pool directly, not through st.* caches
+    return ChangeFeed(pool_fetch(get_pool()))
+
+def session_subscription(name, cargo_ids):
+    """The session's subscription `name`, re-created when the watched Cargo IDs change."""
+    key = f"feed_{name}"
+    sub = st.session_state.get(key)
+    if sub is None or sub.cargo_ids != frozenset(cargo_ids) or not sub.feed.is_active(sub):
+        if sub is not None:
+            sub.feed.unsubscribe(sub)
+        sub = st.session_state[key] = get_change_feed().subscribe(cargo_ids)
+    return sub
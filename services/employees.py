@@ -0,0 +1,189 @@
+import hashlib
+import os
+from bisect import bisect_left
+import numpy as np
+from database import run_query, cached, allocate_ids, transaction
+
+# Personel rehberi: Employees şemasına (EmployeeName, EmployeeLastName, EmployeeNumber, RoleID ...)
+# göre listeleme, arama ve kayıt işlemleri. İsim / ID önek araması süreç başına tek bir
+# bellek içi indeksten yapılır (Employees yazılınca yeniden kurulur); liste sayfaları
+# veritabanından EmployeeID sırasıyla keyset pagination ile gelir.
+
+SEARCH_LIMIT = 20
+PASSWORD_ITERATIONS = 200_000
+
+EMPLOYEE_COLUMNS = """
+    e.EmployeeID, e.EmployeeName, e.EmployeeLastName, e.EmployeeNumber, e.Username,
+    r.RoleName, b.BranchName, e.Salary, e.HireDate, e.LastLogin, CAST(e.IsActive AS UNSIGNED) AS IsActive
+"""
+
+DIRECTORY_SQL = """
+SELECT EmployeeID, EmployeeName, EmployeeLastName, EmployeeNumber, Username, BranchID, RoleID,
+       CAST(IsActive AS UNSIGNED) AS IsActive
+FROM Employees
+"""
+
+class EmployeeDirectory:
+    """
+    Sorted (key, position) pairs over first name, last name, "first last", EmployeeID,
+    EmployeeNumber and Username, all case-folded; a prefix is two bisections and a slice.
+    """
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+        entries = set()
+        for position, r in enumerate(self.rows):
+            full = f"{r['EmployeeName']} {r['EmployeeLastName']}"
+            for value in (r['EmployeeName'], r['EmployeeLastName'], full, r['EmployeeID'],
+                          r['EmployeeNumber'], r['Username']):
+                if value:
+                    entries.add((str(value).casefold(), position))
+        entries = sorted(entries)
+        self._keys = [k for k, _ in entries]
+        self._positions = np.array([p for _, p in entries], dtype=np.int64)
+        # Result order (name, last name, ID) as one integer per row
+        order = sorted(range(len(self.rows)), key=lambda p: (self.rows[p]['EmployeeName'],
+                                                             self.rows[p]['EmployeeLastName'],
+                                                             self.rows[p]['EmployeeID']))
+        self._rank = np.empty(len(self.rows), dtype=np.int64)
+        self._rank[order] = np.arange(len(self.rows))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _prefix(self, prefix):
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + "\U0010ffff", lo)
+        return np.unique(self._positions[lo:hi])
+
+    def _matches(self, text):
+        """Positions whose keys start with every word of `text` (or with the whole text)."""
+        words = str(text or "").casefold().split()
+        if not words:
+            return np.empty(0, dtype=np.int64)
+        matches = self._prefix(words[0])
+        for word in words[1:]:
+            if not len(matches):
+                break
+            matches = np.intersect1d(matches, self._prefix(word), assume_unique=True)
+        if len(words) > 1:
+            matches = np.union1d(matches, self._prefix(" ".join(words)))
+        return matches
+
+    def search(self, text, limit=SEARCH_LIMIT):
+        """At most `limit` employee rows matching `text`, ordered by name."""
+        matches = self._matches(text)
+        if len(matches) > limit:
+            matches = matches[np.argpartition(self._rank[matches], limit - 1)[:limit]]
+        return [self.rows[p] for p in matches[np.argsort(self._rank[matches])]]
+
+    def _filtered(self, rows, branch_id=None, role_id=None, active_only=False):
+        return [r for r in rows
+                if (branch_id is None or r['BranchID'] == branch_id)
+                and (role_id is None or r['RoleID'] == role_id)
+                and (not active_only or r['IsActive'])]
+
+    def ids(self, text, **filters):
+        """EmployeeIDs matching `text` and the branch_id / role_id / active_only filters."""
+        return [r['EmployeeID'] for r in self._filtered((self.rows[p] for p in self._matches(text)), **filters)]
+
+    def count(self, **filters):
+        return len(self._filtered(self.rows, **filters))
+
+def load_directory():
+    return EmployeeDirectory(run_query(DIRECTORY_SQL) or [])
+
+def get_directory():
+    """Process-wide EmployeeDirectory; rebuilt when Employees is written (or after the cache TTL)."""
+    return cached("employees.directory", ("Employees",), load_directory)
+
+def fetch_employee_page(filters, cursor=None, page_size=50):
+    """
+    Bir sayfa personel getirir (keyset pagination, EmployeeID DESC).
+    filters: branch_id, role_id, active_only; ya da ids (süzülmüş arama sonucu, yalnızca
+    sayfadaki ID'ler sorgulanır). Returns (rows, has_next).
+    """
+    where, params = [], []
+    if filters.get('ids') is not None:
+        ids = sorted((i for i in filters['ids'] if cursor is None or i < cursor), reverse=True)[:page_size + 1]
+        if not ids:
+            return [], False
+        filters, cursor = {'ids': ids}, None
+    if filters.get('branch_id'):
+        where.append("e.BranchID = %s")
+        params.append(filters['branch_id'])
+    if filters.get('role_id'):
+        where.append("e.RoleID = %s")
+        params.append(filters['role_id'])
+    if filters.get('active_only'):
+        where.append("e.IsActive = 1")
+    if filters.get('ids') is not None:
+        where.append(f"e.EmployeeID IN ({', '.join(['%s'] * len(filters['ids']))})")
+        params.extend(filters['ids'])
+    if cursor:
+        where.append("e.EmployeeID < %s")
+        params.append(cursor)
+
+    sql = f"""SELECT {EMPLOYEE_COLUMNS} FROM Employees e
+        LEFT JOIN EmployeeRoles r ON r.RoleID = e.RoleID
+        LEFT JOIN CargoBranches b ON b.BranchID = e.BranchID"""
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY e.EmployeeID DESC LIMIT %s"
+    params.append(page_size + 1)
+
+    rows = run_query(sql, tuple(params))
+    return rows[:page_size], len(rows) > page_size
+
+def get_employee(employee_id):
+    rows = run_query("""
+        SELECT EmployeeID, EmployeeName, EmployeeLastName, EmployeeNumber, BranchID, RoleID, Username,
+               Salary, HireDate, LastLogin, CAST(IsActive AS UNSIGNED) AS IsActive
+        FROM Employees WHERE EmployeeID = %s
+    """, (employee_id,))
+    return rows[0] if rows else None
+
+def hash_password(password, salt=None, iterations=PASSWORD_ITERATIONS):
+    """PBKDF2-SHA256 as 'pbkdf2_sha256$iterations$salt$hash' (fits PasswordHash varchar(255))."""
+    salt = salt or os.urandom(16).hex()
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), iterations).hex()
+    return f"pbkdf2_sha256${iterations}${salt}${digest}"
+
+def salary_text(amount):
+    """Salary is a varchar column: 45000.0 -> '45000', 45000.5 -> '45000.50'."""
+    amount = float(amount)
+    return f"{amount:.0f}" if amount.is_integer() else f"{amount:.2f}"
+
+def add_employee(name, last_name, number, branch_id, role_id, username, password, salary, hire_date):
+    """Inserts one employee with a new EM ID; returns the ID."""
+    employee_id = allocate_ids('Employees', 1)[0]
+    run_query("""
+        INSERT INTO Employees (EmployeeID, EmployeeName, EmployeeLastName, EmployeeNumber, BranchID, RoleID,
+                               Username, PasswordHash, Salary, HireDate, IsActive)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 1)
+    """, (employee_id, name, last_name, number, branch_id, role_id, username, hash_password(password),
+          salary_text(salary), hire_date))
+    return employee_id
+
+def update_employee(employee_id, number, branch_id, role_id, salary, is_active):
+    return run_query("""
+        UPDATE Employees SET EmployeeNumber = %s, BranchID = %s, RoleID = %s, Salary = %s, IsActive = %s
+        WHERE EmployeeID = %s
+    """, (number, branch_id, role_id, salary_text(salary), int(bool(is_active)), employee_id))
+
+def delete_employee(employee_id):
+    """
+    Deletes an employee who never logged a tracking event. TrackingLog has had no foreign
+    keys since migration 010 (partitioning), so the reference check is done here, live and
+    archive; employees with history raise ValueError and should be deactivated instead.
+    """
+    with transaction() as cursor:
+        cursor.execute("SELECT EmployeeID FROM Employees WHERE EmployeeID = %s FOR UPDATE", (employee_id,))
+        if not cursor.fetchall():
+            return 0
+        for table in ("TrackingLog", "TrackingLogArchive"):
+            cursor.execute(f"SELECT 1 AS Found FROM {table} WHERE EmployeeID = %s LIMIT 1", (employee_id,))
+            if cursor.fetchall():
+                raise ValueError(f"{employee_id} has tracking records in {table}")
+        cursor.execute("DELETE FROM Employees WHERE EmployeeID = %s", (employee_id,))
+        return cursor.rowcount
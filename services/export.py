@@ -0,0 +1,174 @@
+import argparse
+import csv
+import sys
+from datetime import datetime, timedelta
+from database import get_read_pool
+
+# Büyük tabloların CSV / Parquet olarak dışa aktarımı.
+# Satırlar sunucu tarafında tamponlanmayan (unbuffered) bir cursor'dan sabit boyutlu
+# parçalar halinde okunup doğrudan dosyaya yazılır; bellek kullanımı tablo boyutundan bağımsızdır.
+#   python -m services.export shipments --format csv --out shipments.csv
+#   python -m services.export tracking --format parquet --out tracking.parquet --from 2023-10-01
+# Arşive taşınmış satırlar (services.archive) varsayılan olarak dahildir; --live-only ile hariç tutulur.
+
+CHUNK_SIZE = 10000
+
+DATASETS = {
+    'shipments': {
+        'table': 'Cargos',
+        'archive': 'CargosArchive',
+        'date_column': 'LastUpdated',
+        'columns': [
+            ('CargoID', 'string'), ('SenderCustID', 'string'), ('ReceiverCustID', 'string'),
+            ('OriginBranchID', 'string'), ('DestBranchID', 'string'), ('ServiceTypeID', 'string'),
+            ('CargoWeight', 'decimal'), ('CargoLength', 'decimal'), ('CargoWidth', 'decimal'),
+            ('CargoHeight', 'decimal'), ('ShippingCost', 'decimal'), ('CurrentStatus', 'string'),
+            ('PaymentType', 'string'), ('PaymentStatus', 'string'), ('LastUpdated', 'datetime'),
+        ],
+    },
+    'invoices': {
+        'table': 'Invoice',
+        'archive': 'InvoiceArchive',
+        'date_column': 'InvoiceDate',
+        'columns': [
+            ('InvoiceID', 'string'), ('CargoID', 'string'), ('CustID', 'string'),
+            ('InvoiceDate', 'datetime'), ('TotalAmount', 'decimal'),
+        ],
+    },
+    'tracking': {
+        'table': 'TrackingLog',
+        'archive': 'TrackingLogArchive',
+        'date_column': 'LogTimestamps',
+        'columns': [
+            ('TrackID', 'string'), ('LogTimestamps', 'datetime'), ('CargoID', 'string'),
+            ('BranchID', 'string'), ('EmployeeID', 'string'), ('StatusID', 'string'),
+            ('ReceiverName', 'string'), ('ReceiverRelation', 'string'),
+        ],
+    },
+}
+
+def column_names(dataset):
+    return [name for name, _ in DATASETS[dataset]['columns']]
+
+def build_query(dataset, date_from=None, date_to=None, include_archived=True):
+    """
+    One SELECT over the live table, UNION ALL the archive table unless `include_archived`
+    is off; a single statement reads one snapshot, so a row being archived is seen once.
+    """
+    spec = DATASETS[dataset]
+    where, params = [], []
+    if date_from:
+        where.append(f"{spec['date_column']} >= %s")
+        params.append(datetime.combine(date_from, datetime.min.time()))
+    if date_to:
+        where.append(f"{spec['date_column']} < %s")
+        params.append(datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+    tables = [spec['table']] + ([spec['archive']] if include_archived else [])
+    parts = [f"SELECT {', '.join(column_names(dataset))} FROM {table}"
+             + (" WHERE " + " AND ".join(where) if where else "") for table in tables]
+    return " UNION ALL ".join(parts), tuple(params) * len(tables)
+
+def iter_chunks(dataset, date_from=None, date_to=None, chunk_size=CHUNK_SIZE, include_archived=True):
+    """
+    Yields lists of row tuples straight off the wire. The pooled connection stays
+    checked out until the generator is exhausted or closed.
+    """
+    sql, params = build_query(dataset, date_from, date_to, include_archived)
+    pool = get_read_pool()
+    conn = pool.acquire()
+    cursor = conn.cursor(buffered=False)
+    finished = False
+    previous_timeout = None
+    try:
+        cursor.execute("SELECT @@SESSION.net_write_timeout")
+        previous_timeout = cursor.fetchall()[0][0]
+        # Slow consumers (network, Parquet encoding) must not make the server drop us
+        cursor.execute("SET SESSION net_write_timeout = 600")
+        cursor.execute(sql, params or None)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+        finished = True
+    finally:
+        try:
+            cursor.close()
+        except Exception:
+            finished = False
+        if finished and previous_timeout is not None:
+            # The connection goes back to the pool; the next user gets the server's timeout again
+            try:
+                restore = conn.cursor()
+                restore.execute("SET SESSION net_write_timeout = %s", (previous_timeout,))
+                restore.close()
+            except Exception:
+                finished = False
+        # An abandoned unbuffered result leaves unread rows on the socket: drop that connection
+        pool.release(conn, broken=not finished)
+
+def write_csv(dataset, out, date_from=None, date_to=None, chunk_size=CHUNK_SIZE, include_archived=True):
+    """Streams the dataset as CSV into a text file object. Returns the row count."""
+    writer = csv.writer(out)
+    writer.writerow(column_names(dataset))
+    total = 0
+    for rows in iter_chunks(dataset, date_from, date_to, chunk_size, include_archived):
+        writer.writerows(rows)
+        total += len(rows)
+    return total
+
+def _arrow_schema(dataset):
+    import pyarrow as pa
+    types = {'string': pa.string(), 'decimal': pa.decimal128(14, 2), 'datetime': pa.timestamp('s')}
+    return pa.schema([(name, types[kind]) for name, kind in DATASETS[dataset]['columns']])
+
+def write_parquet(dataset, out, date_from=None, date_to=None, chunk_size=CHUNK_SIZE, include_archived=True):
+    """Streams the dataset into a Parquet file (path or binary file object), one row group per chunk."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema(dataset)
+    total = 0
+    with pq.ParquetWriter(out, schema, compression='snappy') as writer:
+        for rows in iter_chunks(dataset, date_from, date_to, chunk_size, include_archived):
+            columns = list(zip(*rows))
+            arrays = [pa.array(col, type=field.type) for col, field in zip(columns, schema)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            total += len(rows)
+    return total
+
+def export(dataset, fmt, out, date_from=None, date_to=None, chunk_size=CHUNK_SIZE, include_archived=True):
+    if fmt == 'csv':
+        return write_csv(dataset, out, date_from, date_to, chunk_size, include_archived)
+    if fmt == 'parquet':
+        return write_parquet(dataset, out, date_from, date_to, chunk_size, include_archived)
+    raise ValueError(f"Unknown export format: {fmt}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream Thunder Cargo tables to CSV or Parquet.")
+    parser.add_argument("dataset", choices=sorted(DATASETS))
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--out", default="-", help="output file ('-' = stdout, CSV only)")
+    parser.add_argument("--from", dest="date_from", type=lambda s: datetime.strptime(s, "%Y-%m-%d").date())
+    parser.add_argument("--to", dest="date_to", type=lambda s: datetime.strptime(s, "%Y-%m-%d").date())
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--live-only", action="store_true", help="leave out archived rows (services.archive)")
+    args = parser.parse_args(argv)
+    include_archived = not args.live_only
+
+    started = datetime.now()
+    if args.out == "-":
+        if args.format != "csv":
+            parser.error("Parquet output needs --out FILE")
+        total = write_csv(args.dataset, sys.stdout, args.date_from, args.date_to, args.chunk_size, include_archived)
+    elif args.format == "csv":
+        with open(args.out, "w", newline="", encoding="utf-8") as f:
+            total = write_csv(args.dataset, f, args.date_from, args.date_to, args.chunk_size, include_archived)
+    else:
+        total = write_parquet(args.dataset, args.out, args.date_from, args.date_to, args.chunk_size,
+                              include_archived)
+    seconds = (datetime.now() - started).total_seconds()
+    print(f"Exported {total} rows from {args.dataset} in {seconds:.1f}s", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
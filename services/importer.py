@@ -0,0 +1,211 @@
+import csv
+import tempfile
+import time
+from datetime import datetime
+import pandas as pd
+from database import run_query, transaction, allocate_ids
+from services.pricing import quote_frame
+from utils import get_status_registry
+
+# Müşteri / kargo toplu içe aktarma (CSV).
+# Dosya parça parça okunur, her parça pandas ile vektörel doğrulanır,
+# geçerli satırlar parça başına tek transaction içinde executemany ile eklenir,
+# hatalı satırlar sebebiyle birlikte ayrı bir "reject" CSV dosyasına yazılır.
+
+CHUNK_SIZE = 5000
+
+CUSTOMER_COLUMNS = ['CustID', 'FirstName', 'LastName', 'CustNumber', 'Email',
+                    'Address', 'Country', 'City', 'Username', 'PasswordHash']
+CARGO_COLUMNS = ['CargoID', 'ReceiverCustID', 'SenderCustID', 'CargoWeight', 'CargoLength',
+                 'CargoWidth', 'CargoHeight', 'ShippingCost', 'OriginBranchID', 'DestBranchID',
+                 'CurrentStatus', 'LastUpdated', 'PaymentType', 'PaymentStatus', 'ServiceTypeID']
+
+# Kolon -> izin verilen en uzun değer (şemadaki varchar boyutları)
+CUSTOMER_REQUIRED = {'FirstName': 50, 'LastName': 50, 'CustNumber': 50, 'Address': 50,
+                     'Country': 50, 'City': 50, 'Username': 50, 'PasswordHash': 255}
+CARGO_REQUIRED = {'ReceiverCustID': 12, 'SenderCustID': 12, 'OriginBranchID': 12, 'DestBranchID': 12,
+                  'ServiceTypeID': 12, 'PaymentType': 50, 'PaymentStatus': 50}
+
+MAX_WEIGHT_KG = 10000
+MAX_DIMENSION_CM = 1000
+DEFAULT_STATUS = 'Order Created'
+
+def load_reference_ids():
+    """Loads the ID sets used for vectorized foreign-key checks."""
+    customers = run_query("SELECT CustID FROM Customers")
+    branches = run_query("SELECT BranchID FROM CargoBranches")
+    services = run_query("SELECT ServiceTypeID FROM ServiceTypes")
+    return {
+        'customers': {r['CustID'] for r in customers},
+        'branches': {r['BranchID'] for r in branches},
+        'services': {r['ServiceTypeID'] for r in services},
+        'statuses': get_status_registry(),
+    }
+
+def _existing(cursor, table, column, values):
+    values = [v for v in set(values) if pd.notna(v) and v]
+    if not values:
+        return set()
+    found = set()
+    for i in range(0, len(values), 1000):
+        batch = values[i:i + 1000]
+        cursor.execute(f"SELECT {column} FROM {table} WHERE {column} IN ({', '.join(['%s'] * len(batch))})", batch)
+        found.update(r[column] for r in cursor.fetchall())
+    return found
+
+def _fill_ids(cursor, df, column, table, seen):
+    """
+    Gives rows with a blank ID a freshly allocated one (one round trip per chunk, on the
+    chunk's own transaction so no second pooled connection is needed).
+    Re-checks only in case the file itself used numbers ahead of the counter.
+    """
+    blank = df[column].isna()
+    while blank.any():
+        df.loc[blank, column] = allocate_ids(table, int(blank.sum()), cursor)
+        taken = _existing(cursor, table, column, df.loc[blank, column])
+        blank = blank & (df[column].isin(taken) | df[column].isin(seen) | df[column].duplicated(keep='first'))
+
+def _flag(reasons, mask, reason):
+    reasons[mask] = reasons[mask] + reason + "; "
+
+def _check_required(df, reasons, limits):
+    for column, max_len in limits.items():
+        _flag(reasons, df[column].isna(), f"{column} missing")
+        _flag(reasons, df[column].str.len() > max_len, f"{column} longer than {max_len}")
+
+def _check_unique(df, reasons, column, seen, existing):
+    _flag(reasons, df[column].duplicated(keep='first') & df[column].notna(), f"duplicate {column} in file")
+    _flag(reasons, df[column].isin(seen) & df[column].notna(), f"duplicate {column} in file")
+    _flag(reasons, df[column].isin(existing), f"{column} already exists")
+
+def validate_customers(cursor, df, state):
+    reasons = pd.Series("", index=df.index)
+    _check_required(df, reasons, CUSTOMER_REQUIRED)
+    _flag(reasons, df['Email'].str.len() > 100, "Email longer than 100")
+    _flag(reasons, df['Email'].notna() & ~df['Email'].str.contains('@', regex=False, na=False), "Email invalid")
+    _flag(reasons, df['CustID'].str.len() > 12, "CustID longer than 12")
+    for column in ('CustID', 'CustNumber', 'Email', 'Username'):
+        _check_unique(df, reasons, column, state['seen'][column], _existing(cursor, 'Customers', column, df[column]))
+    return reasons
+
+def validate_cargos(cursor, df, state):
+    refs = state['refs']
+    reasons = pd.Series("", index=df.index)
+    _check_required(df, reasons, CARGO_REQUIRED)
+    _flag(reasons, df['CargoID'].str.len() > 12, "CargoID longer than 12")
+
+    for column, upper in (('CargoWeight', MAX_WEIGHT_KG), ('CargoLength', MAX_DIMENSION_CM),
+                          ('CargoWidth', MAX_DIMENSION_CM), ('CargoHeight', MAX_DIMENSION_CM)):
+        values = pd.to_numeric(df[column], errors='coerce')
+        _flag(reasons, values.isna(), f"{column} not a number")
+        _flag(reasons, (values <= 0) | (values > upper), f"{column} out of range (0, {upper}]")
+        df[column] = values.round(2)
+    cost = pd.to_numeric(df['ShippingCost'], errors='coerce')
+    blank_cost = df['ShippingCost'].isna()
+    if blank_cost.any():
+        # Fiyat verilmemişse tarifeden hesapla
+        cost[blank_cost] = quote_frame(df[blank_cost])
+    _flag(reasons, cost.isna() | (cost < 0), "ShippingCost invalid")
+    df['ShippingCost'] = cost.round(2)
+
+    customers = refs['customers'] | state['new_customers']
+    _flag(reasons, df['SenderCustID'].notna() & ~df['SenderCustID'].isin(customers), "unknown SenderCustID")
+    _flag(reasons, df['ReceiverCustID'].notna() & ~df['ReceiverCustID'].isin(customers), "unknown ReceiverCustID")
+    _flag(reasons, df['OriginBranchID'].notna() & ~df['OriginBranchID'].isin(refs['branches']), "unknown OriginBranchID")
+    _flag(reasons, df['DestBranchID'].notna() & ~df['DestBranchID'].isin(refs['branches']), "unknown DestBranchID")
+    _flag(reasons, df['ServiceTypeID'].notna() & ~df['ServiceTypeID'].isin(refs['services']), "unknown ServiceTypeID")
+
+    _check_unique(df, reasons, 'CargoID', state['seen']['CargoID'], _existing(cursor, 'Cargos', 'CargoID', df['CargoID']))
+
+    # Bilinmeyen durum metni executemany'yi değil yalnızca o satırı düşürsün
+    df['CurrentStatus'] = df['CurrentStatus'].fillna(DEFAULT_STATUS)
+    _flag(reasons, df['CurrentStatus'].str.len() > 50, "CurrentStatus longer than 50")
+    known = df['CurrentStatus'].map(lambda s: refs['statuses'].get(s) is not None)
+    _flag(reasons, ~known, "unknown CurrentStatus")
+
+    # Yalnızca boş hücreler şimdiki zamanı alır; okunamayan tarih satırı reddeder
+    blank_time = df['LastUpdated'].isna()
+    stamps = pd.to_datetime(df['LastUpdated'], errors='coerce')
+    _flag(reasons, ~blank_time & stamps.isna(), "LastUpdated not a date")
+    stamps = stamps.astype(object).where(~blank_time, pd.Timestamp(datetime.now().replace(microsecond=0)))
+    df['LastUpdated'] = stamps.where(blank_time | stamps.notna(), df['LastUpdated'])  # reject dosyasında asıl metin
+    return reasons
+
+KINDS = {
+    'customers': {'table': 'Customers', 'id': 'CustID', 'columns': CUSTOMER_COLUMNS,
+                  'validate': validate_customers, 'unique': ('CustID', 'CustNumber', 'Email', 'Username')},
+    'cargos': {'table': 'Cargos', 'id': 'CargoID', 'columns': CARGO_COLUMNS,
+               'validate': validate_cargos, 'unique': ('CargoID',)},
+}
+
+def _prepare(chunk, columns):
+    """Missing columns become empty, text is stripped and blank cells become NaN."""
+    df = chunk.reindex(columns=columns).astype(object)
+    df = df.apply(lambda col: col.str.strip())
+    return df.mask(df == "")
+
+def _to_db(value):
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    return value
+
+def import_csv(kind, source, reject_path=None, chunk_size=CHUNK_SIZE):
+    """
+    Imports a Customers or Cargos CSV (path or file object).
+    Returns a report: rows, inserted, rejected, seconds, rows_per_second, reject_path.
+    """
+    spec = KINDS[kind]
+    started = time.perf_counter()
+    if reject_path is None:
+        reject_path = tempfile.NamedTemporaryFile(prefix=f"{kind}_rejects_", suffix=".csv", delete=False).name
+    state = {
+        'seen': {column: set() for column in spec['unique']},
+        'new_customers': set(),
+        'refs': load_reference_ids() if kind == 'cargos' else None,
+    }
+    rows = inserted = rejected = 0
+    placeholders = ", ".join(["%s"] * len(spec['columns']))
+    insert_sql = f"INSERT INTO {spec['table']} ({', '.join(spec['columns'])}) VALUES ({placeholders})"
+
+    with open(reject_path, "w", newline="", encoding="utf-8") as reject_file:
+        reject_writer = csv.writer(reject_file)
+        reject_writer.writerow(['Line', 'Reason'] + spec['columns'])
+
+        for chunk in pd.read_csv(source, dtype=str, chunksize=chunk_size, keep_default_na=False):
+            rows += len(chunk)
+            df = _prepare(chunk, spec['columns'])
+
+            with transaction() as cursor:
+                _fill_ids(cursor, df, spec['id'], spec['table'], state['seen'][spec['id']])
+                reasons = spec['validate'](cursor, df, state)
+                ok = reasons == ""
+
+                valid = df[ok]
+                if not valid.empty:
+                    records = [tuple(_to_db(v) for v in r) for r in valid.astype(object).itertuples(index=False, name=None)]
+                    cursor.executemany(insert_sql, records)
+                    inserted += len(valid)
+
+            for column in spec['unique']:
+                state['seen'][column].update(v for v in valid[column] if pd.notna(v))  # boş (NULL) değerler tekil sayılmaz
+            if kind == 'customers':
+                state['new_customers'].update(valid['CustID'])
+
+            # read_csv keeps numbering rows across chunks: line = row index + header + 1
+            bad = df[~ok]
+            for (position, row), reason in zip(bad.iterrows(), reasons[~ok]):
+                reject_writer.writerow([position + 2, reason.rstrip("; ")]
+                                       + ["" if _to_db(v) is None else v for v in row])
+            rejected += len(bad)
+
+    seconds = time.perf_counter() - started
+    return {
+        'rows': rows,
+        'inserted': inserted,
+        'rejected': rejected,
+        'seconds': seconds,
+        'rows_per_second': rows / seconds if seconds > 0 else 0.0,
+        'reject_path': reject_path,
+    }
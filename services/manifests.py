@@ -0,0 +1,155 @@
+import time
+from datetime import datetime
+from database import run_query, transaction, reserve_id_block
+
+# Manifest (sefer) operasyonları: yükleme, çıkış ve varış.
+# Her işlem, manifestteki kargo sayısından bağımsız olarak sabit sayıda
+# set-based SQL ifadesiyle (INSERT ... SELECT, UPDATE ... JOIN) tek transaction içinde çalışır;
+# Cargos.CurrentStatus / LastUpdated ve TrackingLog birlikte güncellenir.
+
+STATUS_LOADED = 'ST004'       # Loaded onto Vehicle
+STATUS_IN_TRANSIT = 'ST005'   # In Transit
+STATUS_AT_TRANSFER = 'ST006'  # Arrived at Transfer Center
+STATUS_AT_DEST = 'ST008'      # Arrived at Destination Branch
+
+LOG_LOADED = 'Loaded'
+LOG_IN_TRANSIT = 'In Transit'
+LOG_UNLOADED = 'Unloaded'
+
+BATCH_SIZE = 1000
+
+def get_manifest_cargo(manifest_id):
+    return run_query("""
+        SELECT mc.CargoID, mc.LogStatus, c.CurrentStatus, c.DestBranchID, c.LastUpdated
+        FROM ManifestCargo mc
+        JOIN Cargos c ON c.CargoID = mc.CargoID
+        WHERE mc.ManifestID = %s
+        ORDER BY mc.CargoID
+    """, (manifest_id,))
+
+def _lock_manifest(cursor, manifest_id):
+    cursor.execute(
+        "SELECT ManifestID, VehicleID, OriginBranchID, DestBranchID FROM Manifests WHERE ManifestID = %s FOR UPDATE",
+        (manifest_id,)
+    )
+    manifest = cursor.fetchone()
+    if not manifest:
+        raise ValueError(f"Unknown manifest: {manifest_id}")
+    return manifest
+
+def _report(started, manifest_id, rows):
+    seconds = time.perf_counter() - started
+    return {'manifest_id': manifest_id, 'cargos': rows, 'seconds': seconds}
+
+def load_cargo(manifest_id, cargo_ids, employee_id):
+    """Puts the given cargos on the manifest (LogStatus 'Loaded') and marks them Loaded onto Vehicle."""
+    started = time.perf_counter()
+    now = datetime.now().replace(microsecond=0)
+    loaded = 0
+    cargo_ids = list(cargo_ids)
+    # ID bloğu transaction açılmadan ayrılır (en fazla bu kadar satır); kullanılmayanlar atlanır
+    next_number, prefix, width = reserve_id_block('TrackingLog', len(cargo_ids)) if cargo_ids else (0, '', 0)
+    with transaction() as cursor:
+        manifest = _lock_manifest(cursor, manifest_id)
+        for i in range(0, len(cargo_ids), BATCH_SIZE):
+            batch = cargo_ids[i:i + BATCH_SIZE]
+            placeholders = ", ".join(["%s"] * len(batch))
+
+            cursor.execute(f"""
+                INSERT INTO ManifestCargo (ManifestID, CargoID, LogStatus)
+                SELECT %s, c.CargoID, %s FROM Cargos c WHERE c.CargoID IN ({placeholders})
+                ON DUPLICATE KEY UPDATE LogStatus = VALUES(LogStatus)
+            """, [manifest_id, LOG_LOADED, *batch])
+
+            cursor.execute(f"SELECT COUNT(*) as n FROM Cargos WHERE CargoID IN ({placeholders})", batch)
+            count = cursor.fetchone()['n']
+            if not count:
+                continue
+            first, next_number = next_number, next_number + count
+            cursor.execute(f"""
+                INSERT INTO TrackingLog (TrackID, LogTimestamps, CargoID, BranchID, EmployeeID, StatusID)
+                SELECT CONCAT(%s, LPAD(%s + ROW_NUMBER() OVER (ORDER BY c.CargoID) - 1, %s, '0')),
+                       %s, c.CargoID, %s, %s, %s
+                FROM Cargos c WHERE c.CargoID IN ({placeholders})
+            """, [prefix, first, width, now, manifest['OriginBranchID'], employee_id, STATUS_LOADED, *batch])
+
+            cursor.execute(f"""
+                UPDATE Cargos c
+                JOIN CargoStatusType s ON s.StatusID = %s
+                SET c.CurrentStatus = s.StatusDescription, c.LastUpdated = %s
+                WHERE c.CargoID IN ({placeholders})
+            """, [STATUS_LOADED, now, *batch])
+            loaded += count
+    return _report(started, manifest_id, loaded)
+
+def depart(manifest_id, employee_id):
+    """Vehicle leaves: every 'Loaded' cargo on the manifest goes In Transit."""
+    started = time.perf_counter()
+    now = datetime.now().replace(microsecond=0)
+    with transaction() as cursor:
+        manifest = _lock_manifest(cursor, manifest_id)
+        cursor.execute("SELECT COUNT(*) as n FROM ManifestCargo WHERE ManifestID = %s AND LogStatus = %s",
+                       (manifest_id, LOG_LOADED))
+        count = cursor.fetchone()['n']
+        if count:
+            first, prefix, width = reserve_id_block('TrackingLog', count, cursor)
+            cursor.execute("""
+                INSERT INTO TrackingLog (TrackID, LogTimestamps, CargoID, BranchID, EmployeeID, StatusID)
+                SELECT CONCAT(%s, LPAD(%s + ROW_NUMBER() OVER (ORDER BY mc.CargoID) - 1, %s, '0')),
+                       %s, mc.CargoID, %s, %s, %s
+                FROM ManifestCargo mc
+                WHERE mc.ManifestID = %s AND mc.LogStatus = %s
+            """, (prefix, first, width, now, manifest['OriginBranchID'], employee_id, STATUS_IN_TRANSIT,
+                  manifest_id, LOG_LOADED))
+
+            cursor.execute("""
+                UPDATE Cargos c
+                JOIN ManifestCargo mc ON mc.CargoID = c.CargoID
+                JOIN CargoStatusType s ON s.StatusID = %s
+                SET c.CurrentStatus = s.StatusDescription, c.LastUpdated = %s, mc.LogStatus = %s
+                WHERE mc.ManifestID = %s AND mc.LogStatus = %s
+            """, (STATUS_IN_TRANSIT, now, LOG_IN_TRANSIT, manifest_id, LOG_LOADED))
+
+        cursor.execute("UPDATE Manifests SET DepartureTime = %s, ArrivalTime = NULL WHERE ManifestID = %s", (now, manifest_id))
+    return _report(started, manifest_id, count)
+
+def arrive(manifest_id, employee_id):
+    """
+    Vehicle arrives: every 'In Transit' cargo is unloaded at the manifest's destination.
+    Cargos whose own destination is this branch become 'Arrived at Destination Branch',
+    the rest 'Arrived at Transfer Center'.
+    """
+    started = time.perf_counter()
+    now = datetime.now().replace(microsecond=0)
+    with transaction() as cursor:
+        manifest = _lock_manifest(cursor, manifest_id)
+        cursor.execute("SELECT COUNT(*) as n FROM ManifestCargo WHERE ManifestID = %s AND LogStatus = %s",
+                       (manifest_id, LOG_IN_TRANSIT))
+        count = cursor.fetchone()['n']
+        if count:
+            first, prefix, width = reserve_id_block('TrackingLog', count, cursor)
+            cursor.execute("""
+                INSERT INTO TrackingLog (TrackID, LogTimestamps, CargoID, BranchID, EmployeeID, StatusID)
+                SELECT CONCAT(%s, LPAD(%s + ROW_NUMBER() OVER (ORDER BY mc.CargoID) - 1, %s, '0')),
+                       %s, mc.CargoID, %s, %s,
+                       CASE WHEN c.DestBranchID = %s THEN %s ELSE %s END
+                FROM ManifestCargo mc
+                JOIN Cargos c ON c.CargoID = mc.CargoID
+                WHERE mc.ManifestID = %s AND mc.LogStatus = %s
+            """, (prefix, first, width, now, manifest['DestBranchID'], employee_id,
+                  manifest['DestBranchID'], STATUS_AT_DEST, STATUS_AT_TRANSFER, manifest_id, LOG_IN_TRANSIT))
+
+            cursor.execute("""
+                UPDATE Cargos c
+                JOIN ManifestCargo mc ON mc.CargoID = c.CargoID
+                JOIN CargoStatusType s
+                  ON s.StatusID = CASE WHEN c.DestBranchID = %s THEN %s ELSE %s END
+                SET c.CurrentStatus = s.StatusDescription, c.LastUpdated = %s, mc.LogStatus = %s
+                WHERE mc.ManifestID = %s AND mc.LogStatus = %s
+            """, (manifest['DestBranchID'], STATUS_AT_DEST, STATUS_AT_TRANSFER, now, LOG_UNLOADED,
+                  manifest_id, LOG_IN_TRANSIT))
+
+        cursor.execute("UPDATE Manifests SET ArrivalTime = %s WHERE ManifestID = %s", (now, manifest_id))
+        cursor.execute("UPDATE Vehicles SET CurrentBranchID = %s WHERE VehicleID = %s",
+                       (manifest['DestBranchID'], manifest['VehicleID']))
+    return _report(started, manifest_id, count)
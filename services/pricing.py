@@ -0,0 +1,155 @@
+import argparse
+import time
+import numpy as np
+from database import run_query, transaction, cached
+
+# Fiyatlandırma motoru: ücretlendirilebilir ağırlık (gerçek / hacimsel) ve bölge tarifeleri
+# NumPy dizi işlemleriyle hesaplanır; tek kargo ile bir milyon kargo aynı çağrıyla fiyatlanır.
+#   python -m services.pricing reprice --dry-run
+
+VOLUMETRIC_DIVISOR = 5000.0  # cm³ / kg
+WEIGHT_STEP = 0.5            # chargeable weight is rounded up to this (kg)
+REPRICE_BATCH = 10000
+
+class Tariffs:
+    """Tariff tables as arrays; IDs are resolved to row/column indexes with searchsorted."""
+
+    def __init__(self, branch_ids, branch_zones, zone_ids, base_fee, per_kg, service_ids, multiplier, surcharge):
+        order = np.argsort(branch_ids)
+        self.branch_ids = np.asarray(branch_ids, dtype=str)[order]
+        zone_index = {z: i for i, z in enumerate(zone_ids)}
+        # -1 = branch without a zone
+        self.branch_zone = np.array([zone_index.get(z, -1) for z in np.asarray(branch_zones, dtype=object)[order]], dtype=np.int64)
+        self.base_fee = np.asarray(base_fee, dtype=np.float64)
+        self.per_kg = np.asarray(per_kg, dtype=np.float64)
+        order = np.argsort(service_ids)
+        self.service_ids = np.asarray(service_ids, dtype=str)[order]
+        self.multiplier = np.asarray(multiplier, dtype=np.float64)[order]
+        self.surcharge = np.asarray(surcharge, dtype=np.float64)[order]
+
+def load_tariffs():
+    zones = run_query("SELECT ZoneID FROM PricingZones ORDER BY ZoneID")
+    zone_ids = [z['ZoneID'] for z in zones]
+    zone_index = {z: i for i, z in enumerate(zone_ids)}
+    base_fee = np.full((len(zone_ids), len(zone_ids)), np.nan)
+    per_kg = np.full((len(zone_ids), len(zone_ids)), np.nan)
+    for r in run_query("SELECT OriginZoneID, DestZoneID, BaseFee, PerKg FROM ZoneTariffs"):
+        o, d = zone_index[r['OriginZoneID']], zone_index[r['DestZoneID']]
+        base_fee[o, d] = float(r['BaseFee'])
+        per_kg[o, d] = float(r['PerKg'])
+
+    branches = run_query("SELECT BranchID, ZoneID FROM CargoBranches")
+    services = run_query("SELECT ServiceTypeID, Multiplier, Surcharge FROM ServiceTariffs")
+    return Tariffs(
+        [b['BranchID'] for b in branches], [b['ZoneID'] for b in branches], zone_ids, base_fee, per_kg,
+        [s['ServiceTypeID'] for s in services],
+        [float(s['Multiplier']) for s in services], [float(s['Surcharge']) for s in services],
+    )
+
+def get_tariffs():
+    """Tariffs loaded once per process; rebuilt when a tariff / branch table is written."""
+    return cached("pricing.tariffs", ("PricingZones", "ZoneTariffs", "ServiceTariffs", "CargoBranches"), load_tariffs)
+
+def _index(sorted_ids, values):
+    """Positions of `values` in `sorted_ids`, -1 where missing (fixed-width str compare, no Python loop)."""
+    values = np.asarray(values, dtype=str)
+    if len(sorted_ids) == 0:
+        return np.full(values.shape, -1, dtype=np.int64)
+    pos = np.searchsorted(sorted_ids, values)
+    pos = np.minimum(pos, len(sorted_ids) - 1)
+    return np.where(sorted_ids[pos] == values, pos, -1)
+
+def chargeable_weight(weight, length, width, height):
+    """max(actual, volumetric) kg, rounded up to WEIGHT_STEP. Dimensions in cm."""
+    volumetric = np.asarray(length, dtype=np.float64) * np.asarray(width, dtype=np.float64) \
+        * np.asarray(height, dtype=np.float64) / VOLUMETRIC_DIVISOR
+    heavier = np.maximum(np.asarray(weight, dtype=np.float64), volumetric)
+    return np.ceil(heavier / WEIGHT_STEP) * WEIGHT_STEP
+
+def quote(weight, length, width, height, origin_branch, dest_branch, service_type, tariffs=None):
+    """
+    Shipping cost per parcel as a float array. All arguments are scalars or equally long
+    array-likes; parcels with an unknown branch, zone pair or service type get NaN.
+    """
+    tariffs = tariffs or get_tariffs()
+    cw = np.atleast_1d(chargeable_weight(weight, length, width, height))
+    n = len(cw)
+    origin = np.broadcast_to(np.atleast_1d(np.asarray(origin_branch, dtype=str)), (n,))
+    dest = np.broadcast_to(np.atleast_1d(np.asarray(dest_branch, dtype=str)), (n,))
+    service = np.broadcast_to(np.atleast_1d(np.asarray(service_type, dtype=str)), (n,))
+
+    ob = _index(tariffs.branch_ids, origin)
+    db = _index(tariffs.branch_ids, dest)
+    sv = _index(tariffs.service_ids, service)
+    oz = np.where(ob >= 0, tariffs.branch_zone[ob], -1)
+    dz = np.where(db >= 0, tariffs.branch_zone[db], -1)
+    valid = (oz >= 0) & (dz >= 0) & (sv >= 0)
+
+    ozc, dzc, svc = np.where(valid, oz, 0), np.where(valid, dz, 0), np.where(valid, sv, 0)
+    price = (tariffs.base_fee[ozc, dzc] + tariffs.per_kg[ozc, dzc] * cw) * tariffs.multiplier[svc] \
+        + tariffs.surcharge[svc]
+    return np.where(valid, np.round(price, 2), np.nan)
+
+def quote_frame(df, tariffs=None):
+    """Quotes a DataFrame with the Cargos column names."""
+    return quote(df['CargoWeight'].to_numpy(dtype=float), df['CargoLength'].to_numpy(dtype=float),
+                 df['CargoWidth'].to_numpy(dtype=float), df['CargoHeight'].to_numpy(dtype=float),
+                 df['OriginBranchID'].to_numpy(), df['DestBranchID'].to_numpy(), df['ServiceTypeID'].to_numpy(),
+                 tariffs)
+
+def reprice(include_paid=False, dry_run=False, batch_size=REPRICE_BATCH):
+    """
+    Recomputes ShippingCost for every cargo (by default only those not yet paid) in keyset
+    batches and writes back the ones that changed through a temporary-table join.
+    """
+    started = time.perf_counter()
+    tariffs = get_tariffs()
+    scanned = changed = 0
+    last_id = ""
+    paid_filter = "" if include_paid else "AND PaymentStatus <> 'Paid'"
+    while True:
+        rows = run_query(f"""
+            SELECT CargoID, CargoWeight, CargoLength, CargoWidth, CargoHeight,
+                   OriginBranchID, DestBranchID, ServiceTypeID, ShippingCost
+            FROM Cargos WHERE CargoID > %s {paid_filter}
+            ORDER BY CargoID LIMIT %s
+        """, (last_id, batch_size))
+        if not rows:
+            break
+        last_id = rows[-1]['CargoID']
+        scanned += len(rows)
+
+        column = lambda name: np.array([float(r[name]) for r in rows])
+        ids = lambda name: np.array([r[name] for r in rows], dtype=object)
+        new_cost = quote(column('CargoWeight'), column('CargoLength'), column('CargoWidth'), column('CargoHeight'),
+                         ids('OriginBranchID'), ids('DestBranchID'), ids('ServiceTypeID'), tariffs)
+        diff = ~np.isnan(new_cost) & (np.abs(new_cost - column('ShippingCost')) >= 0.005)
+        updates = [(rows[i]['CargoID'], float(new_cost[i])) for i in np.flatnonzero(diff)]
+        changed += len(updates)
+
+        if updates and not dry_run:
+            with transaction() as cursor:
+                cursor.execute("DROP TEMPORARY TABLE IF EXISTS RepriceBatch")
+                cursor.execute("CREATE TEMPORARY TABLE RepriceBatch (CargoID char(12) not null PRIMARY KEY, ShippingCost decimal(10,2) not null)")
+                cursor.executemany("INSERT INTO RepriceBatch (CargoID, ShippingCost) VALUES (%s, %s)", updates)
+                cursor.execute("UPDATE Cargos c JOIN RepriceBatch r ON r.CargoID = c.CargoID SET c.ShippingCost = r.ShippingCost")
+                cursor.execute("DROP TEMPORARY TABLE RepriceBatch")
+        if len(rows) < batch_size:
+            break
+
+    seconds = time.perf_counter() - started
+    return {'scanned': scanned, 'changed': changed, 'dry_run': dry_run, 'seconds': seconds,
+            'quotes_per_second': scanned / seconds if seconds > 0 else 0.0}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Thunder Cargo pricing jobs.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rp = sub.add_parser("reprice", help="recompute ShippingCost from the tariff tables")
+    rp.add_argument("--include-paid", action="store_true", help="also reprice cargos that are already paid")
+    rp.add_argument("--dry-run", action="store_true", help="only count the cargos whose price would change")
+    rp.add_argument("--batch-size", type=int, default=REPRICE_BATCH)
+    args = parser.parse_args()
+    report = reprice(include_paid=args.include_paid, dry_run=args.dry_run, batch_size=args.batch_size)
+    print(f"Scanned {report['scanned']} cargos, {report['changed']} price changes"
+          f"{' (dry run)' if report['dry_run'] else ''} in {report['seconds']:.1f}s "
+          f"({report['quotes_per_second']:,.0f} cargos/s)")
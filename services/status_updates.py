@@ -0,0 +1,82 @@
+import re
+import time
+from datetime import datetime
+from database import run_query, transaction, allocate_ids
+
+# Toplu kargo durum güncelleme: Cargos + TrackingLog tek transaction içinde.
+
+BATCH_SIZE = 1000
+
+def parse_cargo_ids(text):
+    """Splits pasted text (newlines, commas, spaces, semicolons) into unique, upper-cased Cargo IDs."""
+    seen = {}
+    for token in re.split(r"[\s,;]+", str(text)):
+        token = token.strip().upper()
+        if token:
+            seen.setdefault(token, None)
+    return list(seen)
+
+def cargo_ids_from_manifest(manifest_id):
+    rows = run_query("SELECT CargoID FROM ManifestCargo WHERE ManifestID = %s ORDER BY CargoID", (manifest_id,))
+    return [r['CargoID'] for r in rows] if rows else []
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def bulk_update_status(cargo_ids, status_id, branch_id, employee_id, batch_size=BATCH_SIZE):
+    """
+    Sets CurrentStatus/LastUpdated for every existing cargo in `cargo_ids` and appends
+    one TrackingLog row each. All batches commit together or not at all.
+    Cargos already in that status are left alone (no duplicate tracking row).
+    Returns a report dict: requested, updated, missing, skipped ({CargoID: reason}),
+    seconds, rows_per_second.
+    """
+    started = time.perf_counter()
+    now = datetime.now().replace(microsecond=0)
+    updated, missing, skipped = 0, [], {}
+    cargo_ids = list(cargo_ids)
+    # Transaction açılmadan: kilit tutarken ikinci bir havuz bağlantısı beklenmesin.
+    # Bulunamayan kargoların numaraları boşa gider.
+    track_ids = iter(allocate_ids('TrackingLog', len(cargo_ids)))
+
+    with transaction() as cursor:
+        cursor.execute("SELECT StatusDescription FROM CargoStatusType WHERE StatusID = %s", (status_id,))
+        status = cursor.fetchone()
+        if not status:
+            raise ValueError(f"Unknown status: {status_id}")
+
+        for batch in _chunks(cargo_ids, batch_size):
+            placeholders = ", ".join(["%s"] * len(batch))
+            cursor.execute(f"SELECT CargoID, StatusID FROM Cargos WHERE CargoID IN ({placeholders}) FOR UPDATE", batch)
+            found = {r['CargoID'].upper(): r['StatusID'] for r in cursor.fetchall()}
+            missing.extend(c for c in batch if c.upper() not in found)
+            for c in batch:
+                if c.upper() in found and found[c.upper()] == status_id:
+                    skipped[c] = f"already '{status['StatusDescription']}'"
+            ids = [c for c in batch if c.upper() in found and c not in skipped]
+            if not ids:
+                continue
+
+            placeholders = ", ".join(["%s"] * len(ids))
+            cursor.execute(
+                f"UPDATE Cargos SET CurrentStatus = %s, LastUpdated = %s WHERE CargoID IN ({placeholders})",
+                [status['StatusDescription'], now, *ids]
+            )
+            cursor.executemany(
+                "INSERT INTO TrackingLog (TrackID, LogTimestamps, CargoID, BranchID, EmployeeID, StatusID) "
+                "VALUES (%s, %s, %s, %s, %s, %s)",
+                [(track_id, now, cid, branch_id, employee_id, status_id)
+                 for cid, track_id in zip(ids, track_ids)]  # ids önce: fazladan numara tüketmesin
+            )
+            updated += len(ids)
+
+    seconds = time.perf_counter() - started
+    return {
+        'requested': len(cargo_ids),
+        'updated': updated,
+        'missing': missing,
+        'skipped': skipped,
+        'seconds': seconds,
+        'rows_per_second': updated / seconds if seconds > 0 else 0.0,
+    }
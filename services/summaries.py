@@ -0,0 +1,58 @@
+from database import transaction
+
+# BranchCargoSummary / CustomerStats sayaçlarının toplu yeniden hesaplanması.
+# Satır başına tetikleyiciler @skip_summary_triggers ile kapatılan toplu işlerden
+# (scripts.generate_data, arşivleme) sonra tek geçişte kaynaktan yeniden kurulur.
+# Arşivlenen kargolar (migration 010) sayılmaya devam eder: canlı + arşiv tabloları birlikte.
+
+BRANCH_SUMMARY_SQL = """
+INSERT INTO BranchCargoSummary (BranchID, CurrentStatus, CargoCount, Revenue)
+SELECT OriginBranchID, CurrentStatus, COUNT(*), SUM(ShippingCost)
+FROM (
+    SELECT OriginBranchID, CurrentStatus, ShippingCost FROM Cargos
+    UNION ALL
+    SELECT OriginBranchID, CurrentStatus, ShippingCost FROM CargosArchive
+) c
+GROUP BY OriginBranchID, CurrentStatus
+"""
+
+CUSTOMER_STATS_SQL = """
+INSERT INTO CustomerStats (CustID, OutgoingCount, IncomingCount, ActiveIncoming, TotalSpend)
+SELECT CustID, SUM(OutgoingCount), SUM(IncomingCount), SUM(ActiveIncoming), SUM(TotalSpend)
+FROM (
+    SELECT SenderCustID AS CustID, COUNT(*) AS OutgoingCount, 0 AS IncomingCount,
+           0 AS ActiveIncoming, 0 AS TotalSpend
+    FROM (SELECT SenderCustID FROM Cargos UNION ALL SELECT SenderCustID FROM CargosArchive) c
+    GROUP BY SenderCustID
+    UNION ALL
+    SELECT c.ReceiverCustID, 0, COUNT(*), SUM(COALESCE(s.IsTerminal, 0) = 0), 0
+    FROM (SELECT ReceiverCustID, StatusID FROM Cargos
+          UNION ALL SELECT ReceiverCustID, StatusID FROM CargosArchive) c
+    LEFT JOIN CargoStatusType s ON s.StatusID = c.StatusID
+    GROUP BY c.ReceiverCustID
+    UNION ALL
+    SELECT CustID, 0, 0, 0, SUM(TotalAmount)
+    FROM (SELECT CustID, TotalAmount FROM Invoice UNION ALL SELECT CustID, TotalAmount FROM InvoiceArchive) i
+    GROUP BY CustID
+) parts
+GROUP BY CustID
+"""
+
+def rebuild_branch_summary(cursor):
+    cursor.execute("DELETE FROM BranchCargoSummary")
+    cursor.execute(BRANCH_SUMMARY_SQL)
+
+def rebuild_customer_stats(cursor):
+    # Customers without any cargo or invoice keep a zero row, as migration 004 created them
+    cursor.execute("UPDATE CustomerStats SET OutgoingCount = 0, IncomingCount = 0, ActiveIncoming = 0, TotalSpend = 0")
+    cursor.execute(CUSTOMER_STATS_SQL + """
+        ON DUPLICATE KEY UPDATE OutgoingCount = VALUES(OutgoingCount), IncomingCount = VALUES(IncomingCount),
+                                ActiveIncoming = VALUES(ActiveIncoming), TotalSpend = VALUES(TotalSpend)""")
+
+def rebuild_summaries(cursor=None):
+    """Recomputes both counter tables; on `cursor` if given, else in its own transaction."""
+    if cursor is None:
+        with transaction() as cursor:
+            return rebuild_summaries(cursor)
+    rebuild_branch_summary(cursor)
+    rebuild_customer_stats(cursor)
@@ -0,0 +1,180 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+import streamlit as st
+from database import run_query, get_query_cache, QueryCache, _MISS
+from utils import mask_name
+
+# Herkese açık kargo takibi: başlık + hareket geçmişi. Streamlit sayfası (guest) ve
+# bağımsız HTTP servisi (services.tracking_api) aynı sorguları ve maskelemeyi kullanır.
+
+CARGO_ID_RE = re.compile(r"^[A-Z0-9]{1,12}$")
+
+# Sorgu sınırı: istemci başına token bucket (saniyede RATE, en fazla BURST art arda).
+RATE = 1.0
+BURST = 10
+MAX_CLIENTS = 10000      # buckets kept; least recently seen clients are dropped first
+NEGATIVE_TTL = 60        # seconds a non-existent CargoID is answered from memory
+
+CARGO_SQL = """
+SELECT c.CargoID, c.CurrentStatus, c.LastUpdated,
+       s.FirstName as SenderName, s.LastName as SenderLast,
+       r.FirstName as ReceiverName, r.LastName as ReceiverLast,
+       ob.BranchCity as Origin, db.BranchCity as Dest
+FROM Cargos c
+JOIN Customers s ON c.SenderCustID = s.CustID
+JOIN Customers r ON c.ReceiverCustID = r.CustID
+JOIN CargoBranches ob ON c.OriginBranchID = ob.BranchID
+JOIN CargoBranches db ON c.DestBranchID = db.BranchID
+WHERE c.CargoID = %s
+"""
+
+LOG_SQL = """
+SELECT t.LogTimestamps, st.StatusDescription, b.BranchName, b.BranchCity
+FROM TrackingLog t
+JOIN CargoStatusType st ON t.StatusID = st.StatusID
+JOIN CargoBranches b ON t.BranchID = b.BranchID
+WHERE t.CargoID = %s
+ORDER BY t.LogTimestamps DESC
+"""
+
+# Arşivlenmiş kargolar (services.archive) aynı sorgularla arşiv tablolarından okunur
+ARCHIVE_CARGO_SQL = CARGO_SQL.replace("FROM Cargos c", "FROM CargosArchive c")
+ARCHIVE_LOG_SQL = LOG_SQL.replace("FROM TrackingLog t", "FROM TrackingLogArchive t")
+
+def normalize_cargo_id(value):
+    """Upper-cased, stripped Cargo ID, or None if it cannot be one."""
+    cargo_id = str(value or "").strip().upper()
+    return cargo_id if CARGO_ID_RE.match(cargo_id) else None
+
+def get_tracking(cargo_id, fetch=run_query):
+    """
+    Public view of a shipment: header with masked names plus its TrackingLog timeline
+    (newest first), or None if the cargo does not exist. `fetch(sql, params)` must
+    return a list of dict rows; the HTTP service passes its own pool-backed one.
+    Archived shipments are read from the archive tables.
+    """
+    rows, log_sql = fetch(CARGO_SQL, (cargo_id,)), LOG_SQL
+    if not rows:
+        rows, log_sql = fetch(ARCHIVE_CARGO_SQL, (cargo_id,)), ARCHIVE_LOG_SQL
+    if not rows:
+        return None
+    cargo = rows[0]
+    return {
+        "cargo_id": cargo['CargoID'],
+        "status": cargo['CurrentStatus'],
+        "last_updated": cargo['LastUpdated'],
+        "origin": cargo['Origin'],
+        "destination": cargo['Dest'],
+        "sender": mask_name(f"{cargo['SenderName']} {cargo['SenderLast']}"),
+        "receiver": mask_name(f"{cargo['ReceiverName']} {cargo['ReceiverLast']}"),
+        "events": [
+            {
+                "timestamp": log['LogTimestamps'],
+                "status": log['StatusDescription'],
+                "branch": log['BranchName'],
+                "city": log['BranchCity'],
+            }
+            for log in fetch(log_sql, (cargo_id,)) or []
+        ],
+    }
+
+class TokenBuckets:
+    """Thread-safe token bucket per key with LRU eviction beyond `max_keys`."""
+
+    def __init__(self, rate=RATE, burst=BURST, max_keys=MAX_CLIENTS):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> [tokens, updated_at]
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def take(self, key):
+        """0.0 if a token was taken, otherwise seconds until the next one."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return (1 - bucket[0]) / self.rate
+
+    def __len__(self):
+        with self._lock:
+            return len(self._buckets)
+
+class TrackingGuard:
+    """
+    Throttling + negative cache in front of get_tracking(). Misses are remembered in their
+    own QueryCache tagged with Cargos (so scraping cannot evict useful query results) and
+    expire after `negative_ttl`, or as soon as Cargos is written if the cache is linked.
+    """
+
+    def __init__(self, rate=RATE, burst=BURST, max_clients=MAX_CLIENTS, negative_ttl=NEGATIVE_TTL, cache=None):
+        self.buckets = TokenBuckets(rate, burst, max_clients)
+        self.negative_ttl = negative_ttl
+        self.cache = cache if cache is not None else QueryCache(max_entries=max_clients)
+        self._lock = threading.Lock()
+        self._stats = {"allowed": 0, "throttled": 0, "negative_hits": 0, "negative_stored": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def throttle(self, client):
+        """0.0 if `client` may look up now, else seconds to wait."""
+        wait = self.buckets.take(client)
+        self._count("throttled" if wait else "allowed")
+        return wait
+
+    def known_missing(self, cargo_id):
+        if self.cache.get(("tracking.missing", cargo_id)) is _MISS:
+            return False
+        self._count("negative_hits")
+        return True
+
+    def remember_missing(self, cargo_id):
+        self.cache.set(("tracking.missing", cargo_id), True, self.negative_ttl, ("cargos",))
+        self._count("negative_stored")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["clients"] = len(self.buckets)
+        stats["client_evictions"] = self.buckets.evictions
+        return stats
+
+@st.cache_resource
+def get_tracking_guard():
+    """Guard shared by every Streamlit session; Cargos writes in this process clear its misses."""
+    guard = TrackingGuard()
+    get_query_cache().link(guard.cache)
+    return guard
+
+def track(cargo_id, client, guard=None, fetch=run_query):
+    """
+    ("ok", tracking) / ("not_found", None) / ("throttled", seconds_to_wait) for one lookup
+    by `client` (session or IP key). Throttled and negative-cache answers never touch MySQL.
+    """
+    guard = guard or get_tracking_guard()
+    wait = guard.throttle(client)
+    if wait:
+        return "throttled", wait
+    if guard.known_missing(cargo_id):
+        return "not_found", None
+    result = get_tracking(cargo_id, fetch)
+    if result is None:
+        guard.remember_missing(cargo_id)
+        return "not_found", None
+    return "ok", result
@@ -0,0 +1,248 @@
+import argparse
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from decimal import Decimal
+from urllib.parse import parse_qs, urlsplit
+from database import ConnectionPool, QueryCache, get_db_connection, pool_fetch, _MISS
+from services.tracking import TrackingGuard, get_tracking, normalize_cargo_id, RATE, BURST
+
+# "Kargom nerede?" için Streamlit dışında çalışan hafif JSON servisi.
+# asyncio üzerinde tek süreç: sık sorgulanan ID'ler bellekten, diğerleri havuzdaki
+# bağlantılarla thread'lerde okunur; aynı ID için eşzamanlı istekler tek sorguya düşer.
+#   python -m services.tracking_api --port 8081
+#   curl http://127.0.0.1:8081/track/CG001
+#   uvicorn --factory services.tracking_api:create_app   (ASGI)
+
+log = logging.getLogger("tracking_api")
+
+HOT_TTL = 5.0        # seconds a looked-up shipment is served from memory
+CACHE_SIZE = 10000   # hot IDs kept
+WORKERS = 4          # DB threads = pooled connections
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            429: "Too Many Requests", 503: "Service Unavailable"}
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+def encode(payload):
+    return json.dumps(payload, default=_json_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class TrackingService:
+    """
+    Routes requests, throttles clients and keeps the hot-ID / negative caches;
+    HTTP framing lives in handle_connection() / asgi_app().
+    """
+
+    def __init__(self, fetch, pool=None, workers=WORKERS, ttl=HOT_TTL, cache_size=CACHE_SIZE, guard=None,
+                 trust_proxy=False):
+        self.fetch = fetch
+        self.pool = pool
+        self.ttl = ttl
+        self.cache = QueryCache(max_entries=cache_size)
+        self.guard = guard or TrackingGuard()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tracking-db")
+        self._inflight = {}  # cargo_id -> Future shared by concurrent requests
+        self.trust_proxy = trust_proxy
+        self._stats = {"requests": 0, "db_lookups": 0, "coalesced": 0, "errors": 0}
+
+    async def lookup(self, cargo_id):
+        """Encoded JSON body for `cargo_id`, None if the cargo does not exist."""
+        body = self.cache.get(cargo_id)
+        if body is not _MISS:
+            return body
+        pending = self._inflight.get(cargo_id)
+        if pending is not None:
+            self._stats["coalesced"] += 1
+            return await asyncio.shield(pending)
+
+        loop = asyncio.get_running_loop()
+        pending = self._inflight[cargo_id] = loop.create_future()
+        # Nobody may be waiting on it; retrieve the exception so asyncio does not warn
+        pending.add_done_callback(lambda f: f.cancelled() or f.exception())
+        try:
+            self._stats["db_lookups"] += 1
+            result = await loop.run_in_executor(self.executor, get_tracking, cargo_id, self.fetch)
+            body = None if result is None else encode(result)
+            if body is not None:
+                self.cache.set(cargo_id, body, self.ttl, ("cargos", "trackinglog"))
+            pending.set_result(body)
+            return body
+        except Exception as exc:
+            pending.set_exception(exc)
+            raise
+        finally:
+            del self._inflight[cargo_id]
+
+    def stats(self):
+        stats = {"service": dict(self._stats), "cache": self.cache.stats(), "guard": self.guard.stats()}
+        if self.pool is not None:
+            stats["pool"] = self.pool.stats()
+        return stats
+
+    async def handle(self, method, target, client):
+        """(status, body, extra headers) for one request from `client` (an IP)."""
+        self._stats["requests"] += 1
+        if method not in ("GET", "HEAD"):
+            return 405, encode({"error": "method not allowed"}), []
+        url = urlsplit(target)
+        if url.path == "/health":
+            return 200, encode(self.stats()), []
+        if url.path == "/track":
+            raw = parse_qs(url.query).get("id", [""])[0]
+        elif url.path.startswith("/track/"):
+            raw = url.path[len("/track/"):]
+        else:
+            return 404, encode({"error": "not found"}), []
+
+        wait = self.guard.throttle(client)
+        if wait:
+            return 429, encode({"error": "too many requests", "retry_after": round(wait, 1)}), \
+                [("Retry-After", str(max(1, round(wait))))]
+        cargo_id = normalize_cargo_id(raw)
+        if cargo_id is None:
+            return 400, encode({"error": "invalid tracking number"}), []
+        if self.guard.known_missing(cargo_id):
+            return 404, encode({"error": "shipment not found", "cargo_id": cargo_id}), []
+        try:
+            body = await self.lookup(cargo_id)
+        except Exception:
+            self._stats["errors"] += 1
+            log.exception("Tracking lookup failed for %s", cargo_id)
+            return 503, encode({"error": "tracking temporarily unavailable"}), []
+        if body is None:
+            self.guard.remember_missing(cargo_id)
+            return 404, encode({"error": "shipment not found", "cargo_id": cargo_id}), []
+        return 200, body, []
+
+    def headers(self, status, length, extra=()):
+        headers = [
+            ("Content-Type", "application/json; charset=utf-8"),
+            ("Content-Length", str(length)),
+            ("Access-Control-Allow-Origin", "*"),
+        ]
+        if status == 200:
+            headers.append(("Cache-Control", f"public, max-age={int(self.ttl)}"))
+        headers.extend(extra)
+        return headers
+
+    def client_key(self, peer, forwarded_for=None):
+        """Throttling key: first X-Forwarded-For hop when running behind a trusted proxy, else the peer IP."""
+        if self.trust_proxy and forwarded_for:
+            return forwarded_for.split(",")[0].strip()
+        return peer
+
+    async def handle_connection(self, reader, writer):
+        """HTTP/1.1 with keep-alive; requests on one connection are answered in order."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                parts = lines[0].split(" ")
+                if len(parts) != 3:
+                    writer.write(self._response(400, encode({"error": "bad request"}), False))
+                    break
+                method, target, version = parts
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip().lower()
+                length = int(headers.get("content-length") or 0)
+                if length:
+                    await reader.readexactly(length)
+
+                peer = (writer.get_extra_info("peername") or ("unknown",))[0]
+                client = self.client_key(peer, headers.get("x-forwarded-for"))
+                status, body, extra = await self.handle(method, target, client)
+                connection = headers.get("connection", "")
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                writer.write(self._response(status, body, keep_alive, extra, include_body=method != "HEAD"))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def _response(self, status, body, keep_alive, extra=(), include_body=True):
+        headers = self.headers(status, len(body), extra)
+        headers.append(("Connection", "keep-alive" if keep_alive else "close"))
+        head = f"HTTP/1.1 {status} {_REASONS[status]}\r\n" + "".join(f"{k}: {v}\r\n" for k, v in headers)
+        return head.encode("latin-1") + b"\r\n" + (body if include_body else b"")
+
+def asgi_app(service):
+    """ASGI application over `service` (uvicorn, hypercorn, ...)."""
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    service.executor.shutdown(wait=False)
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+        target = scope["path"]
+        if scope.get("query_string"):
+            target += "?" + scope["query_string"].decode("latin-1")
+        forwarded_for = dict(scope.get("headers") or []).get(b"x-forwarded-for", b"").decode("latin-1")
+        client = service.client_key((scope.get("client") or ("unknown",))[0], forwarded_for)
+        status, body, extra = await service.handle(scope["method"], target, client)
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(k.lower().encode(), v.encode()) for k, v in service.headers(status, len(body), extra)],
+        })
+        await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else body})
+    return app
+
+def build_service(workers=WORKERS, ttl=HOT_TTL, cache_size=CACHE_SIZE, rate=RATE, burst=BURST, trust_proxy=False):
+    """Service with its own connection pool (settings from .streamlit/secrets.toml)."""
+    pool = ConnectionPool(get_db_connection, size=workers)
+    return TrackingService(pool_fetch(pool), pool=pool, workers=workers, ttl=ttl, cache_size=cache_size,
+                           guard=TrackingGuard(rate=rate, burst=burst), trust_proxy=trust_proxy)
+
+def create_app():
+    return asgi_app(build_service())
+
+async def serve(service, host, port):
+    server = await asyncio.start_server(service.handle_connection, host, port, backlog=1024)
+    log.info("Tracking API listening on http://%s:%s/track/<CargoID>", host, port)
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Public shipment tracking as JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--workers", type=int, default=WORKERS, help="DB threads / pooled connections")
+    parser.add_argument("--ttl", type=float, default=HOT_TTL, help="seconds a shipment is served from memory")
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE)
+    parser.add_argument("--rate", type=float, default=RATE, help="lookups per second per client")
+    parser.add_argument("--burst", type=int, default=BURST, help="lookups a client may make back to back")
+    parser.add_argument("--trust-proxy", action="store_true", help="throttle by X-Forwarded-For")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    service = build_service(args.workers, args.ttl, args.cache_size, args.rate, args.burst, args.trust_proxy)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
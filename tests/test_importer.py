@@ -0,0 +1,54 @@
+import io
+from contextlib import contextmanager
+import pytest
+from services import importer
+
+class FakeCursor:
+    """Stands in for the transaction cursor: no existing rows, remembers inserted records."""
+
+    def __init__(self, inserted):
+        self.inserted = inserted
+
+    def execute(self, sql, params=None):
+        pass
+
+    def fetchall(self):
+        return []
+
+    def executemany(self, sql, records):
+        self.inserted.extend(records)
+
+@pytest.fixture
+def inserted(monkeypatch):
+    rows = []
+    numbers = iter(range(1, 1000))
+
+    @contextmanager
+    def transaction():
+        yield FakeCursor(rows)
+
+    monkeypatch.setattr(importer, "transaction", transaction)
+    monkeypatch.setattr(importer, "allocate_ids",
+                        lambda table, count, cursor=None: [f"CU{next(numbers):03d}" for _ in range(count)])
+    return rows
+
+def customers_csv(emails):
+    lines = ["FirstName,LastName,CustNumber,Email,Address,Country,City,Username,PasswordHash"]
+    for i, email in enumerate(emails):
+        lines.append(f"Ayse,Demir,555000{i:04d},{email},Street {i},Turkey,Istanbul,user{i},hash")
+    return io.StringIO("\n".join(lines) + "\n")
+
+def test_blank_emails_across_chunks_are_not_duplicates(inserted, tmp_path):
+    report = importer.import_csv("customers", customers_csv([""] * 6), reject_path=str(tmp_path / "r.csv"),
+                                 chunk_size=2)
+    assert report['inserted'] == 6
+    assert report['rejected'] == 0
+    assert all(row[importer.CUSTOMER_COLUMNS.index('Email')] is None for row in inserted)
+
+def test_repeated_email_in_a_later_chunk_is_rejected(inserted, tmp_path):
+    reject_path = tmp_path / "r.csv"
+    report = importer.import_csv("customers", customers_csv(["a@x.com", "", "", "a@x.com", ""]),
+                                 reject_path=str(reject_path), chunk_size=2)
+    assert report['inserted'] == 4
+    assert report['rejected'] == 1
+    assert "duplicate Email in file" in reject_path.read_text(encoding="utf-8")
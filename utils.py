@@ -1,7 +1,62 @@
+from collections import namedtuple
+from database import run_query, cached
+
+# Durum kaydı: CargoStatusType + CargoStatusAlias bir kez okunur, her çağrı tek sözlük araması.
+StatusInfo = namedtuple("StatusInfo", "status_id description progress terminal")
+
+class StatusRegistry:
+    """Maps StatusIDs, descriptions and aliases (case-insensitive) to StatusInfo."""
+
+    def __init__(self, statuses, aliases):
+        self.by_id = {s.status_id: s for s in statuses}
+        self._lookup = {}
+        for s in statuses:
+            self._lookup[self._key(s.status_id)] = s
+            self._lookup[self._key(s.description)] = s
+        for alias, status_id in aliases:
+            if status_id in self.by_id:
+                self._lookup.setdefault(self._key(alias), self.by_id[status_id])
+        self.terminal_ids = sorted(s.status_id for s in statuses if s.terminal)
+        self.active_ids = sorted(s.status_id for s in statuses if not s.terminal)
+        self._progress = {k: s.progress for k, s in self._lookup.items()}
+
+    @staticmethod
+    def _key(status):
+        return str(status).strip().casefold()
+
+    def get(self, status):
+        """StatusInfo for an ID / description / alias, None if unknown."""
+        return self._lookup.get(self._key(status))
+
+    def progress(self, status):
+        info = self.get(status)
+        return info.progress if info else 0
+
+    def is_terminal(self, status):
+        info = self.get(status)
+        return bool(info and info.terminal)
+
+    def progress_series(self, statuses):
+        """Vectorized progress for a pandas Series of statuses (unknown -> 0)."""
+        return statuses.astype(str).str.strip().str.casefold().map(self._progress).fillna(0).astype(int)
+
+def load_status_registry():
+    statuses = [
+        StatusInfo(r['StatusID'], r['StatusDescription'], int(r['Progress']), bool(r['IsTerminal']))
+        for r in run_query("SELECT StatusID, StatusDescription, Progress, IsTerminal FROM CargoStatusType")
+    ]
+    aliases = [(r['Alias'], r['StatusID']) for r in run_query("SELECT Alias, StatusID FROM CargoStatusAlias")]
+    return StatusRegistry(statuses, aliases)
+
+def get_status_registry():
+    return cached("status.registry", ("CargoStatusType", "CargoStatusAlias"), load_status_registry)
+
 def get_progress_value(status):
-    status = str(status).lower()
-    if "hazır" in status or "pending" in status: return 25
-    elif "yol" in status or "transit" in status: return 50
-    elif "dağıtım" in status or "delivery" in status: return 75
-    elif "teslim" in status or "delivered" in status: return 100
-    return 0
\ No newline at end of file
+    return get_status_registry().progress(status)
+
+def mask_name(full_name):
+    """İsimleri KVKK gereği yıldızlar: Ahmet Yılmaz -> A**** Y*****"""
+    if not full_name or str(full_name) == 'nan': return "******"
+    parts = full_name.split()
+    masked_parts = [p[0] + "*" * (len(p)-1) if len(p) > 1 else p for p in parts]
+    return " ".join(masked_parts)
\ No newline at end of file
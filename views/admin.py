@@ -1,20 +1,39 @@
+import io
+import os
+import tempfile
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-from database import run_query
+from datetime import datetime, timedelta
+from database import run_query, run_queries, get_pool_stats, get_query_cache, get_query_stats, get_router
+from services.tracking import get_tracking_guard
+from services.change_feed import get_change_feed
 from utils import get_progress_value
+from services.status_updates import parse_cargo_ids, cargo_ids_from_manifest, bulk_update_status
+from services.manifests import get_manifest_cargo, load_cargo, depart, arrive
+from services.export import DATASETS, export
+from services.importer import CUSTOMER_COLUMNS, CARGO_COLUMNS, import_csv
+from services.employees import get_directory, fetch_employee_page, get_employee, add_employee, update_employee, delete_employee
+from services.analytics import DIMENSIONS, MEASURES, daily_totals_query, breakdown_query, lanes_query, refresh_cube
 
 def show_dashboard():
     st.title("📊 Logistics Management Dashboard")
     try:
-        # Verileri çek
-        total_cargo_res = run_query("SELECT COUNT(*) as count FROM Cargos")
-        total_rev_res = run_query("SELECT SUM(ShippingCost) as total FROM Cargos")
-        active_branch_res = run_query("SELECT COUNT(*) as count FROM CargoBranches")
-        
-        total_cargo = total_cargo_res[0]['count'] if total_cargo_res else 0
-        total_revenue = total_rev_res[0]['total'] if total_rev_res else 0
-        active_branches = active_branch_res[0]['count'] if active_branch_res else 0
+        # Şube listesi (önbellekten) ve şube / durum özet tablosu aynı anda okunur (Cargos taranmaz)
+        res = run_queries({
+            "branches": ("SELECT BranchID, BranchName FROM CargoBranches", None),
+            "summary": ("SELECT BranchID, CurrentStatus, CargoCount, Revenue FROM BranchCargoSummary", None),
+        })
+        if res.errors:
+            raise next(iter(res.errors.values()))
+        branches = pd.DataFrame(res["branches"], columns=['BranchID', 'BranchName'])
+        summary = pd.DataFrame(res["summary"], columns=['BranchID', 'CurrentStatus', 'CargoCount', 'Revenue'])
+        df = branches.merge(summary, on='BranchID', how='left')
+        df['CargoCount'] = df['CargoCount'].fillna(0).astype(int)
+        df['Revenue'] = df['Revenue'].fillna(0).astype(float)
+
+        total_cargo = int(df['CargoCount'].sum())
+        total_revenue = float(df['Revenue'].sum())
+        active_branches = df['BranchID'].nunique()
         
         col1, col2, col3 = st.columns(3)
         col1.metric("Total Cargo", f"{total_cargo} Pcs")
@@ -23,24 +42,116 @@ def show_dashboard():
         
         st.divider()
         st.subheader("📍 Branch Based Cargo Density")
-        branch_data = run_query("""
-            SELECT b.BranchName, COUNT(c.CargoID) as CargoCount 
-            FROM Cargos c
-            JOIN CargoBranches b ON c.OriginBranchID = b.BranchID
-            GROUP BY b.BranchName
-        """)
-        if branch_data:
-            df_branch = pd.DataFrame(branch_data)
+        # plotly yalnızca grafik çizilen sayfada yüklenir (soğuk başlangıçta ~yarım saniye)
+        import plotly.express as px
+        df_branch = df.groupby('BranchName', as_index=False)['CargoCount'].sum()
+        df_branch = df_branch[df_branch['CargoCount'] > 0]
+        if not df_branch.empty:
             fig_bar = px.bar(df_branch, x='BranchName', y='CargoCount', 
                             color='CargoCount', title="Cargo Count by Branch")
             st.plotly_chart(fig_bar, use_container_width=True)
+
+        df_status = df.dropna(subset=['CurrentStatus']).groupby('CurrentStatus', as_index=False)['CargoCount'].sum()
+        df_status = df_status[df_status['CargoCount'] > 0]
+        if not df_status.empty:
+            fig_status = px.pie(df_status, names='CurrentStatus', values='CargoCount', title="Cargo Count by Status")
+            st.plotly_chart(fig_status, use_container_width=True)
             
     except Exception as e:
         st.error(f"Dashboard Error: {e}")
 
+def show_analytics():
+    st.title("💹 Revenue & Volume Analytics")
+    st.caption("Served from the daily cube (CargoDailyFacts, `python -m services.analytics refresh`); "
+               "Cargos and Invoice are not read here.")
+
+    # Boyut isimleri önbellekten; küp sorguları aynı anda çalışır
+    lookups = run_queries({
+        "branches": ("SELECT BranchID, BranchName FROM CargoBranches", None),
+        "services": ("SELECT ServiceTypeID, ServiceType FROM ServiceTypes", None),
+        "watermark": ("SELECT Watermark, UpdatedAt FROM RollupWatermarks WHERE Name = 'CargoDailyFacts'", None),
+    }, default=[])
+    branch_names = {b['BranchID']: b['BranchName'] for b in lookups["branches"]}
+    service_names = {s['ServiceTypeID']: s['ServiceType'] for s in lookups["services"]}
+    names = {"OriginBranchID": branch_names, "DestBranchID": branch_names, "ServiceTypeID": service_names}
+
+    f1, f2, f3 = st.columns(3)
+    with f1:
+        today = datetime.now().date()
+        period = st.date_input("Period", value=(today - timedelta(days=90), today), key="analytics_period")
+        grain = st.radio("Grain", ["Day", "Week", "Month"], horizontal=True)
+    with f2:
+        measure_label = st.selectbox("Measure", list(MEASURES.keys()))
+        dimension_label = st.selectbox("Break down by", ["None"] + list(DIMENSIONS.keys()))
+    with f3:
+        services = st.multiselect("Service types", list(service_names.keys()), format_func=lambda s: service_names.get(s, s))
+        if lookups["watermark"]:
+            st.caption(f"Cube up to: {lookups['watermark'][0]['Watermark']}")
+        if st.button("Refresh cube"):
+            with st.spinner("Rolling up changed days..."):
+                report = refresh_cube()
+            st.success(f"✅ {report['days']} day(s) refreshed in {report['seconds']:.1f} s")
+
+    if not isinstance(period, (tuple, list)) or len(period) != 2:
+        st.info("Select a start and an end date.")
+        return
+    date_from, date_to = period
+    measure = MEASURES[measure_label]
+    queries = {
+        "daily": daily_totals_query(date_from, date_to, services),
+        "lanes": lanes_query(date_from, date_to, measure, services),
+    }
+    if dimension_label != "None":
+        queries["breakdown"] = breakdown_query(date_from, date_to, measure, DIMENSIONS[dimension_label], services)
+    res = run_queries(queries, default=[])
+    for name, error in res.errors.items():
+        st.error(f"Analytics query '{name}' failed: {error}")
+
+    daily = pd.DataFrame(res["daily"], columns=['Day', 'CargoCount', 'ShippingRevenue', 'InvoiceCount',
+                                                'InvoicedAmount', 'TotalWeight'])
+    if daily.empty:
+        st.info("No data in the cube for this period.")
+        return
+    daily['Day'] = pd.to_datetime(daily['Day'])
+    daily = daily.set_index('Day').astype(float)
+
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Cargos", f"{int(daily['CargoCount'].sum()):,}")
+    m2.metric("Shipping Revenue", f"₺{daily['ShippingRevenue'].sum():,.2f}")
+    m3.metric("Invoiced", f"₺{daily['InvoicedAmount'].sum():,.2f}")
+    m4.metric("Weight", f"{daily['TotalWeight'].sum():,.0f} kg")
+
+    import plotly.express as px
+    rule = {"Day": "D", "Week": "W-MON", "Month": "MS"}[grain]
+    if "breakdown" in queries:
+        dimension = DIMENSIONS[dimension_label]
+        parts = pd.DataFrame(res["breakdown"], columns=['Day', 'Slice', 'Value'])
+        parts['Day'] = pd.to_datetime(parts['Day'])
+        parts['Slice'] = parts['Slice'].map(lambda v: names.get(dimension, {}).get(v, v))
+        series = (parts.pivot_table(index='Day', columns='Slice', values='Value', aggfunc='sum')
+                  .astype(float).resample(rule, label='left', closed='left').sum())
+        series['Total'] = daily[measure].resample(rule, label='left', closed='left').sum()
+        long = series.reset_index().melt(id_vars='Day', var_name=dimension_label, value_name=measure_label)
+        fig = px.line(long, x='Day', y=measure_label, color=dimension_label, markers=grain != "Day",
+                      title=f"{measure_label} by {dimension_label.lower()} (top {len(series.columns) - 1} + total)")
+    else:
+        series = daily[measure].resample(rule, label='left', closed='left').sum().reset_index()
+        series.columns = ['Day', measure_label]
+        fig = px.bar(series, x='Day', y=measure_label, title=f"{measure_label} per {grain.lower()}")
+    st.plotly_chart(fig, use_container_width=True)
+
+    lanes = pd.DataFrame(res["lanes"], columns=['OriginBranchID', 'DestBranchID', 'Value'])
+    if not lanes.empty:
+        lanes['Lane'] = (lanes['OriginBranchID'].map(lambda b: branch_names.get(b, b)) + " → "
+                         + lanes['DestBranchID'].map(lambda b: branch_names.get(b, b)))
+        lanes['Value'] = lanes['Value'].astype(float)
+        fig_lanes = px.bar(lanes.iloc[::-1], x='Value', y='Lane', orientation='h',
+                           title=f"Top lanes by {measure_label.lower()}", labels={'Value': measure_label})
+        st.plotly_chart(fig_lanes, use_container_width=True)
+
 def show_tracking():
     st.title("🔎 Internal Tracking System (Detailed)")
-    cargo_id_input = st.text_input("Enter Cargo ID", max_chars=5)
+    cargo_id_input = st.text_input("Enter Cargo ID", max_chars=12)
     
     if st.button("Search"):
         if cargo_id_input:
@@ -57,6 +168,9 @@ def show_tracking():
             WHERE c.CargoID = %s
             """
             data = run_query(query, (cargo_id_input,))
+            if not data:
+                # Arşivlenmiş kargo (services.archive)
+                data = run_query(query.replace("FROM Cargos c", "FROM CargosArchive c"), (cargo_id_input,))
             
             if data:
                 cargo = data[0]
@@ -83,10 +197,84 @@ def show_tracking():
             else:
                 st.error("Record not found.")
 
+SHIPMENT_COLUMNS = """
+    c.CargoID, c.SenderCustID, c.ReceiverCustID, c.OriginBranchID, c.DestBranchID,
+    c.CurrentStatus, c.ServiceTypeID, c.CargoWeight, c.ShippingCost,
+    c.PaymentType, c.PaymentStatus, c.LastUpdated
+"""
+PAYMENT_STATUSES = ["Paid", "Pending", "Refunded"]
+
+def fetch_shipments_page(filters, cursor=None, page_size=50):
+    """
+    Bir sayfa kargo getirir (keyset pagination, LastUpdated DESC, CargoID DESC).
+    cursor: önceki sayfanın son satırının (LastUpdated, CargoID) değeri.
+    Returns (rows, has_next).
+    """
+    where, params = [], []
+    if filters.get('statuses'):
+        where.append(f"c.CurrentStatus IN ({', '.join(['%s'] * len(filters['statuses']))})")
+        params.extend(filters['statuses'])
+    if filters.get('branch_id'):
+        where.append("c.OriginBranchID = %s")
+        params.append(filters['branch_id'])
+    if filters.get('payment_statuses'):
+        where.append(f"c.PaymentStatus IN ({', '.join(['%s'] * len(filters['payment_statuses']))})")
+        params.extend(filters['payment_statuses'])
+    if filters.get('date_from'):
+        where.append("c.LastUpdated >= %s")
+        params.append(datetime.combine(filters['date_from'], datetime.min.time()))
+    if filters.get('date_to'):
+        where.append("c.LastUpdated < %s")
+        params.append(datetime.combine(filters['date_to'] + timedelta(days=1), datetime.min.time()))
+    if cursor:
+        where.append("(c.LastUpdated < %s OR (c.LastUpdated = %s AND c.CargoID < %s))")
+        params.extend([cursor[0], cursor[0], cursor[1]])
+
+    sql = f"SELECT {SHIPMENT_COLUMNS} FROM Cargos c"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY c.LastUpdated DESC, c.CargoID DESC LIMIT %s"
+    params.append(page_size + 1)
+
+    rows = run_query(sql, tuple(params))
+    return rows[:page_size], len(rows) > page_size
+
 def show_all_shipments():
     st.title("📋 All Active Shipments")
     try:
-        data = run_query("SELECT * FROM Cargos")
+        # Filtre seçenekleri (özet tablosu ve önbellekteki şube listesi, Cargos taranmaz)
+        status_res = run_query("SELECT DISTINCT CurrentStatus FROM BranchCargoSummary WHERE CargoCount > 0 ORDER BY CurrentStatus")
+        branch_res = run_query("SELECT BranchID, BranchName FROM CargoBranches ORDER BY BranchName")
+        branch_options = {b['BranchName']: b['BranchID'] for b in branch_res} if branch_res else {}
+
+        with st.expander("🔍 Filters", expanded=True):
+            f1, f2, f3 = st.columns(3)
+            with f1:
+                statuses = st.multiselect("Status", [r['CurrentStatus'] for r in status_res] if status_res else [])
+                payment_statuses = st.multiselect("Payment Status", PAYMENT_STATUSES)
+            with f2:
+                branch_name = st.selectbox("Origin Branch", ["All Branches"] + list(branch_options.keys()))
+                page_size = st.selectbox("Rows per Page", [25, 50, 100, 250], index=1)
+            with f3:
+                date_from = st.date_input("Updated From", value=None)
+                date_to = st.date_input("Updated To", value=None)
+
+        filters = {
+            'statuses': statuses,
+            'branch_id': branch_options.get(branch_name),
+            'payment_statuses': payment_statuses,
+            'date_from': date_from,
+            'date_to': date_to,
+        }
+
+        # Filtre değişince ilk sayfaya dön
+        filter_key = (tuple(statuses), filters['branch_id'], tuple(payment_statuses), date_from, date_to, page_size)
+        if st.session_state.get('shipments_filter_key') != filter_key:
+            st.session_state['shipments_filter_key'] = filter_key
+            st.session_state['shipments_cursors'] = [None]
+        cursors = st.session_state['shipments_cursors']
+
+        data, has_next = fetch_shipments_page(filters, cursors[-1], page_size)
         if data:
             df = pd.DataFrame(data)
             st.dataframe(
@@ -97,9 +285,53 @@ def show_all_shipments():
                 },
                 use_container_width=True
             )
+        else:
+            st.info("No shipments match the selected filters.")
+
+        n1, n2, n3 = st.columns([1, 2, 1])
+        with n1:
+            if st.button("⬅️ Previous", disabled=len(cursors) == 1, use_container_width=True):
+                cursors.pop()
+                st.rerun()
+        with n2:
+            st.caption(f"Page {len(cursors)}")
+        with n3:
+            if st.button("Next ➡️", disabled=not has_next, use_container_width=True):
+                last = data[-1]
+                cursors.append((last['LastUpdated'], last['CargoID']))
+                st.rerun()
     except Exception as e:
         st.error(f"Error: {e}")
 
+def show_bulk_import():
+    st.subheader("📤 Bulk Import")
+    st.write("Upload a CSV file. Rows are validated and inserted in batches; invalid rows are collected in a reject file.")
+    kind = st.radio("Import", ["customers", "cargos"], horizontal=True, format_func=str.title)
+    columns = CUSTOMER_COLUMNS if kind == "customers" else CARGO_COLUMNS
+    st.caption("Expected columns: " + ", ".join(f"`{c}`" for c in columns)
+               + ". Blank IDs are generated, a blank ShippingCost is quoted from the tariffs; "
+               + "blank CurrentStatus / LastUpdated default to 'Order Created' / now.")
+    uploaded = st.file_uploader("CSV File", type=["csv"], key=f"import_{kind}")
+
+    if st.button("Start Import", type="primary", disabled=uploaded is None):
+        try:
+            with st.spinner("Importing..."):
+                report = import_csv(kind, uploaded)
+            st.session_state['import_report'] = report
+        except Exception as e:
+            st.error(f"Import failed: {e}")
+
+    report = st.session_state.get('import_report')
+    if report:
+        r1, r2, r3, r4 = st.columns(4)
+        r1.metric("Rows Read", f"{report['rows']:,}")
+        r2.metric("Inserted", f"{report['inserted']:,}")
+        r3.metric("Rejected", f"{report['rejected']:,}")
+        r4.metric("Throughput", f"{report['rows_per_second']:,.0f} rows/s")
+        if report['rejected'] and os.path.exists(report['reject_path']):
+            with open(report['reject_path'], "rb") as f:
+                st.download_button("⬇️ Download Reject File", f, file_name=os.path.basename(report['reject_path']))
+
 def show_new_registration():
     st.title("➕ New Customer Registration (Demo)")
     with st.form("customer_form"):
@@ -123,125 +355,376 @@ def show_new_registration():
         if submitted:
             st.success(f"{name} {surname} added successfully! (Simulation)")
 
+    st.divider()
+    show_bulk_import()
+
+
+EMPLOYEE_SECTIONS = ["📋 Employee List", "➕ Add New Employee", "✏️ Update / Delete"]
 
 def show_employee_management():
     st.title("👥 Employee Management")
-    
-    # Sayfa içi sekmeler oluşturuyoruz
-    tab1, tab2, tab3 = st.tabs(["📋 Employee List", "➕ Add New Employee", "✏️ Update / Delete"])
-
-    # --- TAB 1: LİSTELEME ---
-    with tab1:
-        st.subheader("All Employees")
-        # Şubeleriyle beraber çalışanları çeken sorgu
-        sql = """
-        SELECT e.EmployeeID, e.FirstName, e.LastName, e.Position, 
-               e.Salary, e.Phone, b.BranchName, e.HireDate
-        FROM Employees e
-        LEFT JOIN CargoBranches b ON e.BranchID = b.BranchID
-        ORDER BY e.EmployeeID DESC
-        """
-        df = pd.DataFrame(run_query(sql))
-        
-        if not df.empty:
-            st.dataframe(
-                df,
-                column_config={
-                    "Salary": st.column_config.NumberColumn("Salary", format="₺%.2f"),
-                    "HireDate": st.column_config.DateColumn("Getting Started", format="DD.MM.YYYY"),
-                    "Phone": st.column_config.TextColumn("Phone Number")
-                },
-                use_container_width=True,
-                hide_index=True
-            )
-        else:
-            st.info("There are no registered personnel yet.")
 
-    # Şube listesini veritabanından çekelim (Selectbox için lazım olacak)
-    branches = run_query("SELECT BranchID, BranchName FROM CargoBranches")
-    branch_options = {b['BranchName']: b['BranchID'] for b in branches} if branches else {}
+    # Sekmeler yerine seçici: yalnızca açık bölümün sorguları çalışır
+    section = st.radio("Section", EMPLOYEE_SECTIONS, horizontal=True, label_visibility="collapsed")
 
-    # --- TAB 2: EKLEME ---
-    with tab2:
-        st.subheader("New Employee Registration")
-        with st.form("add_employee_form"):
-            col1, col2 = st.columns(2)
-            with col1:
-                name = st.text_input("Name")
-                surname = st.text_input("Surname")
-                phone = st.text_input("Phone Number", max_chars=10, placeholder="5xxxxxxxxx")
-            with col2:
-                position = st.selectbox("Position", ["Intern", "Janitor", "Courier", "Branch Manager", "Driver","Regional Manager","Human Resources","Desk Officer"])
-                salary = st.number_input("Salary (TL)", min_value=17002.0, step=500.0)
-                branch_name = st.selectbox("Branch", list(branch_options.keys()) if branch_options else ["Centre"])
-            
+    # Şube ve rol listeleri (önbellekten) bütün bölümlerde lazım
+    res = run_queries({
+        "branches": ("SELECT BranchID, BranchName FROM CargoBranches ORDER BY BranchName", None),
+        "roles": ("SELECT RoleID, RoleName FROM EmployeeRoles ORDER BY RoleName", None),
+    }, default=[])
+    for name, error in res.errors.items():
+        st.error(f"Could not load {name}: {error}")
+    branch_options = {b['BranchName']: b['BranchID'] for b in res["branches"]}
+    role_options = {r['RoleName']: r['RoleID'] for r in res["roles"]}
+
+    if section == EMPLOYEE_SECTIONS[0]:
+        show_employee_list(branch_options, role_options)
+    elif section == EMPLOYEE_SECTIONS[1]:
+        show_add_employee(branch_options, role_options)
+    else:
+        show_edit_employee(branch_options, role_options)
+
+def show_employee_list(branch_options, role_options):
+    directory = get_directory()
+    f1, f2, f3 = st.columns(3)
+    with f1:
+        search = st.text_input("Search", placeholder="Name, employee ID, number or username")
+        active_only = st.checkbox("Active only")
+    with f2:
+        branch_name = st.selectbox("Branch", ["All Branches"] + list(branch_options.keys()))
+        role_name = st.selectbox("Role", ["All Roles"] + list(role_options.keys()))
+    with f3:
+        page_size = st.selectbox("Rows per Page", [25, 50, 100], index=1)
+
+    filters = {'branch_id': branch_options.get(branch_name), 'role_id': role_options.get(role_name),
+               'active_only': active_only}
+    if search.strip():
+        # Arama bellekteki indeksten; veritabanına yalnızca sayfadaki ID'ler gider
+        filters = {'ids': directory.ids(search, **filters)}
+        total = len(filters['ids'])
+    else:
+        total = directory.count(**filters)
+
+    # Filtre değişince ilk sayfaya dön
+    filter_key = (search.strip().casefold(), branch_name, role_name, active_only, page_size)
+    if st.session_state.get('employees_filter_key') != filter_key:
+        st.session_state['employees_filter_key'] = filter_key
+        st.session_state['employees_cursors'] = [None]
+    cursors = st.session_state['employees_cursors']
+
+    data, has_next = fetch_employee_page(filters, cursors[-1], page_size)
+    st.caption(f"{total:,} employee(s)")
+    if data:
+        df = pd.DataFrame(data)
+        df['Salary'] = pd.to_numeric(df['Salary'], errors='coerce')
+        df['IsActive'] = df['IsActive'].astype(bool)
+        st.dataframe(
+            df,
+            column_config={
+                "Salary": st.column_config.NumberColumn("Salary", format="₺%.2f"),
+                "HireDate": st.column_config.DateColumn("Getting Started", format="DD.MM.YYYY"),
+                "EmployeeNumber": st.column_config.TextColumn("Employee Number"),
+                "IsActive": st.column_config.CheckboxColumn("Active"),
+            },
+            use_container_width=True,
+            hide_index=True
+        )
+    else:
+        st.info("No employees match the selected filters.")
+
+    n1, n2, n3 = st.columns([1, 2, 1])
+    with n1:
+        if st.button("⬅️ Previous", key="employees_prev", disabled=len(cursors) == 1, use_container_width=True):
+            cursors.pop()
+            st.rerun()
+    with n2:
+        st.caption(f"Page {len(cursors)}")
+    with n3:
+        if st.button("Next ➡️", key="employees_next", disabled=not has_next, use_container_width=True):
+            cursors.append(data[-1]['EmployeeID'])
+            st.rerun()
+
+def show_add_employee(branch_options, role_options):
+    st.subheader("New Employee Registration")
+    with st.form("add_employee_form"):
+        col1, col2 = st.columns(2)
+        with col1:
+            name = st.text_input("Name")
+            surname = st.text_input("Surname")
+            number = st.text_input("Employee Number")
             hire_date = st.date_input("Job Start Date")
-            
-            submitted = st.form_submit_button("Submit", type="primary")
-            
-            if submitted:
-                branch_id = branch_options.get(branch_name)
-                insert_sql = """
-                INSERT INTO Employees (FirstName, LastName, Phone, Position, Salary, BranchID, HireDate)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                """
-                run_query(insert_sql, (name, surname, phone, position, salary, branch_id, hire_date))
-                st.success(f"✅ {name} {surname} Submitted.")
-                st.rerun() # Listeyi yenilemek için
-
-    # --- TAB 3: GÜNCELLEME & SİLME ---
-    with tab3:
-        st.subheader("Update Personnel Information")
-        
-        # Önce kimi güncelleyeceğimizi seçelim
-        employees = run_query("SELECT EmployeeID, FirstName, LastName FROM Employees")
-        if employees:
-            emp_options = {f"{e['EmployeeID']} - {e['FirstName']} {e['LastName']}": e['EmployeeID'] for e in employees}
-            selected_emp_str = st.selectbox("Select the Personnel to Edit", list(emp_options.keys()))
-            selected_emp_id = emp_options[selected_emp_str]
+        with col2:
+            role_name = st.selectbox("Role", list(role_options.keys()))
+            salary = st.number_input("Salary (TL)", min_value=17002.0, step=500.0)
+            branch_name = st.selectbox("Branch", list(branch_options.keys()))
+            username = st.text_input("Username")
+            password = st.text_input("Initial Password", type="password")
 
-            # Seçilen personelin mevcut bilgilerini çek
-            current_data = run_query("SELECT * FROM Employees WHERE EmployeeID = %s", (selected_emp_id,))[0]
+        submitted = st.form_submit_button("Submit", type="primary")
 
-            with st.form("update_employee_form"):
-                col1, col2 = st.columns(2)
-                with col1:
-                    new_pos = st.selectbox("Position", ["Intern", "Janitor", "Courier", "Branch Manager", "Driver","Regional Manager","Human Resources","Desk Officer"],
-                                            index=["Intern", "Janitor", "Courier", "Branch Manager", "Driver","Regional Manager","Human Resources","Desk Officer"].index(current_data['Position'])
-                                              if current_data['Position'] in ["Intern", "Janitor", "Courier", "Branch Manager", "Driver","Regional Manager","Human Resources","Desk Officer"] else 0)
-                    
-                    new_phone = st.text_input("Phone Number", value=current_data['Phone'])
-                with col2:
-                    new_salary = st.number_input("Salary", value=float(current_data['Salary']))
-                    # Şube ID'sinden Şube Adını bulup varsayılan yapma kısmı biraz kompleks olabilir, basit tutuyoruz:
-                    new_branch = st.selectbox("Branch", list(branch_options.keys()))
-
-                c1, c2 = st.columns([1,1])
-                with c1:
-                    update_btn = st.form_submit_button("Update Information", type="primary", use_container_width=True)
-                with c2:
-                    delete_btn = st.form_submit_button("Delete Employee 🗑️", type="secondary", use_container_width=True)
-
-                if update_btn:
-                    new_branch_id = branch_options.get(new_branch)
-                    upd_sql = "UPDATE Employees SET Position=%s, Salary=%s, Phone=%s, BranchID=%s WHERE EmployeeID=%s"
-                    run_query(upd_sql, (new_pos, new_salary, new_phone, new_branch_id, selected_emp_id))
-                    st.success("Informations Updated.")
-                    st.rerun()
-                
-                if delete_btn:
-                    run_query("DELETE FROM Employees WHERE EmployeeID = %s", (selected_emp_id,))
-                    st.error("Employee record deleted")
-                    st.rerun()
+        if submitted:
+            if not all([name.strip(), surname.strip(), number.strip(), username.strip(), password, role_name, branch_name]):
+                st.warning("⚠️ Please fill in every field.")
+                return
+            try:
+                employee_id = add_employee(name.strip(), surname.strip(), number.strip(), branch_options[branch_name],
+                                           role_options[role_name], username.strip(), password, salary, hire_date)
+                st.success(f"✅ {name} {surname} registered as {employee_id}.")
+            except Exception as e:
+                st.error(f"Could not register the employee: {e}")
+
+def show_edit_employee(branch_options, role_options):
+    st.subheader("Update Personnel Information")
+
+    # Önce kimi güncelleyeceğimizi seçelim (bellekteki önek indeksinden, en fazla 20 sonuç)
+    query = st.text_input("Find Employee", placeholder="Type a name, employee ID or username")
+    if not query.strip():
+        st.info("Start typing to find an employee.")
+        return
+    matches = get_directory().search(query)
+    if not matches:
+        st.warning("No employee found to arrange.")
+        return
+    emp_options = {f"{e['EmployeeID']} - {e['EmployeeName']} {e['EmployeeLastName']}": e['EmployeeID'] for e in matches}
+    selected_emp_id = emp_options[st.selectbox("Select the Personnel to Edit", list(emp_options.keys()))]
+
+    current_data = get_employee(selected_emp_id)
+    if current_data is None:
+        st.warning("This employee no longer exists.")
+        return
+    role_names = list(role_options.keys())
+    branch_names = list(branch_options.keys())
+    role_ids = list(role_options.values())
+    branch_ids = list(branch_options.values())
+    current_salary = pd.to_numeric(current_data['Salary'], errors='coerce')
+
+    with st.form("update_employee_form"):
+        col1, col2 = st.columns(2)
+        with col1:
+            new_role = st.selectbox("Role", role_names,
+                                    index=role_ids.index(current_data['RoleID']) if current_data['RoleID'] in role_ids else 0)
+            new_number = st.text_input("Employee Number", value=current_data['EmployeeNumber'])
+            is_active = st.checkbox("Active", value=bool(current_data['IsActive']))
+        with col2:
+            new_salary = st.number_input("Salary", value=0.0 if pd.isna(current_salary) else float(current_salary))
+            new_branch = st.selectbox("Branch", branch_names,
+                                      index=branch_ids.index(current_data['BranchID']) if current_data['BranchID'] in branch_ids else 0)
+
+        c1, c2 = st.columns([1,1])
+        with c1:
+            update_btn = st.form_submit_button("Update Information", type="primary", use_container_width=True)
+        with c2:
+            delete_btn = st.form_submit_button("Delete Employee 🗑️", type="secondary", use_container_width=True)
+
+        if update_btn:
+            try:
+                update_employee(selected_emp_id, new_number.strip(), branch_options[new_branch],
+                                role_options[new_role], new_salary, is_active)
+            except Exception as e:
+                st.error(f"Could not update the employee: {e}")
+            else:
+                # Toast rerun sonrası da görünür; seçici ve form güncel veriyle yeniden çizilir
+                st.toast("Informations Updated.", icon="✅")
+                st.rerun()
+
+        if delete_btn:
+            try:
+                delete_employee(selected_emp_id)
+            except Exception as e:
+                st.error(f"Could not delete the employee (deactivate instead): {e}")
+            else:
+                st.toast("Employee record deleted", icon="🗑️")
+                st.rerun()
+
+
+def show_manifests():
+    st.title("🚚 Manifest Operations")
+    st.write("Load cargo onto a vehicle, then depart and arrive the whole manifest in one step.")
+
+    manifests = run_query("""
+        SELECT m.ManifestID, m.VehicleID, v.LicensePlate, m.OriginBranchID, m.DestBranchID,
+               m.DepartureTime, m.ArrivalTime
+        FROM Manifests m
+        JOIN Vehicles v ON v.VehicleID = m.VehicleID
+        ORDER BY m.ManifestID DESC
+    """)
+    if not manifests:
+        st.info("There are no manifests yet.")
+        return
+    manifest_by_label = {f"{m['ManifestID']} - {m['LicensePlate']} ({m['OriginBranchID']} → {m['DestBranchID']})": m for m in manifests}
+    manifest = manifest_by_label[st.selectbox("Manifest", list(manifest_by_label.keys()))]
+    manifest_id = manifest['ManifestID']
+
+    m1, m2 = st.columns(2)
+    m1.metric("Departure", str(manifest['DepartureTime'] or "-"))
+    m2.metric("Arrival", str(manifest['ArrivalTime'] or "-"))
+
+    _, op_employee_id = select_operator("manifest")
+
+    with st.container(border=True):
+        st.subheader("📥 Load Cargo")
+        load_ids = parse_cargo_ids(st.text_area("Cargo IDs to load", placeholder="CG001, CG002\nCG003"))
+        if st.button("Load onto Vehicle", disabled=not load_ids or not op_employee_id):
+            try:
+                report = load_cargo(manifest_id, load_ids, op_employee_id)
+                st.success(f"✅ {report['cargos']} cargo(s) loaded in {report['seconds']:.2f} s")
+            except Exception as e:
+                st.error(f"Load failed, nothing was changed: {e}")
+
+    a1, a2 = st.columns(2)
+    with a1:
+        if st.button("🛫 Depart", type="primary", use_container_width=True, disabled=not op_employee_id):
+            try:
+                report = depart(manifest_id, op_employee_id)
+                st.success(f"✅ {report['cargos']} cargo(s) in transit ({report['seconds']:.2f} s)")
+            except Exception as e:
+                st.error(f"Departure failed, nothing was changed: {e}")
+    with a2:
+        if st.button("🛬 Arrive", type="primary", use_container_width=True, disabled=not op_employee_id):
+            try:
+                report = arrive(manifest_id, op_employee_id)
+                st.success(f"✅ {report['cargos']} cargo(s) unloaded at {manifest['DestBranchID']} ({report['seconds']:.2f} s)")
+            except Exception as e:
+                st.error(f"Arrival failed, nothing was changed: {e}")
+
+    st.subheader("📦 Cargo on this Manifest")
+    contents = get_manifest_cargo(manifest_id)
+    if contents:
+        st.dataframe(pd.DataFrame(contents), use_container_width=True, hide_index=True)
+    else:
+        st.info("No cargo on this manifest.")
+
+def show_export():
+    st.title("📤 Data Export")
+    st.write("Full extracts of shipments, invoices and tracking logs.")
+    st.caption("Rows are streamed from the database in chunks into a temporary file, so memory use stays flat. "
+               "For very large extracts use the CLI: `python -m services.export shipments --format parquet --out shipments.parquet`")
+
+    e1, e2 = st.columns(2)
+    with e1:
+        dataset = st.selectbox("Dataset", list(DATASETS.keys()), format_func=str.title)
+        fmt = st.radio("Format", ["csv", "parquet"], horizontal=True, format_func=str.upper)
+        include_archived = st.checkbox("Include archived rows", value=True,
+                                       help="Finished cargos moved to the archive tables by services.archive")
+    with e2:
+        date_from = st.date_input("From", value=None, key="export_from")
+        date_to = st.date_input("To", value=None, key="export_to")
+
+    if st.button("Prepare Export", type="primary"):
+        # Önceki geçici dosyayı temizle
+        old_path = st.session_state.pop('export_path', None)
+        if old_path and os.path.exists(old_path):
+            os.remove(old_path)
+        tmp = tempfile.NamedTemporaryFile(suffix=f".{fmt}", delete=False)
+        tmp.close()
+        try:
+            with st.spinner("Exporting..."):
+                if fmt == "csv":
+                    with open(tmp.name, "w", newline="", encoding="utf-8") as f:
+                        total = export(dataset, fmt, f, date_from, date_to, include_archived=include_archived)
+                else:
+                    total = export(dataset, fmt, tmp.name, date_from, date_to, include_archived=include_archived)
+            st.session_state['export_path'] = tmp.name
+            st.session_state['export_name'] = f"{dataset}.{fmt}"
+            st.success(f"✅ {total:,} rows exported.")
+        except ImportError:
+            os.remove(tmp.name)
+            st.error("Parquet export needs the 'pyarrow' package.")
+        except Exception as e:
+            os.remove(tmp.name)
+            st.error(f"Export failed: {e}")
+
+    path = st.session_state.get('export_path')
+    if path and os.path.exists(path):
+        with open(path, "rb") as f:
+            st.download_button(f"⬇️ Download {st.session_state['export_name']}", f,
+                               file_name=st.session_state['export_name'], use_container_width=True)
+
+def show_query_stats():
+    st.title("📈 Query Stats")
+    stats = get_query_stats()
+    st.caption(f"Since app start (or last reset), this process only. Slow query threshold: {stats.slow_ms:.0f} ms, "
+               f"N+1 warning at {stats.n_plus_one} identical statements per rerun "
+               "(`slow_query_ms` / `n_plus_one` in secrets.toml).")
+
+    st.subheader("Pages")
+    pages = pd.DataFrame(stats.pages())
+    if pages.empty:
+        st.info("No page has run a query yet.")
+    else:
+        st.dataframe(pages, use_container_width=True, hide_index=True)
+
+    st.subheader("Statements")
+    summary = pd.DataFrame(stats.summary())
+    if not summary.empty:
+        summary['pages'] = summary['pages'].map(lambda p: ", ".join(f"{k} ({v})" for k, v in p.items()))
+        cols = ['count', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'total_ms', 'rows_avg', 'acquire_avg_ms',
+                'cache_hits', 'errors', 'pages', 'statement']
+        st.dataframe(summary[cols], use_container_width=True, hide_index=True)
+
+    findings = stats.n_plus_one_findings()
+    if findings:
+        st.subheader("⚠️ Possible N+1 Patterns")
+        st.dataframe(pd.DataFrame(findings), use_container_width=True, hide_index=True)
+
+    with st.expander(f"🐢 Slow Queries ({len(stats.slow)})"):
+        if stats.slow:
+            st.dataframe(pd.DataFrame(list(stats.slow))[::-1], use_container_width=True, hide_index=True)
         else:
-            st.warning("No employee found to arrange.")
+            st.write("None so far.")
+
+    c1, c2 = st.columns(2)
+    buffer = io.StringIO()
+    stats.write_jsonl(buffer)
+    c1.download_button("⬇️ Download summary (JSON lines)", buffer.getvalue(), file_name="query_stats.jsonl",
+                       mime="application/x-ndjson", use_container_width=True)
+    if c2.button("Reset counters", use_container_width=True):
+        stats.reset()
+        st.rerun()
+
+def show_bulk_report(report):
+    r1, r2, r3 = st.columns(3)
+    r1.metric("Updated", f"{report['updated']} / {report['requested']}")
+    r2.metric("Duration", f"{report['seconds']:.2f} s")
+    r3.metric("Throughput", f"{report['rows_per_second']:,.0f} rows/s")
+    if report['missing']:
+        st.warning(f"⚠️ {len(report['missing'])} Cargo ID(s) not found: {', '.join(report['missing'][:20])}"
+                   + (" ..." if len(report['missing']) > 20 else ""))
+    if report['skipped']:
+        skipped = list(report['skipped'].items())
+        st.info(f"ℹ️ {len(skipped)} Cargo ID(s) skipped: " + ", ".join(f"{c} ({why})" for c, why in skipped[:20])
+                + (" ..." if len(skipped) > 20 else ""))
+
+def select_operator(key):
+    """İşlemi yapan şube + personel seçimi (TrackingLog satırları için). Returns (branch_id, employee_id)."""
+    branches = run_query("SELECT BranchID, BranchName FROM CargoBranches ORDER BY BranchName")
+    branch_options = {b['BranchName']: b['BranchID'] for b in branches} if branches else {}
 
+    with st.container(border=True):
+        st.subheader("Operator")
+        o1, o2 = st.columns(2)
+        with o1:
+            op_branch = st.selectbox("Branch", list(branch_options.keys()), key=f"{key}_op_branch")
+        op_branch_id = branch_options.get(op_branch)
+        employees = run_query(
+            "SELECT EmployeeID, EmployeeName, EmployeeLastName FROM Employees WHERE BranchID = %s AND IsActive = 1",
+            (op_branch_id,)
+        ) if op_branch_id else []
+        employee_options = {f"{e['EmployeeID']} - {e['EmployeeName']} {e['EmployeeLastName']}": e['EmployeeID'] for e in employees}
+        with o2:
+            op_employee = st.selectbox("Employee", list(employee_options.keys()), key=f"{key}_op_employee")
+    return op_branch_id, employee_options.get(op_employee)
 
 def show_admin_tools():
     st.title("🔧 Admin Operations Panel")
     st.write("Update cargo status instantly across the system.")
     st.divider()
-    
+
+    # Ortak seçimler: durum listesi, işlemi yapan şube ve personel (TrackingLog için gerekli)
+    statuses = run_query("SELECT StatusID, StatusDescription FROM CargoStatusType ORDER BY StatusID")
+    status_options = {s['StatusDescription']: s['StatusID'] for s in statuses} if statuses else {}
+    op_branch_id, op_employee_id = select_operator("tools")
+
     with st.container(border=True):
         st.subheader("Update Status")
         col1, col2 = st.columns(2)
@@ -249,14 +732,78 @@ def show_admin_tools():
         with col1:
             update_cargo_id = st.text_input("Cargo ID to Update (Ex: CG001)")
         with col2:
-            new_status = st.selectbox("New Status", 
-                ["Preparing", "In Delivery for Cargo Branch", "Out for Delivery", "Delivered"])
+            new_status = st.selectbox("New Status", list(status_options.keys()))
         
         if st.button("Update Status", type="primary"):
-            if update_cargo_id:
-                update_query = "UPDATE Cargos SET CurrentStatus = %s WHERE CargoID = %s"
-                res = run_query(update_query, (new_status, update_cargo_id))
-                if res is not None:
-                    st.success(f"✅ Cargo **{update_cargo_id}** status updated to **'{new_status}'**")
+            if not update_cargo_id:
+                st.warning("⚠️ Please enter a Cargo ID.")
+            elif not op_employee_id:
+                st.warning("⚠️ Please select the operating branch and employee.")
             else:
-                st.warning("⚠️ Please enter a Cargo ID.")
\ No newline at end of file
+                cargo_id = update_cargo_id.strip().upper()
+                try:
+                    report = bulk_update_status([cargo_id], status_options[new_status], op_branch_id, op_employee_id)
+                except Exception as e:
+                    st.error(f"Status update failed, nothing was changed: {e}")
+                else:
+                    if report['updated']:
+                        st.success(f"✅ Cargo **{cargo_id}** status updated to **'{new_status}'**")
+                    elif cargo_id in report['skipped']:
+                        st.info(f"Cargo **{cargo_id}** not updated: {report['skipped'][cargo_id]}.")
+                    else:
+                        st.error(f"Cargo **{cargo_id}** not found.")
+
+    with st.container(border=True):
+        st.subheader("📦 Bulk Status Update")
+        source = st.radio("Cargo Source", ["Paste IDs", "Upload CSV", "Manifest"], horizontal=True)
+
+        cargo_ids = []
+        if source == "Paste IDs":
+            cargo_ids = parse_cargo_ids(st.text_area("Cargo IDs", placeholder="CG001, CG002\nCG003"))
+        elif source == "Upload CSV":
+            uploaded = st.file_uploader("CSV with a CargoID column (or IDs in the first column)", type=["csv", "txt"])
+            if uploaded is not None:
+                ids_df = pd.read_csv(uploaded, dtype=str)
+                column = 'CargoID' if 'CargoID' in ids_df.columns else ids_df.columns[0]
+                cargo_ids = parse_cargo_ids(" ".join(ids_df[column].dropna()))
+        else:
+            manifests = run_query("SELECT ManifestID, VehicleID, OriginBranchID, DestBranchID FROM Manifests ORDER BY ManifestID DESC")
+            manifest_options = {f"{m['ManifestID']} ({m['VehicleID']}: {m['OriginBranchID']} → {m['DestBranchID']})": m['ManifestID'] for m in manifests} if manifests else {}
+            selected_manifest = st.selectbox("Manifest", list(manifest_options.keys()))
+            if selected_manifest:
+                cargo_ids = cargo_ids_from_manifest(manifest_options[selected_manifest])
+
+        b1, b2 = st.columns([3, 1])
+        with b1:
+            bulk_status = st.selectbox("New Status for All", list(status_options.keys()), key="bulk_status")
+        with b2:
+            st.metric("Selected", len(cargo_ids))
+
+        if st.button("Apply to All", type="primary", disabled=not cargo_ids):
+            if not op_employee_id:
+                st.warning("⚠️ Please select the operating branch and employee.")
+            else:
+                try:
+                    with st.spinner("Updating..."):
+                        report = bulk_update_status(cargo_ids, status_options[bulk_status], op_branch_id, op_employee_id)
+                    st.success(f"✅ {report['updated']} cargo(s) set to **'{bulk_status}'**")
+                    show_bulk_report(report)
+                except Exception as e:
+                    st.error(f"Bulk update failed, nothing was changed: {e}")
+
+    with st.expander("🔌 Database Connection Pool"):
+        pool = get_pool_stats()
+        p1, p2, p3, p4 = st.columns(4)
+        p1.metric("Checked Out", f"{pool['checked_out']} / {pool['size']}")
+        p2.metric("Idle", pool['idle'])
+        p3.metric("Waits", pool['waits'])
+        p4.metric("Total Wait", f"{pool['wait_time']:.2f} s")
+        st.json(pool)
+        st.caption("Endpoints (primary / read replicas): latency, health, failovers")
+        st.dataframe(pd.DataFrame(get_router().stats()), use_container_width=True, hide_index=True)
+        st.caption("Query cache")
+        st.json(get_query_cache().stats())
+        st.caption("Public tracking (allowed / throttled / negative-cache hits)")
+        st.json(get_tracking_guard().stats())
+        st.caption("Live tracking change feed")
+        st.json(get_change_feed().stats(), expanded=False)
@@ -1,8 +1,9 @@
 import streamlit as st
 import pandas as pd
-from database import run_query, generate_id
+from database import run_query, run_queries
+from utils import get_status_registry
+from services.change_feed import session_subscription, LIVE_REFRESH
 from datetime import datetime
-import time
 
 
 
@@ -18,12 +19,36 @@ def get_current_cust_id():
 
 # --- SAYFA FONKSİYONLARI ---
 
+PROFILE_SQL = """
+SELECT cu.FirstName, cu.LastName,
+       COALESCE(s.OutgoingCount, 0) as OutgoingCount, COALESCE(s.IncomingCount, 0) as IncomingCount,
+       COALESCE(s.ActiveIncoming, 0) as ActiveIncoming, COALESCE(s.TotalSpend, 0) as TotalSpend
+FROM Customers cu
+LEFT JOIN CustomerStats s ON s.CustID = cu.CustID
+WHERE cu.CustID = %s
+"""
+
+RECENT_SQL = """
+SELECT u.CargoID, u.CurrentStatus, u.LastUpdated, u.Type FROM (
+    (SELECT c.CargoID, c.CurrentStatus, c.LastUpdated, 'Outgoing' as Type
+     FROM Cargos c WHERE c.SenderCustID = %s ORDER BY c.LastUpdated DESC LIMIT 5)
+    UNION ALL
+    (SELECT c.CargoID, c.CurrentStatus, c.LastUpdated, 'Incoming' as Type
+     FROM Cargos c WHERE c.ReceiverCustID = %s ORDER BY c.LastUpdated DESC LIMIT 5)
+) u
+ORDER BY u.LastUpdated DESC LIMIT 5
+"""
+
 def show_dashboard():
     cust_id = get_current_cust_id()
     
-    # Müşteri Adını Çek
-    user_res = run_query("SELECT FirstName, LastName FROM Customers WHERE CustID = %s", (cust_id,))
-    full_name = f"{user_res[0]['FirstName']} {user_res[0]['LastName']}" if user_res else "Customer"
+    # Müşteri adı + sayaç satırı (CustomerStats) ve son 5 hareket aynı anda okunur
+    res = run_queries({
+        "profile": (PROFILE_SQL, (cust_id,)),
+        "recent": (RECENT_SQL, (cust_id, cust_id)),
+    }, default=[])
+    head = res["profile"][0] if res["profile"] else {}
+    full_name = f"{head['FirstName']} {head['LastName']}" if head else "Customer"
     
     st.title(f"👋 Welcome, {full_name}")
     st.markdown("Here is the summary of your logistics operations.")
@@ -32,33 +57,23 @@ def show_dashboard():
     col1, col2, col3 = st.columns(3)
     
     # 1. Gönderdiklerim (Outgoing)
-    out_count = run_query("SELECT COUNT(*) as cnt FROM Cargos WHERE SenderCustID = %s", (cust_id,))[0]['cnt']
-    col1.metric("📦 Outgoing Shipments", out_count, delta_color="normal")
+    col1.metric("📦 Outgoing Shipments", head.get('OutgoingCount', 0), delta_color="normal")
     
     # 2. Bana Gelenler (Incoming)
-    in_count = run_query("SELECT COUNT(*) as cnt FROM Cargos WHERE ReceiverCustID = %s", (cust_id,))[0]['cnt']
-    col2.metric("📥 Incoming Deliveries", in_count, delta="Active")
+    col2.metric("📥 Incoming Deliveries", head.get('IncomingCount', 0), delta=f"{head.get('ActiveIncoming', 0)} Active")
     
     # 3. Toplam Harcama
-    inv_sum = run_query("SELECT SUM(TotalAmount) as total FROM Invoice WHERE CustID = %s", (cust_id,))[0]['total']
-    total_spent = float(inv_sum) if inv_sum else 0.0
+    total_spent = float(head.get('TotalSpend') or 0.0)
     col3.metric("💰 Total Spend", f"₺{total_spent:,.2f}")
 
     st.divider()
     
     # Son Hareketler Tablosu
     st.subheader("🕒 Recent Activity")
-    sql = """
-    SELECT c.CargoID, c.CurrentStatus, c.LastUpdated, 'Outgoing' as Type
-    FROM Cargos c WHERE c.SenderCustID = %s
-    UNION
-    SELECT c.CargoID, c.CurrentStatus, c.LastUpdated, 'Incoming' as Type
-    FROM Cargos c WHERE c.ReceiverCustID = %s
-    ORDER BY LastUpdated DESC LIMIT 5
-    """
-    recent_activity = run_query(sql, (cust_id, cust_id))
-    if recent_activity:
-        st.dataframe(pd.DataFrame(recent_activity), use_container_width=True, hide_index=True)
+    if "recent" in res.errors:
+        st.error("Recent activity could not be loaded.")
+    elif res["recent"]:
+        st.dataframe(pd.DataFrame(res["recent"]), use_container_width=True, hide_index=True)
     else:
         st.info("No recent activity found.")
 
@@ -84,12 +99,14 @@ def show_my_shipments():
         status_filter = st.multiselect("Filter by Status", df['CurrentStatus'].unique())
         if status_filter:
             df = df[df['CurrentStatus'].isin(status_filter)]
+        df = df.assign(Progress=get_status_registry().progress_series(df['CurrentStatus']))
             
         st.dataframe(
             df, 
             column_config={
                 "ShippingCost": st.column_config.NumberColumn("Cost", format="₺%.2f"),
                 "LastUpdated": st.column_config.DatetimeColumn("Last Update", format="DD.MM.YYYY HH:mm"),
+                "Progress": st.column_config.ProgressColumn("Progress", min_value=0, max_value=100, format="%d%%"),
             },
             use_container_width=True, hide_index=True
         )
@@ -115,33 +132,50 @@ def show_incoming():
     FROM Cargos c
     JOIN Customers s ON c.SenderCustID = s.CustID
     JOIN ServiceTypes st ON c.ServiceTypeID = st.ServiceTypeID
-    WHERE c.ReceiverCustID = %s AND c.CurrentStatus NOT IN ('Delivered', 'Returned')
+    WHERE c.ReceiverCustID = %s AND c.StatusID IN ({})
     """
-    incoming_data = run_query(sql, (cust_id,))
+    # Bitmemiş durumlar kayıttan gelir; (ReceiverCustID, StatusID) indeksinde eşitlik araması.
+    # StatusID hiç NULL değil (migration 013); aktif durum yoksa "IN ()" yerine sorgu hiç çalışmaz.
+    active_ids = get_status_registry().active_ids
+    incoming_data = run_query(sql.format(', '.join(['%s'] * len(active_ids))), (cust_id, *active_ids)) if active_ids else []
     
     if incoming_data:
-        for cargo in incoming_data:
-            with st.container(border=True):
-                c1, c2, c3 = st.columns([2,2,1])
-                c1.markdown(f"### 📦 {cargo['CargoID']}")
-                c1.caption(f"From: {cargo['SenderName']} ({cargo['Origin']})")
-                
-                c2.markdown(f"**Status:** {cargo['CurrentStatus']}")
-                c2.markdown(f"**Type:** {cargo['ServiceType']}")
-                
-                # Aksiyon Butonları
-                c3.write("Actions:")
-                if c3.button("🏠 I'm Not Home", key=f"home_{cargo['CargoID']}"):
-                    # Veritabanına 'Müşteri Talebi' olarak log düşebiliriz
-                    # Şimdilik simülasyon:
-                    st.toast(f"Driver notified for {cargo['CargoID']}: 'Leave at neighbor/branch'")
-                    
-                if c3.button("📍 Track Live", key=f"track_{cargo['CargoID']}"):
-                    st.session_state['tracking_search'] = cargo['CargoID']
-                    st.info("Go to 'Guest > Track Cargo' to see details.")
+        # Tam yeniden çalıştırmada durumlar veritabanından gelir; sonrası canlı akıştan
+        st.session_state['incoming_live'] = {}
+        show_incoming_cards(incoming_data)
     else:
         st.success("No active incoming deliveries. You are all caught up!")
 
+@st.fragment(run_every=LIVE_REFRESH)
+def show_incoming_cards(incoming_data):
+    """Yeni TrackingLog / Cargos olayları sorgu atmadan, sadece bu parçayı yeniden çizer."""
+    live = st.session_state.setdefault('incoming_live', {})
+    for event in session_subscription('incoming', [c['CargoID'] for c in incoming_data]).drain():
+        if event['cargo_id'] not in live or live[event['cargo_id']]['status'] != event['status']:
+            st.toast(f"📦 {event['cargo_id']}: {event['status']}")
+        live[event['cargo_id']] = event
+    
+    for cargo in incoming_data:
+        with st.container(border=True):
+            c1, c2, c3 = st.columns([2,2,1])
+            c1.markdown(f"### 📦 {cargo['CargoID']}")
+            c1.caption(f"From: {cargo['SenderName']} ({cargo['Origin']})")
+            
+            status = live.get(cargo['CargoID'], {}).get('status', cargo['CurrentStatus'])
+            c2.markdown(f"**Status:** {status}")
+            c2.markdown(f"**Type:** {cargo['ServiceType']}")
+            
+            # Aksiyon Butonları
+            c3.write("Actions:")
+            if c3.button("🏠 I'm Not Home", key=f"home_{cargo['CargoID']}"):
+                # Veritabanına 'Müşteri Talebi' olarak log düşebiliriz
+                # Şimdilik simülasyon:
+                st.toast(f"Driver notified for {cargo['CargoID']}: 'Leave at neighbor/branch'")
+                
+            if c3.button("📍 Track Live", key=f"track_{cargo['CargoID']}"):
+                st.session_state['tracking_search'] = cargo['CargoID']
+                st.info("Go to 'Guest > Track Cargo' to see details.")
+
 
 def show_invoices():
     cust_id = get_current_cust_id()
@@ -178,7 +212,6 @@ def show_invoices():
                 pay_inv_id = st.selectbox("Select Invoice to Pay", unpaid['InvoiceID'])
                 if st.button("💳 Pay Online Now"):
                     with st.spinner("Processing Payment..."):
-                        time.sleep(1.5)
                         # Ödemeyi güncelle
                         cargo_id_to_pay = unpaid[unpaid['InvoiceID'] == pay_inv_id].iloc[0]['CargoID']
                         run_query("UPDATE Cargos SET PaymentStatus = 'Paid' WHERE CargoID = %s", (cargo_id_to_pay,))
@@ -1,18 +1,22 @@
 import streamlit as st
-import pandas as pd
 import random
-from database import run_query
+import uuid
+from services.branches import get_branch_index
+from services.tracking import track, normalize_cargo_id
+from services.change_feed import session_subscription, LIVE_REFRESH
 
 def show_about():
     st.title("About Thunder Cargo")
     st.markdown("Established in 2025 by Berke Ünal, Thunder Cargo was born from a vision to redefine modern logistics. We combine cutting-edge technology with a robust global network to ensure your shipments are delivered with lightning speed and precision. Whether it's local distribution or international transit, our mission is simple: to bridge distances reliably and efficiently.")
 
-def mask_name(full_name):
-    """İsimleri KVKK gereği yıldızlar: Ahmet Yılmaz -> A**** Y*****"""
-    if not full_name or str(full_name) == 'nan': return "******"
-    parts = full_name.split()
-    masked_parts = [p[0] + "*" * (len(p)-1) if len(p) > 1 else p for p in parts]
-    return " ".join(masked_parts)
+def tracking_client_key():
+    """Token bucket anahtarı: biliniyorsa istemci IP'si, yoksa oturuma özel sabit bir kimlik."""
+    ip = getattr(getattr(st, "context", None), "ip_address", None)
+    if ip:
+        return f"ip:{ip}"
+    if 'tracking_client' not in st.session_state:
+        st.session_state['tracking_client'] = uuid.uuid4().hex
+    return f"session:{st.session_state['tracking_client']}"
 
 def init_captcha():
     """Session state'te basit bir matematik sorusu oluşturur."""
@@ -25,48 +29,64 @@ def init_captcha():
 def show_branch_locator():
     st.title("📍 Find a Branch")
     st.write("Locate the nearest Thunder Cargo branch for shipping and pickup.")
-    
-    # 1. Adım: Şehir Seçimi
-    cities_res = run_query("SELECT DISTINCT BranchCity FROM CargoBranches ORDER BY BranchCity")
-    cities = [row['BranchCity'] for row in cities_res] if cities_res else []
-    
-    selected_city = st.selectbox("Select City", ["Choose..."] + cities)
-    
-    if selected_city != "Choose...":
-        # 2. Adım: İlçeleri Çek
-        districts_res = run_query("SELECT DISTINCT BranchDistrict FROM CargoBranches WHERE BranchCity = %s ORDER BY BranchDistrict", (selected_city,))
-        districts = [row['BranchDistrict'] for row in districts_res] if districts_res else []
-        
-        selected_district = st.selectbox("Select District", ["All Districts"] + districts)
-        
+
+    # Şubeler süreç başına bir kez belleğe alınır (services.branches); seçimler sorgu atmaz
+    index = get_branch_index()
+    mode = st.radio("Search", ["By City", "Nearest to a Location"], horizontal=True)
+
+    if mode == "Nearest to a Location":
+        c1, c2 = st.columns([3, 1])
+        with c1:
+            location = st.text_input("Address, district or city (or \"latitude, longitude\")",
+                                     placeholder="Ex: Kadikoy  or  41.0082, 28.9784")
+        with c2:
+            k = st.number_input("Branches", min_value=1, max_value=20, value=5)
+        if not location:
+            return
+        point = index.locate(location)
+        if point is None:
+            st.warning("Location not recognised. Try a district or city name, or coordinates.")
+            return
+        branches = index.nearest(point[0], point[1], k=int(k))
+        st.divider()
+        st.subheader(f"{len(branches)} nearest branch{'es' if len(branches) != 1 else ''}")
+        if branches:
+            st.map({"lat": [float(b['Latitude']) for b in branches], "lon": [float(b['Longitude']) for b in branches]})
+    else:
+        # 1. Adım: Şehir Seçimi
+        selected_city = st.selectbox("Select City", ["Choose..."] + index.cities())
+        if selected_city == "Choose...":
+            return
+        # 2. Adım: İlçe Seçimi
+        selected_district = st.selectbox("Select District", ["All Districts"] + index.districts(selected_city))
         # 3. Adım: Şubeleri Listele
-        query = "SELECT * FROM CargoBranches WHERE BranchCity = %s"
-        params = [selected_city]
-        
-        if selected_district != "All Districts":
-            query += " AND BranchDistrict = %s"
-            params.append(selected_district)
-            
-        branches = run_query(query, tuple(params))
-        
+        branches = index.in_area(selected_city, None if selected_district == "All Districts" else selected_district)
         st.divider()
         st.subheader(f"Branches in {selected_city}")
-        
-        if branches:
-            # Şubeleri Kartlar Halinde Göster
-            for b in branches:
-                with st.container(border=True):
-                    c1, c2 = st.columns([3, 1])
-                    with c1:
-                        st.markdown(f"### 🏢 {b['BranchName']}")
-                        st.markdown(f"**📍 Address:** {b['BranchAddress']}")
-                        st.markdown(f"**🏙️ District:** {b['BranchDistrict']} / {b['BranchCity']}")
-                    with c2:
-                        st.markdown(f"**📞 Phone:**\n`{b['BranchNumber']}`")
-                        st.markdown(f"**📧 Email:**\n{b['BranchEmail']}")
-                        st.button(f"Show on Map", key=b['BranchID'], disabled=True, help="Map integration requires Lat/Long data.")
-        else:
-            st.warning("No branches found in this location.")
+
+    if not branches:
+        st.warning("No branches found in this location.")
+        return
+    # Şubeleri Kartlar Halinde Göster
+    for b in branches:
+        has_location = b['Latitude'] is not None and b['Longitude'] is not None
+        with st.container(border=True):
+            c1, c2 = st.columns([3, 1])
+            with c1:
+                title = f"### 🏢 {b['BranchName']}"
+                if 'DistanceKm' in b:
+                    title += f" · {b['DistanceKm']:.1f} km"
+                st.markdown(title)
+                st.markdown(f"**📍 Address:** {b['BranchAddress']}")
+                st.markdown(f"**🏙️ District:** {b['BranchDistrict']} / {b['BranchCity']}")
+            with c2:
+                st.markdown(f"**📞 Phone:**\n`{b['BranchNumber']}`")
+                st.markdown(f"**📧 Email:**\n{b['BranchEmail']}")
+                if st.button("Show on Map", key=f"map_{b['BranchID']}", disabled=not has_location,
+                             help=None if has_location else "No coordinates recorded for this branch."):
+                    st.session_state['locator_map'] = b['BranchID']
+            if has_location and st.session_state.get('locator_map') == b['BranchID']:
+                st.map({"lat": [float(b['Latitude'])], "lon": [float(b['Longitude'])]}, zoom=14)
 
 # 2. DETAYLI KARGO TAKİP 
 
@@ -80,7 +100,7 @@ def show_public_tracking():
     col1, col2 = st.columns([2, 1])
     
     with col1:
-        tracking_no = st.text_input("Tracking Number (Cargo ID)", placeholder="Ex: CG001", max_chars=5)
+        tracking_no = st.text_input("Tracking Number (Cargo ID)", placeholder="Ex: CG001", max_chars=12)
     
     with col2:
         # Güvenlik Kodu (Captcha)
@@ -100,78 +120,67 @@ def show_public_tracking():
             return
 
         if tracking_no:
-            # 2. Kargo Bilgilerini Çek
-            cargo_sql = """
-            SELECT c.CargoID, c.CurrentStatus, c.LastUpdated,
-                   s.FirstName as SenderName, s.LastName as SenderLast,
-                   r.FirstName as ReceiverName, r.LastName as ReceiverLast,
-                   ob.BranchCity as Origin, db.BranchCity as Dest
-            FROM Cargos c
-            JOIN Customers s ON c.SenderCustID = s.CustID
-            JOIN Customers r ON c.ReceiverCustID = r.CustID
-            JOIN CargoBranches ob ON c.OriginBranchID = ob.BranchID
-            JOIN CargoBranches db ON c.DestBranchID = db.BranchID
-            WHERE c.CargoID = %s
-            """
-            cargo_res = run_query(cargo_sql, (tracking_no,))
+            # 2. Kargo Bilgilerini Çek (isimler services.tracking içinde maskelenir)
+            cargo_id = normalize_cargo_id(tracking_no)
+            outcome, result = track(cargo_id, tracking_client_key()) if cargo_id else ("not_found", None)
             
-            if cargo_res:
-                cargo = cargo_res[0]
-                
+            if outcome == "throttled":
+                st.error(f"⏳ Too many lookups. Please try again in {max(1, round(result))} seconds.")
+            elif outcome == "ok":
                 # Üst Bilgi Kartı
-                st.success(f"✅ Shipment Found: {tracking_no}")
-                
-                with st.container(border=True):
-                    c1, c2, c3, c4 = st.columns(4)
-                    c1.metric("Current Status", cargo['CurrentStatus'])
-                    c2.metric("Origin", cargo['Origin'])
-                    c3.metric("Destination", cargo['Dest'])
-                    # İsimleri Maskele (Ahmet Yılmaz -> A**** Y*****)
-                    masked_sender = mask_name(f"{cargo['SenderName']} {cargo['SenderLast']}")
-                    masked_receiver = mask_name(f"{cargo['ReceiverName']} {cargo['ReceiverLast']}")
-                    c4.metric("Receiver", masked_receiver)
-
-                # 3. Hareket Geçmişi 
-                log_sql = """
-                SELECT t.LogTimestamps, st.StatusDescription, b.BranchName, b.BranchCity
-                FROM TrackingLog t
-                JOIN CargoStatusType st ON t.StatusID = st.StatusID
-                JOIN CargoBranches b ON t.BranchID = b.BranchID
-                WHERE t.CargoID = %s
-                ORDER BY t.LogTimestamps DESC
-                """
-                logs = run_query(log_sql, (tracking_no,))
-                
-                st.subheader("📅 Shipment Journey")
-                
-                if logs:
-                    # TIMELINE GÖRSELLEŞTİRME
-                    for i, log in enumerate(logs):
-                        # Tarih formatı
-                        ts = log['LogTimestamps']
-                        date_str = ts.strftime("%d.%m.%Y")
-                        time_str = ts.strftime("%H:%M")
-                        
-                        # Son işlem ise yeşil, değilse gri ikon
-                        icon = "🟢" if i == 0 else "⬇️"
-                        if "Delivered" in log['StatusDescription']: icon = "🏁"
-                        
-                        # Satır Düzeni
-                        with st.container():
-                            tc1, tc2, tc3 = st.columns([1, 1, 6])
-                            with tc1:
-                                st.caption(f"{date_str}\n{time_str}")
-                            with tc2:
-                                st.markdown(f"<h3 style='text-align: center;'>{icon}</h3>", unsafe_allow_html=True)
-                            with tc3:
-                                st.markdown(f"**{log['StatusDescription']}**")
-                                st.write(f"📍 {log['BranchName']} ({log['BranchCity']})")
-                            st.divider()
-                else:
-                    st.info("No movement history available yet.")
+                st.success(f"✅ Shipment Found: {cargo_id}")
+                st.session_state['tracked_cargo'] = result
+                show_tracking_result(cargo_id)
                     
             else:
                 st.warning("⚠️ No shipment found with this Tracking Number.")
         else:
             st.warning("⚠️ Please enter a Tracking Number.")
-    
\ No newline at end of file
+    
+
+@st.fragment(run_every=LIVE_REFRESH)
+def show_tracking_result(cargo_id):
+    """Başlık + zaman çizelgesi; yeni olaylar değişiklik akışından gelir, sorgu tekrarlanmaz."""
+    cargo = st.session_state['tracked_cargo']
+    for event in session_subscription('tracking', [cargo_id]).drain():
+        if event['type'] == 'log':
+            cargo['events'].insert(0, event)
+        cargo['status'] = event['status']
+
+    with st.container(border=True):
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Current Status", cargo['status'])
+        c2.metric("Origin", cargo['origin'])
+        c3.metric("Destination", cargo['destination'])
+        c4.metric("Receiver", cargo['receiver'])
+
+    # 3. Hareket Geçmişi 
+    logs = cargo['events']
+    
+    st.subheader("📅 Shipment Journey")
+    
+    if logs:
+        # TIMELINE GÖRSELLEŞTİRME
+        for i, log in enumerate(logs):
+            # Tarih formatı
+            ts = log['timestamp']
+            date_str = ts.strftime("%d.%m.%Y")
+            time_str = ts.strftime("%H:%M")
+            
+            # Son işlem ise yeşil, değilse gri ikon
+            icon = "🟢" if i == 0 else "⬇️"
+            if "Delivered" in log['status']: icon = "🏁"
+            
+            # Satır Düzeni
+            with st.container():
+                tc1, tc2, tc3 = st.columns([1, 1, 6])
+                with tc1:
+                    st.caption(f"{date_str}\n{time_str}")
+                with tc2:
+                    st.markdown(f"<h3 style='text-align: center;'>{icon}</h3>", unsafe_allow_html=True)
+                with tc3:
+                    st.markdown(f"**{log['status']}**")
+                    st.write(f"📍 {log['branch']} ({log['city']})")
+                st.divider()
+    else:
+        st.info("No movement history available yet.")